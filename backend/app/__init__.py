@@ -1,5 +1,7 @@
-from flask import Flask, app
-from app.extensions import db, migrate, cors, jwt
+import os
+
+from flask import Flask, app, Response
+from app.extensions import db, cors, jwt
 from app.config import Config
 
 
@@ -9,14 +11,52 @@ def create_app(config_class=Config):
 
     # Init extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    # Flask-Migrate pulls in alembic (~0.1s of cold start); only `flask db` needs it
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        from flask_migrate import Migrate
+        Migrate(app, db)
     cors.init_app(app, resources={r"/*": {
         "origins": ["http://localhost:5173", "https://school-biometric-attendance-1.onrender.com", "http://localhost:8000"],
         "allow_headers": ["Content-Type", "Authorization", "ngrok-skip-browser-warning"],
+        "expose_headers": ["X-Request-ID", "Server-Timing", "ETag"],
         "supports_credentials": True
     }})
     jwt.init_app(app)
 
+    # 🕗 School timezone for Late decisions and report days
+    from app.services import school_time
+    school_time.init_app(app)
+
+    # 📈 Request timing / SQL counting
+    from app.services import metrics
+    metrics.init_app(app)
+
+    # 🧵 Request ids + span timings
+    from app.services import tracing
+    tracing.init_app(app)
+
+    # 📝 Write-behind attendance journal
+    from app.services.attendance_writer import attendance_writer
+    attendance_writer.init_app(app)
+
+    # 🗓️ Monthly attendance partitions, topped up while the server runs
+    # (not for `flask` commands, which may run before the migration)
+    if os.environ.get("FLASK_RUN_FROM_CLI") != "true":
+        from app.services import partitions
+        partitions.init_app(app)
+
+    # 🗃️ ETag response cache for read-mostly endpoints
+    from app.services import response_cache
+    response_cache.init_app(app)
+
+    # 🚦 Rate limiting / admission control for the biometric endpoints
+    from app.services import admission
+    admission.init_app(app)
+
+    # 📡 Live dashboard feed
+    from app.services.live import live_feed
+    live_feed.init_app(app)
+
     # 🛡️ JWT Error Logging
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
@@ -38,8 +78,11 @@ def create_app(config_class=Config):
         from app import models  # noqa: F401
 
     # CLI
-    from app.cli import create_admin
+    from app.cli import create_admin, shards_cli, archive_cli, attendance_cli
     app.cli.add_command(create_admin)
+    app.cli.add_command(shards_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(attendance_cli)
 
     # Routes
     from app.routes.auth import bp as auth_bp
@@ -60,9 +103,19 @@ def create_app(config_class=Config):
     from app.routes.settings import bp as settings_bp
     app.register_blueprint(settings_bp, url_prefix="/settings")
 
+    from app.routes.admin import bp as admin_bp
+    app.register_blueprint(admin_bp, url_prefix="/admin")
+
+    from app.routes.devices import bp as devices_bp
+    app.register_blueprint(devices_bp, url_prefix="/devices")
+
 
     @app.route("/")
     def index():
         return {"message": "School Biometrics API (Flask Edition)"}
 
+    @app.route("/metrics")
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
     return app
@@ -32,3 +32,154 @@ def create_admin(reset):
     db.session.commit()
     click.echo("✅ Admin created successfully")
 
+
+@click.group("shards")
+def shards_cli():
+    """Manage the sharded biometric gallery."""
+
+
+def _student_embeddings():
+    from app.services.matcher import active_student_embeddings
+    return active_student_embeddings()
+
+
+@shards_cli.command("list")
+@with_appcontext
+def list_shards():
+    import requests
+    from app.services import shards
+
+    for url in shards.get_shards():
+        try:
+            size = requests.get(
+                f"{url}/gallery", headers=shards._headers(), timeout=5
+            ).json().get("size")
+            click.echo(f"🧩 {url}  ({size} entries)")
+        except requests.RequestException as e:
+            click.echo(f"❌ {url}  unreachable: {e}")
+
+
+@shards_cli.command("add")
+@click.argument("url")
+@with_appcontext
+def add_shard(url):
+    from app.services import shards
+
+    old = shards.get_shards()
+    url = url.rstrip("/")
+    if url in old:
+        click.echo("ℹ️  Shard already registered")
+        return
+    new = old + [url]
+    moved = shards.rebalance(old, new, _student_embeddings())
+    shards.set_shards(new)
+    click.echo(f"✅ Added {url}, moved {moved} embeddings")
+
+
+@shards_cli.command("drain")
+@click.argument("url")
+@with_appcontext
+def drain_shard(url):
+    from app.services import shards
+
+    old = shards.get_shards()
+    url = url.rstrip("/")
+    if url not in old:
+        click.echo("❌ Unknown shard")
+        return
+    new = [u for u in old if u != url]
+    moved = shards.rebalance(old, new, _student_embeddings()) if new else 0
+    shards.set_shards(new)
+    click.echo(f"✅ Drained {url}, moved {moved} embeddings")
+
+
+@shards_cli.command("sync")
+@with_appcontext
+def sync_shards():
+    """Reloads every shard's gallery from the database (e.g. after a restart)."""
+    from app.services import shards
+
+    embeddings = _student_embeddings()
+    shards.upsert_embeddings(embeddings)
+    click.echo(f"✅ Pushed {len(embeddings)} embeddings to {len(shards.get_shards())} shards")
+
+
+@click.group("archive")
+def archive_cli():
+    """Archive attendance of inactive (soft-deleted) students."""
+
+
+@archive_cli.command("purge")
+@click.option("--batch-size", default=1000, show_default=True, help="Rows moved per transaction")
+@with_appcontext
+def purge_archive(batch_size):
+    from app.services.archive import purge_inactive
+
+    moved = purge_inactive(batch_size=batch_size)
+    click.echo(f"🗄️ Moved {moved} attendance rows to attendance_archive")
+
+
+@click.group("attendance")
+def attendance_cli():
+    """Attendance storage: partitions, retention, school dates and per-student summaries."""
+
+
+@attendance_cli.command("partitions")
+@click.option("--months-ahead", default=3, show_default=True)
+@with_appcontext
+def attendance_partitions(months_ahead):
+    from app.services import partitions
+
+    if not partitions.is_partitioned():
+        click.echo("ℹ️ attendances is not partitioned (PostgreSQL only)")
+        return
+    for name in partitions.ensure_partitions(months_ahead):
+        click.echo(f"✅ Created {name}")
+    for month, name in partitions.list_partitions():
+        click.echo(f"🗂️ {month:%Y-%m}  {name}")
+
+
+@attendance_cli.command("retention")
+@click.option("--keep-months", type=int, required=True, help="Months kept in the hot table")
+@click.option("--drop", is_flag=True, help="Drop detached partitions instead of keeping them")
+@with_appcontext
+def attendance_retention(keep_months, drop):
+    from app.services import partitions
+
+    for month, students in partitions.apply_retention(keep_months, drop=drop):
+        click.echo(f"📦 {month:%Y-%m}: rolled up {students} students and removed from attendances")
+
+
+@attendance_cli.command("summaries")
+@click.option("--check", is_flag=True, help="Only report summaries that disagree with attendances")
+@with_appcontext
+def attendance_summaries(check):
+    """Recounts per-student attendance summaries from the attendances table."""
+    from app.services import summaries
+
+    counted, mismatched = summaries.rebuild(check=check)
+    if not mismatched:
+        click.echo(f"✅ {counted} student summaries are consistent")
+    elif check:
+        click.echo(f"❌ {len(mismatched)} of {counted} student summaries are out of date: {mismatched[:20]}")
+        raise SystemExit(1)
+    else:
+        click.echo(f"🔁 Rebuilt {len(mismatched)} of {counted} student summaries")
+
+
+@attendance_cli.command("school-dates")
+@click.option("--check", is_flag=True, help="Only count rows whose school_date disagrees with SCHOOL_TIMEZONE")
+@with_appcontext
+def attendance_school_dates(check):
+    """Recomputes each row's school_date (run after changing SCHOOL_TIMEZONE)."""
+    from app.services import school_time, summaries
+
+    changed = school_time.restamp(check=check)
+    if not changed:
+        click.echo("✅ Every school_date matches SCHOOL_TIMEZONE")
+    elif check:
+        click.echo(f"❌ {changed} rows have a stale school_date")
+        raise SystemExit(1)
+    else:
+        summaries.rebuild()
+        click.echo(f"🔁 Moved {changed} rows to their school day and recounted the summaries")
@@ -1,5 +1,7 @@
 import os
 
+from app.db_pool import engine_options
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev_secret_key")
 
@@ -7,4 +9,82 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool (one engine per worker, shared by every route)
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 2))
+    DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 10))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "True").lower() == "true"
+
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "jwt_dev_secret")
+
+    # Write-behind attendance: scans are journaled locally, then batch-inserted.
+    # On by default only with a journal directory, which must be on a disk
+    # that survives restarts; otherwise scans are inserted directly
+    ATTENDANCE_JOURNAL_DIR = os.environ.get("ATTENDANCE_JOURNAL_DIR")
+    ATTENDANCE_WRITE_BEHIND = os.environ.get(
+        "ATTENDANCE_WRITE_BEHIND", "True" if ATTENDANCE_JOURNAL_DIR else "False"
+    ).lower() == "true"
+    ATTENDANCE_FLUSH_INTERVAL_MS = int(os.environ.get("ATTENDANCE_FLUSH_INTERVAL_MS", 250))
+    ATTENDANCE_FLUSH_BATCH = int(os.environ.get("ATTENDANCE_FLUSH_BATCH", 500))
+    # How often monthly partitions are topped up (PostgreSQL)
+    ATTENDANCE_PARTITION_CHECK_HOURS = float(os.environ.get("ATTENDANCE_PARTITION_CHECK_HOURS", 24))
+
+    # Background move of archived students' attendance into attendance_archive
+    ARCHIVE_PURGE_BATCH = int(os.environ.get("ARCHIVE_PURGE_BATCH", 1000))
+    ARCHIVE_PURGE_PAUSE_MS = int(os.environ.get("ARCHIVE_PURGE_PAUSE_MS", 50))
+
+    # Face matching: accept under MATCH_TOLERANCE only if the nearest other
+    # person is at least MATCH_MARGIN further away
+    MATCH_TOLERANCE = float(os.environ.get("MATCH_TOLERANCE", 0.45))
+    MATCH_MARGIN = float(os.environ.get("MATCH_MARGIN", 0.05))
+    DUPLICATE_TOLERANCE = float(os.environ.get("DUPLICATE_TOLERANCE", 0.5))
+
+    # IANA timezone the school keeps time in (Late cutoff, report days);
+    # blank = the server's local timezone
+    SCHOOL_TIMEZONE = os.environ.get("SCHOOL_TIMEZONE", "")
+
+    # Class sessions: scans later than this after the start are Late
+    SESSION_LATE_AFTER_MINUTES = int(os.environ.get("SESSION_LATE_AFTER_MINUTES", 10))
+
+    # Admission control on /attendance/verify and /auth/face-login: token
+    # buckets per device or client IP ("N/second|minute|hour"), shared through
+    # a Redis-compatible server when RATE_LIMIT_REDIS_URL is set; scans are
+    # shed with 503 while the biometric service has this many encodes running
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    VERIFY_RATE_LIMIT = os.environ.get("VERIFY_RATE_LIMIT", "60/minute")
+    FACE_LOGIN_RATE_LIMIT = os.environ.get("FACE_LOGIN_RATE_LIMIT", "10/minute")
+    RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL")
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get("RATE_LIMIT_TRUSTED_PROXIES", 0))
+    BIOMETRIC_MAX_QUEUE_DEPTH = int(os.environ.get("BIOMETRIC_MAX_QUEUE_DEPTH", 8))
+
+
+    INGEST_MAX_RECORDS = int(os.environ.get("INGEST_MAX_RECORDS", 10000))
+
+    # Edge kiosks: shared device key, and the HMAC key that signs gallery snapshots
+    DEVICE_API_KEY = os.environ.get("DEVICE_API_KEY")
+    GALLERY_SNAPSHOT_KEY = os.environ.get("GALLERY_SNAPSHOT_KEY", SECRET_KEY)
+
+    # Read-mostly endpoints: rendered responses cached per table generation
+    RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "True").lower() == "true"
+    RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 30))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 256))
+
+    # Live dashboard feed (each open stream holds one server thread)
+    LIVE_MAX_SUBSCRIBERS = int(os.environ.get("LIVE_MAX_SUBSCRIBERS", 8))
+    LIVE_RESYNC_SECONDS = int(os.environ.get("LIVE_RESYNC_SECONDS", 60))
+    LIVE_MAX_STREAM_SECONDS = int(os.environ.get("LIVE_MAX_STREAM_SECONDS", 300))
+
+    # Tracing: share of requests kept in the /admin/traces ring buffer
+    TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", 0.1))
+    TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", 200))
+    TRACE_LOG_JSON = os.environ.get("TRACE_LOG_JSON", "False").lower() == "true"
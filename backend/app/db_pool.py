@@ -0,0 +1,43 @@
+import time
+
+from sqlalchemy.pool import QueuePool
+
+from app.services.metrics import Histogram, Gauge
+
+POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled DB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Pooled DB connections currently in use")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports checkout wait time and connections in use."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        conn = super()._do_get()
+        POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+        POOL_CHECKED_OUT.inc()
+        return conn
+
+    def _do_return_conn(self, record):
+        POOL_CHECKED_OUT.dec()
+        super()._do_return_conn(record)
+
+
+def engine_options(database_uri, pool_size, max_overflow, pool_timeout, pool_recycle, pool_pre_ping):
+    """
+    Engine options for the single Flask-SQLAlchemy engine. SQLite keeps
+    SQLAlchemy's default pool (used for local runs and benchmarks).
+    """
+    if database_uri.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pool_pre_ping,
+    }
@@ -1,9 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
 db = SQLAlchemy()
-migrate = Migrate()
 cors = CORS()
 jwt = JWTManager()
@@ -1,13 +1,18 @@
 from .user import User
 from .student import Student
-from .course import Course
-from .attendance import Attendance
+from .course import Course, ClassSession, course_students
+from .attendance import Attendance, AttendanceArchive, AttendanceMonthlyRollup, AttendanceSummary
 from .embedding import Embedding
 
 __all__ = [
     "User",
     "Student",
     "Course",
+    "ClassSession",
+    "course_students",
     "Attendance",
+    "AttendanceArchive",
+    "AttendanceMonthlyRollup",
+    "AttendanceSummary",
     "Embedding",
 ]
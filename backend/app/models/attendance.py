@@ -1,6 +1,15 @@
+from datetime import datetime, time, timedelta
+
 from app.extensions import db
+from app.services import school_time
 from sqlalchemy.sql import func
 
+
+def _school_date(context):
+    """Default for school_date: the school day of the row's timestamp (or of now)."""
+    return school_time.school_date(context.get_current_parameters().get("timestamp"))
+
+
 class Attendance(db.Model):
     __tablename__ = "attendances"
 
@@ -10,8 +19,92 @@ class Attendance(db.Model):
         db.ForeignKey("students.id"),
         nullable=False
     )
+    # Partition key on PostgreSQL (monthly range partitions)
     timestamp = db.Column(
         db.DateTime(timezone=True),
-        server_default=func.now()
+        server_default=func.now(),
+        nullable=False
     )
     status = db.Column(db.String(20), nullable=False, default="Present")
+    # Set by writers that may retry (journal replay, device sync)
+    idempotency_key = db.Column(db.String(64), nullable=True)
+    # Day of `timestamp` on the school's clock, fixed at insert time
+    school_date = db.Column(db.Date, nullable=False, default=_school_date)
+    # Class session the scan was taken for; NULL for school-wide check-ins
+    session_id = db.Column(db.Integer, db.ForeignKey("class_sessions.id", name="fk_attendances_session_id"), nullable=True)
+
+    # Unique keys on a partitioned table must include the partition key;
+    # SQLite is never partitioned and keeps the key unique on its own
+    __table_args__ = (
+        db.UniqueConstraint("idempotency_key", "timestamp", name="uq_attendances_idempotency_key")
+        .ddl_if(dialect="postgresql"),
+        db.UniqueConstraint("idempotency_key", name="uq_attendances_idempotency_key").ddl_if(dialect="sqlite"),
+        db.Index("ix_attendances_student_id_timestamp", "student_id", "timestamp"),
+        db.Index("ix_attendances_school_date", "school_date"),
+        db.Index("ix_attendances_student_id_school_date", "student_id", "school_date"),
+        db.Index("ix_attendances_session_id_student_id", "session_id", "student_id"),
+        # Archived rows keep their ids, so SQLite must never hand one out again
+        {"sqlite_autoincrement": True},
+    )
+
+    @classmethod
+    def on_days(cls, start_date, end_date=None):
+        """
+        Rows from start_date through end_date (school days) by the indexed
+        school_date column. A timestamp range a day wider on each side,
+        which no timezone offset exceeds, keeps partition pruning working.
+        """
+        end_date = end_date or start_date
+        start = datetime.combine(start_date - timedelta(days=1), time.min).astimezone()
+        end = datetime.combine(end_date + timedelta(days=2), time.min).astimezone()
+        return db.and_(
+            cls.school_date >= start_date, cls.school_date <= end_date,
+            cls.timestamp >= start, cls.timestamp < end,
+        )
+
+
+class AttendanceArchive(db.Model):
+    """Attendance of archived students, moved out of the hot table by the purge job."""
+    __tablename__ = "attendance_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    student_id = db.Column(db.Integer, nullable=False, index=True)
+    timestamp = db.Column(db.DateTime(timezone=True))
+    status = db.Column(db.String(20), nullable=False)
+    idempotency_key = db.Column(db.String(64), nullable=True)
+    school_date = db.Column(db.Date, nullable=True)
+    session_id = db.Column(db.Integer, nullable=True)
+    archived_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+
+
+class AttendanceMonthlyRollup(db.Model):
+    """Per-student monthly totals kept after a partition leaves the hot table."""
+    __tablename__ = "attendance_monthly_rollup"
+
+    student_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column(db.Date, primary_key=True)
+    present_count = db.Column(db.Integer, nullable=False, default=0)
+    late_count = db.Column(db.Integer, nullable=False, default=0)
+    days_attended = db.Column(db.Integer, nullable=False, default=0)
+
+
+class AttendanceSummary(db.Model):
+    """
+    Per-student running totals of school-day scans (class-session scans
+    excluded) in the hot `attendances` table, updated as rows are
+    inserted (see services/summaries.py).
+    """
+    __tablename__ = "attendance_summaries"
+
+    student_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    days_attended = db.Column(db.Integer, nullable=False, default=0)
+    # A day counts as Present if any scan that day was on time, else Late
+    days_present = db.Column(db.Integer, nullable=False, default=0)
+    days_late = db.Column(db.Integer, nullable=False, default=0)
+    # Consecutive attended school days (weekends neither count nor break)
+    current_streak = db.Column(db.Integer, nullable=False, default=0)
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_day = db.Column(db.Date, nullable=True)
+    last_day_late = db.Column(db.Boolean, nullable=False, default=False)
+    last_seen = db.Column(db.DateTime(timezone=True), nullable=True)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,7 +1,49 @@
 from app.extensions import db
+from sqlalchemy.sql import func
+
+# Course roster: which students a course's sessions expect
+course_students = db.Table(
+    "course_students",
+    db.Column("course_id", db.Integer, db.ForeignKey("courses.id"), primary_key=True),
+    db.Column("student_id", db.Integer, db.ForeignKey("students.id"), primary_key=True),
+    db.Index("ix_course_students_student_id", "student_id"),
+)
+
 
 class Course(db.Model):
     __tablename__ = "courses"
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False, index=True)
+
+
+class ClassSession(db.Model):
+    """
+    One meeting of a course at a gate. While it runs, scans from that gate
+    are matched against the course roster and recorded against it.
+    """
+    __tablename__ = "class_sessions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=False)
+    gate = db.Column(db.String(64), nullable=False)
+    starts_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    ends_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        db.Index("ix_class_sessions_gate_starts_at", "gate", "starts_at"),
+        db.Index("ix_class_sessions_course_id_starts_at", "course_id", "starts_at"),
+    )
+
+    @classmethod
+    def active_at(cls, gate, when):
+        """The session running at `gate` at `when`, or None."""
+        return cls.query.filter(
+            cls.gate == gate, cls.starts_at <= when, cls.ends_at > when,
+        ).order_by(cls.starts_at.desc()).first()
+
+    @classmethod
+    def overlapping(cls, gate, starts_at, ends_at):
+        """Sessions at `gate` that share any time with [starts_at, ends_at)."""
+        return cls.query.filter(cls.gate == gate, cls.starts_at < ends_at, cls.ends_at > starts_at)
@@ -0,0 +1,25 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+
+from app.services.tracing import recent_traces
+
+bp = Blueprint("admin", __name__)
+
+
+@bp.route("/traces", methods=["GET"])
+@jwt_required()
+def get_traces():
+    """
+    Sampled request traces (newest first).
+    ADMIN ONLY
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Admin access required"}), 403
+
+    limit = request.args.get("limit", 50, type=int)
+    request_id = request.args.get("request_id")
+
+    return jsonify({
+        "traces": recent_traces(limit=limit, request_id=request_id)
+    }), 200
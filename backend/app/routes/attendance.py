@@ -1,49 +1,97 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response
+from flask_jwt_extended import jwt_required, get_jwt
 from datetime import datetime, timedelta, time
-from sqlalchemy import cast, Date, Time
 
 from app.extensions import db
 from app.models.attendance import Attendance
 from app.models.student import Student
+from app.models.course import ClassSession
 from app.models.embedding import Embedding
 from app.models.setting import SystemSetting
-from app.services.face_engine import get_face_encoding
-from app.services.matcher import find_best_match
+from app.services.face_engine import get_face_encoding, encoding_error_response, SCAN_PROFILES
+from app.services.matcher import find_best_match, find_sharded_match, active_student_embeddings
+from app.services.shards import sharding_enabled, ShardUnavailable
+from app.services.metrics import VERIFY_STAGE_SECONDS, GALLERY_SIZE
+from app.services.tracing import span
+from app.services.attendance_writer import attendance_writer
+from app.services import summaries, school_time
+from app.services.ingest import ingest_records, IngestError, HISTORY_GENERATION
+from app.services.live import live_feed, FeedFull
+from app.services.response_cache import cached
+from app.services.admission import rate_limit, biometric_admission
+from app.routes.devices import device_key_valid
 
 bp = Blueprint("attendance", __name__)
 
 @bp.route("/verify", methods=["POST"])
+@rate_limit("VERIFY_RATE_LIMIT")
+@biometric_admission
 def verify_attendance():
-    image = request.files.get("image")
+    with span("upload"):
+        image = request.files.get("image")
 
     if not image:
         return jsonify({"error": "Image required"}), 400
 
+    profile = request.form.get("profile")
+    if profile and profile not in SCAN_PROFILES:
+        return jsonify({"error": f"profile must be one of {list(SCAN_PROFILES)}"}), 400
+
+    # A class running at this gate limits matching to its roster
+    gate = request.form.get("gate")
+    class_session = ClassSession.active_at(gate, datetime.now().astimezone()) if gate else None
+
     # 1. Extract face encoding
     try:
-        encoding_result = get_face_encoding(image, is_enrollment=False)
+        with span("encode"), VERIFY_STAGE_SECONDS.time(stage="encode"):
+            encoding_result = get_face_encoding(image, is_enrollment=False, profile=profile)
         
         if encoding_result is None:
             current_app.logger.warning("⚠️ No face detected in scan.")
             return jsonify({"error": "No face detected"}), 400
             
         if isinstance(encoding_result, dict) and "error" in encoding_result:
-            current_app.logger.warning(f"⚠️ Quality check failed: {encoding_result['error']}")
-            return jsonify(encoding_result), 400
+            status, headers = encoding_error_response(encoding_result)
+            if status == 400:
+                current_app.logger.warning(f"⚠️ Quality check failed: {encoding_result['error']}")
+            return jsonify(encoding_result), status, headers
             
         unknown_encoding = encoding_result
     except Exception as e:
         current_app.logger.error(f"❌ Error during face detection: {e}")
         return jsonify({"error": "Face detection failed"}), 500
 
-    # 2. Load embeddings (Students only)
-    known_embeddings = Embedding.query.filter(Embedding.student_id.isnot(None)).all()
-    if not known_embeddings:
-        current_app.logger.warning("⚠️ No students registered in database.")
-        return jsonify({"error": "No students registered"}), 400
+    if class_session is None and sharding_enabled():
+        # 2+3. Scatter-gather against the gallery resident on the shards
+        try:
+            with span("compare"), VERIFY_STAGE_SECONDS.time(stage="compare"):
+                match = find_sharded_match(unknown_encoding)
+        except ShardUnavailable as e:
+            current_app.logger.error(f"❌ Sharded match incomplete: {e}")
+            return jsonify({"error": "Face matching is temporarily unavailable"}), 503, {"Retry-After": "5"}
+    elif class_session is not None:
+        # 2. Load the roster's embeddings only
+        with span("gallery_load"), VERIFY_STAGE_SECONDS.time(stage="gallery_load"):
+            known_embeddings = active_student_embeddings(course_id=class_session.course_id)
+        if not known_embeddings:
+            current_app.logger.warning(f"⚠️ Session {class_session.id} has no enrolled faces on its roster.")
+            return jsonify({"error": "No students on this session's roster"}), 400
+
+        # 3. Match
+        with span("compare"), VERIFY_STAGE_SECONDS.time(stage="compare"):
+            match = find_best_match(known_embeddings, unknown_encoding)
+    else:
+        # 2. Load embeddings (Students only)
+        with span("gallery_load"), VERIFY_STAGE_SECONDS.time(stage="gallery_load"):
+            known_embeddings = active_student_embeddings()
+        GALLERY_SIZE.set(len(known_embeddings), kind="student")
+        if not known_embeddings:
+            current_app.logger.warning("⚠️ No students registered in database.")
+            return jsonify({"error": "No students registered"}), 400
 
-    # 3. Match
-    match = find_best_match(known_embeddings, unknown_encoding)
+        # 3. Match
+        with span("compare"), VERIFY_STAGE_SECONDS.time(stage="compare"):
+            match = find_best_match(known_embeddings, unknown_encoding)
     if not match:
         return jsonify({"error": "Student not recognized"}), 401
 
@@ -52,27 +100,59 @@ def verify_attendance():
     if not student:
         current_app.logger.error(f"❌ Student record missing for id: {match.student_id}")
         return jsonify({"error": "Invalid student record"}), 500
+    if student.is_active is False:
+        # Archived after a shard copy of the gallery was taken
+        return jsonify({"error": "Student not recognized"}), 401
 
     # 5. Save attendance
     try:
         # Determine status (Late/Present)
-        cutoff_str = SystemSetting.get_val('school_start_time', '08:00')
-        cutoff_time = datetime.strptime(cutoff_str, "%H:%M").time()
-        now_time = datetime.now().time()
-        status = "Present" if now_time <= cutoff_time else "Late"
-
-        attendance = Attendance(
-            student_id=student.id,
-            status=status
-        )
-        db.session.add(attendance)
-        db.session.commit()
+        if class_session is not None:
+            late_after = school_time.localize(class_session.starts_at) + timedelta(
+                minutes=current_app.config.get("SESSION_LATE_AFTER_MINUTES", 10)
+            )
+            status = "Present" if school_time.now() <= late_after else "Late"
+        else:
+            cutoff_str = SystemSetting.get_val('school_start_time', '08:00')
+            cutoff_time = datetime.strptime(cutoff_str, "%H:%M").time()
+            now_time = school_time.now().time()
+            status = "Present" if now_time <= cutoff_time else "Late"
+        session_id = class_session.id if class_session is not None else None
+
+        if attendance_writer.enabled:
+            # Durable once journaled; the writer thread batch-inserts it
+            with span("journal"), VERIFY_STAGE_SECONDS.time(stage="journal"):
+                row = attendance_writer.record(student.id, status, session_id=session_id)
+            attendance_id, idempotency_key, timestamp = None, row["idempotency_key"], row["timestamp"]
+        else:
+            attendance = Attendance(
+                student_id=student.id,
+                status=status,
+                session_id=session_id
+            )
+            with span("db_write"), VERIFY_STAGE_SECONDS.time(stage="db_write"):
+                db.session.add(attendance)
+                db.session.flush()
+                summaries.record([{
+                    "student_id": attendance.student_id,
+                    "status": attendance.status,
+                    "timestamp": attendance.timestamp,
+                    "session_id": attendance.session_id,
+                }])
+                db.session.commit()
+            attendance_id, idempotency_key, timestamp = attendance.id, None, attendance.timestamp.isoformat()
         current_app.logger.info(f"✅ Attendance recorded for: {student.first_name} {student.last_name}")
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"❌ Database error: {e}")
         return jsonify({"error": "Failed to record attendance"}), 500
 
+    # 6. Push to live dashboards (never fails the scan)
+    try:
+        live_feed.publish_checkin(student, status, timestamp, idempotency_key, attendance_id, session_id)
+    except Exception as e:
+        current_app.logger.error(f"❌ Live feed error: {e}")
+
     return jsonify({
         "success": True,
         "student": {
@@ -81,62 +161,129 @@ def verify_attendance():
             "admission_number": student.admission_number
         },
         "attendance": {
-            "id": attendance.id,
-            "status": attendance.status,
-            "timestamp": attendance.timestamp.isoformat()
+            # null while the row is queued for the write-behind writer
+            "id": attendance_id,
+            "idempotency_key": idempotency_key,
+            "status": status,
+            "timestamp": timestamp,
+            "session_id": session_id
         }
     }), 200
 
 
-@bp.route("/stats", methods=["GET"])
-def get_stats():
+@bp.route("/ingest", methods=["POST"])
+@jwt_required(optional=True)
+def ingest_attendance():
+    """
+    Bulk, idempotent load of attendance recorded elsewhere (device backlogs,
+    data migrations). Body: {"records": [{"idempotency_key", "student_id",
+    "timestamp", "status"}]}. Returns per-record accepted/duplicate/rejected.
+    ADMIN or DEVICE KEY
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin" and not device_key_valid():
+        return jsonify({"error": "Admin access required"}), 403
+
+    data = request.get_json(silent=True) or {}
     try:
-        today = datetime.now().date()
-        
-        # 1. Total Students
-        total_students = Student.query.count()
-        
-        # 2. Present Today (Unique students)
-        present_count = db.session.query(Attendance.student_id)\
-            .filter(cast(Attendance.timestamp, Date) == today)\
-            .distinct().count()
-            
-        # 3. Recent Activity (Last 5)
-        recent = db.session.query(Attendance, Student)\
-            .join(Student, Attendance.student_id == Student.id)\
-            .order_by(Attendance.timestamp.desc())\
-            .limit(5).all()
-            
-        activity_log = []
-        for att, stu in recent:
-            activity_log.append({
-                "name": f"{stu.first_name} {stu.last_name}",
-                "time": att.timestamp.strftime("%I:%M %p"),
-                "status": "Check In" if att.status == "Present" else att.status,
-                "color": "text-success"
-            })
+        with span("ingest"):
+            result = ingest_records(data.get("records"), current_app.config["INGEST_MAX_RECORDS"])
+    except IngestError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"❌ Ingest failed: {e}")
+        return jsonify({"error": "Failed to store attendance"}), 500
 
-        late_count = db.session.query(Attendance.id)\
-            .filter(cast(Attendance.timestamp, Date) == today)\
-            .filter(Attendance.status == "Late").count()
+    if result["accepted"]:
+        live_feed.invalidate()
+    current_app.logger.info(
+        f"📥 Ingested {result['accepted']} records ({result['duplicates']} duplicate, {result['rejected']} rejected)"
+    )
+    return jsonify(result), 200
 
-        percentage = int((present_count / total_students * 100)) if total_students > 0 else 0
 
-        return jsonify({
-            "total_students": total_students,
-            "present_today": present_count,
-            "late_today": late_count,
-            "percentage": percentage,
-            "recent_activity": activity_log
-        }), 200
+@bp.route("/stats", methods=["GET"])
+def get_stats():
+    try:
+        # Served from the live feed's shared counters (no per-call queries)
+        return jsonify(live_feed.snapshot()), 200
 
     except Exception as e:
         current_app.logger.error(f"Stats Error: {e}")
         return jsonify({"error": "Failed to fetch stats"}), 500
 
 
+@bp.route("/live", methods=["GET"])
+def live_stats():
+    """
+    Server-sent events: a `stats` event on connect (and after each resync),
+    then a `checkin` event with updated counters for every recognised scan.
+    """
+    try:
+        stream = live_feed.subscribe()
+    except FeedFull:
+        return jsonify({"error": "Too many live dashboards, poll /attendance/stats"}), 503
+
+    return Response(stream, mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+
+def _school_cutoff():
+    start_time_str = SystemSetting.get_val('school_start_time', '08:00')
+    return datetime.strptime(start_time_str, "%H:%M").time()
+
+
+def _report(columns, days_to_check, today, total_students):
+    """Report body from columnar attendance covering today - days_to_check .. today."""
+    from app.services import analytics
+
+    # 1. Trend: share of students seen each day
+    days = analytics.day_range(today - timedelta(days=days_to_check - 1), today)
+    present = analytics.daily_presence(columns, days)
+    percentages = analytics.percentages(present, total_students)
+    label_format = "%a" if days_to_check <= 7 else "%m/%d"
+    trend_data = [
+        {"day": day.strftime(label_format), "attendance": int(percentage)}
+        for day, percentage in zip(days.astype(object), percentages)
+    ]
+
+    # 2. Average over the days that had any attendance
+    with_data = percentages[percentages > 0]
+    avg_attendance = round(float(with_data.mean()), 1) if len(with_data) else 0
+
+    # 3. Punctuality: scans at or before the school start time
+    total_present_count = len(columns)
+    on_time_count = int(analytics.on_time(columns, _school_cutoff()).sum())
+    punctuality_rate = int((on_time_count / total_present_count * 100)) if total_present_count > 0 else 100
+
+    # 4. Recent logs (columns are newest first)
+    recent = columns.take(slice(0, 50))
+    names, admissions = analytics.students(recent.student_ids)
+    recent_logs = [
+        {"id": attendance_id, "name": name, "admission_number": admission,
+         "date": date, "time": time_str, "status": status}
+        for attendance_id, name, admission, date, time_str, status in zip(
+            recent.ids.tolist(), names, admissions, analytics.format_dates(recent),
+            analytics.format_times(recent), analytics.STATUS_NAMES[recent.status],
+        )
+    ]
+
+    return {
+        "weekly_trend": trend_data,
+        "avg_attendance": avg_attendance,
+        "total_present": total_present_count,
+        "punctuality": punctuality_rate,
+        "recent_logs": recent_logs,
+    }
+
+
 @bp.route("/report", methods=["GET"])
+@cached("attendances", "students", "system_settings")
 def get_report():
+    from app.services import analytics
+
     try:
         range_param = request.args.get("range", "7d")
         student_id_param = request.args.get("student_id")
@@ -144,94 +291,25 @@ def get_report():
         days_map = {"7d": 7, "30d": 30, "90d": 90}
         days_to_check = days_map.get(range_param, 7)
         
-        today = datetime.now().date()
-        
-        # 1. Weekly/Monthly Trend
-        trend_data = []
-        total_attendance_period = 0
-        days_with_data = 0
-        
-        # Determine step for larger ranges to avoid too many points? 
-        # For 90d, maybe daily is fine (90 points), let's keep it daily for simplicity and detail.
-        
-        for i in range(days_to_check - 1, -1, -1):
-            date_check = today - timedelta(days=i)
-            # Label format changes based on range? 
-            # For 7d: Mon, Tue... 
-            # For 30d/90d: 01/25
-            day_label = date_check.strftime("%a") if days_to_check <= 7 else date_check.strftime("%m/%d")
-            
-            query = db.session.query(Attendance.student_id).filter(cast(Attendance.timestamp, Date) == date_check)
-            
-            if student_id_param:
-                query = query.filter(Attendance.student_id == student_id_param)
-                total_students = 1
-            else:
-                total_students = Student.query.count()
-
-            present_count = query.distinct().count()
-            
-            percentage = int((present_count / total_students * 100)) if total_students > 0 else 0
-            
-            trend_data.append({"day": day_label, "attendance": percentage})
-            
-            # Only count stats for valid days if we want true average
-            # Or simplistic average over the period
-            if percentage > 0:
-                total_attendance_period += percentage
-                days_with_data += 1
-
-        # 2. Stats
-        avg_attendance = round(total_attendance_period / days_with_data, 1) if days_with_data > 0 else 0
-        
-        # Total present query (for the period or today? Report implies period usually, but dashboard showed today)
-        # Let's show Total Present counts for the PERIOD sum if range > 7, or keep today?
-        # User wants "last 30 days" report. "Total Present" usually means unique counts or sum of attendances.
-        # Let's return Total Attendance Events in this period.
-        total_present_query = db.session.query(Attendance).filter(cast(Attendance.timestamp, Date) >= (today - timedelta(days=days_to_check)))
-        if student_id_param:
-            total_present_query = total_present_query.filter(Attendance.student_id == student_id_param)
-            
-        total_present_count = total_present_query.count()
-            
-        # 3. Punctuality (Students arriving before threshold in this period)
-        start_time_str = SystemSetting.get_val('school_start_time', '08:00')
-        cutoff_time = datetime.strptime(start_time_str, "%H:%M").time()
-        
-        on_time_query = total_present_query.filter(cast(Attendance.timestamp, Time) <= cutoff_time)
-        on_time_count = on_time_query.count()
-            
-        punctuality_rate = int((on_time_count / total_present_count * 100)) if total_present_count > 0 else 100
+        today = school_time.today()
+        start_date = today - timedelta(days=days_to_check)
 
-        # 4. Recent Logs (New)
-        # Reuse the filter logic from total_present_query
-        recent_logs_query = db.session.query(Attendance, Student)\
-            .join(Student, Attendance.student_id == Student.id)\
-            .filter(cast(Attendance.timestamp, Date) >= (today - timedelta(days=days_to_check)))
-        
         if student_id_param:
-            recent_logs_query = recent_logs_query.filter(Attendance.student_id == student_id_param)
-            
-        recent_records = recent_logs_query.order_by(Attendance.timestamp.desc()).limit(50).all()
-        
-        recent_logs = []
-        for att, stu in recent_records:
-            recent_logs.append({
-                "id": att.id,
-                "name": f"{stu.first_name} {stu.last_name}",
-                "admission_number": stu.admission_number,
-                "date": att.timestamp.strftime("%Y-%m-%d"),
-                "time": att.timestamp.strftime("%I:%M %p"),
-                "status": att.status
-            })
+            # One student: running totals from their summary row
+            try:
+                student = db.session.get(Student, int(student_id_param))
+            except ValueError:
+                return jsonify({"error": "student_id must be an integer"}), 400
+            if not student:
+                return jsonify({"error": "Student not found"}), 404
+            columns = analytics.load(start_date, today, student_id=student.id)
+            report = _report(columns, days_to_check, today, total_students=1)
+            report["summary"] = summaries.for_student(student.id, today)
+            return jsonify(report), 200
 
-        return jsonify({
-            "weekly_trend": trend_data,
-            "avg_attendance": avg_attendance,
-            "total_present": total_present_count,
-            "punctuality": punctuality_rate,
-            "recent_logs": recent_logs
-        }), 200
+        total_students = Student.query.filter(Student.is_active.isnot(False)).count()
+        columns = analytics.load(start_date, today)
+        return jsonify(_report(columns, days_to_check, today, total_students)), 200
 
     except Exception as e:
         current_app.logger.error(f"Report Error: {e}")
@@ -240,25 +318,47 @@ def get_report():
 
 @bp.route("/export", methods=["GET"])
 def export_attendance():
+    """
+    Attendance rows in the range as JSON or CSV (format=csv); with
+    by=student, one row per student with their totals instead.
+    """
+    from app.services import analytics
+
     try:
         range_param = request.args.get("range", "30d")
         student_id_param = request.args.get("student_id")
+        by_student = request.args.get("by") == "student"
         
         days_map = {"7d": 7, "30d": 30, "90d": 90, "all": 3650}
         days_to_check = days_map.get(range_param, 30)
         
-        today = datetime.now().date()
+        today = school_time.today()
         start_date = today - timedelta(days=days_to_check)
-        
-        query = db.session.query(Attendance, Student)\
-            .join(Student, Attendance.student_id == Student.id)\
-            .filter(cast(Attendance.timestamp, Date) >= start_date)\
-            .order_by(Attendance.timestamp.desc())
-            
+
+        student_id = None
         if student_id_param:
-            query = query.filter(Attendance.student_id == student_id_param)
-            
-        records = query.all()
+            try:
+                student_id = int(student_id_param)
+            except ValueError:
+                return jsonify({"error": "student_id must be an integer"}), 400
+
+        columns = analytics.load(start_date, today, student_id=student_id)
+
+        if by_student:
+            totals = analytics.student_breakdown(columns, _school_cutoff())
+            names, admissions = analytics.students(totals["student_id"])
+            header = ["Student Name", "Admission Number", "Days Attended", "Records", "Late", "On-Time Rate"]
+            table = zip(
+                names, admissions, totals["days"].tolist(), totals["records"].tolist(),
+                totals["late"].tolist(), totals["on_time_rate"].tolist(),
+            )
+        else:
+            names, admissions = analytics.students(columns.student_ids)
+            header = ["ID", "Student Name", "Admission Number", "Date", "Time", "Status"]
+            table = zip(
+                columns.ids.tolist(), names, admissions, analytics.format_dates(columns),
+                analytics.format_times(columns), analytics.STATUS_NAMES[columns.status],
+            )
 
         # Handle CSV Export
         format_param = request.args.get("format", "json")
@@ -269,42 +369,109 @@ def export_attendance():
             
             output = io.StringIO()
             writer = csv.writer(output)
-            
-            # Header
-            writer.writerow(["ID", "Student Name", "Admission Number", "Date", "Time", "Status"])
-            
-            for att, stu in records:
-                writer.writerow([
-                    att.id,
-                    f"{stu.first_name} {stu.last_name}",
-                    stu.admission_number,
-                    att.timestamp.strftime("%Y-%m-%d"),
-                    att.timestamp.strftime("%I:%M %p"),
-                    att.status
-                ])
+            writer.writerow(header)
+            writer.writerows(table)
             
             response = make_response(output.getvalue())
             filename = f"report_{range_param}"
             if student_id_param:
                 filename = f"student_{student_id_param}_report"
+            if by_student:
+                filename += "_by_student"
                 
             response.headers["Content-Disposition"] = f"attachment; filename={filename}.csv"
             response.headers["Content-type"] = "text/csv"
             return response
-        
+
+        if by_student:
+            return jsonify([dict(zip(header, row)) for row in table]), 200
+
         # Default JSON response (legacy format)
-        export_data = []
-        for att, stu in records:
-            export_data.append({
-                "Date": att.timestamp.strftime("%Y-%m-%d"),
-                "Time": att.timestamp.strftime("%I:%M %p"),
-                "Student Name": f"{stu.first_name} {stu.last_name}",
-                "Admission No": stu.admission_number,
-                "Status": att.status
-            })
-            
+        export_data = [
+            {"Date": date, "Time": time_str, "Student Name": name, "Admission No": admission, "Status": status}
+            for _, name, admission, date, time_str, status in table
+        ]
         return jsonify(export_data), 200
         
     except Exception as e:
         current_app.logger.error(f"Export Error: {e}")
         return jsonify({"error": "Failed to export data"}), 500
+
+
+ANALYTICS_PAGE_SIZE = 50
+MAX_ANALYTICS_PAGE_SIZE = 500
+
+
+def _rate_arg(name):
+    """Optional 0..1 float query parameter; raises ValueError when invalid."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    value = float(value)
+    if not 0 <= value <= 1:
+        raise ValueError
+    return value
+
+
+@bp.route("/analytics", methods=["GET"])
+@jwt_required()
+def cohort_analytics():
+    """
+    Absence rate, late rate and longest absence streak of every active
+    student over the last `range` complete days (7d, 30d, 90d, 180d, 365d).
+    Computed once per day and window, then filtered (min_absence_rate,
+    min_late_rate), sorted (sort, order) and paged (limit + cursor) per request.
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Admin access required"}), 403
+
+    from app.services import analytics
+    from app.services.response_cache import generation
+
+    days_map = {"7d": 7, "30d": 30, "90d": 90, "180d": 180, "365d": 365}
+    range_param = request.args.get("range", "30d")
+    if range_param not in days_map:
+        return jsonify({"error": f"range must be one of {', '.join(days_map)}"}), 400
+    sort = request.args.get("sort", "absence_rate")
+    if sort not in analytics.COHORT_SORTS:
+        return jsonify({"error": f"sort must be one of {', '.join(analytics.COHORT_SORTS)}"}), 400
+    order = request.args.get("order", "asc" if sort == "name" else "desc")
+    if order not in ("asc", "desc"):
+        return jsonify({"error": "order must be asc or desc"}), 400
+    limit = request.args.get("limit", ANALYTICS_PAGE_SIZE, type=int)
+    if not 1 <= limit <= MAX_ANALYTICS_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_ANALYTICS_PAGE_SIZE}"}), 400
+    cursor = request.args.get("cursor", 0, type=int)
+    if cursor < 0:
+        return jsonify({"error": "cursor must not be negative"}), 400
+    try:
+        min_absence_rate = _rate_arg("min_absence_rate")
+        min_late_rate = _rate_arg("min_late_rate")
+    except ValueError:
+        return jsonify({"error": "min_absence_rate and min_late_rate must be between 0 and 1"}), 400
+
+    try:
+        data = analytics.cached_cohort(
+            days_map[range_param], generations=[generation("students"), generation(HISTORY_GENERATION)],
+        )
+        total, rows = analytics.cohort_page(
+            data, sort=sort, descending=order == "desc", offset=cursor, limit=limit,
+            min_absence_rate=min_absence_rate, min_late_rate=min_late_rate,
+        )
+        return jsonify({
+            "success": True,
+            "window": {
+                "start": data["start"].isoformat(),
+                "end": data["end"].isoformat(),
+                "school_days": data["school_days"],
+            },
+            "computed_at": data["computed_at"],
+            "students": rows,
+            "total": total,
+            "next_cursor": cursor + limit if cursor + limit < total else None,
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"❌ Analytics Error: {e}")
+        return jsonify({"error": "Failed to compute analytics"}), 500
@@ -4,8 +4,11 @@ from app.extensions import db
 from flask_jwt_extended import create_access_token, jwt_required
 from werkzeug.security import check_password_hash
 from app.models.embedding import Embedding
-from app.services.face_engine import get_face_encoding
+from app.services.face_engine import get_face_encoding, encoding_error_response
 from app.services.matcher import find_best_match
+from app.services.metrics import GALLERY_SIZE
+from app.services.response_cache import cached
+from app.services.admission import rate_limit, biometric_admission
 import logging
 
 bp = Blueprint("auth", __name__)
@@ -80,6 +83,8 @@ def login():
 
 
 @bp.route("/face-login", methods=["POST"])
+@rate_limit("FACE_LOGIN_RATE_LIMIT")
+@biometric_admission
 def face_login():
     """
     Authenticate a user via face recognition.
@@ -96,12 +101,14 @@ def face_login():
             return jsonify({"error": "No face detected"}), 400
             
         if isinstance(encoding_result, dict) and "error" in encoding_result:
-            return jsonify(encoding_result), 400
+            status, headers = encoding_error_response(encoding_result)
+            return jsonify(encoding_result), status, headers
             
         encoding = encoding_result
 
         # 2. Match against system users only
         user_embeddings = Embedding.query.filter(Embedding.user_id.isnot(None)).all()
+        GALLERY_SIZE.set(len(user_embeddings), kind="user")
         if not user_embeddings:
             return jsonify({"error": "No face IDs registered in system"}), 404
 
@@ -141,6 +148,7 @@ def face_login():
 
 @bp.route("/users", methods=["GET"])
 @jwt_required()
+@cached("users")
 def get_users():
     try:
         users = User.query.all()
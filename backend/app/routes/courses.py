@@ -1,8 +1,15 @@
+from datetime import datetime
+
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy import case, func
 
-from app.db import SessionLocal
-from app.models.course import Course
+from app.extensions import db
+from app.models.attendance import Attendance
+from app.models.course import Course, ClassSession, course_students
+from app.models.student import Student
+from app.services import school_time
+from app.services.response_cache import cached
 
 bp = Blueprint("courses", __name__)
 
@@ -10,84 +17,234 @@ bp = Blueprint("courses", __name__)
 @bp.route("/", methods=["POST"])
 @jwt_required()
 def create_course():
-    db = SessionLocal()
-    try:
-        data = request.get_json()
-
-        if not data or not data.get("name"):
-            return jsonify({"error": "Course name is required"}), 400
+    data = request.get_json()
 
-        if db.query(Course).filter_by(name=data["name"]).first():
-            return jsonify({"error": "Course already exists"}), 400
+    if not data or not data.get("name"):
+        return jsonify({"error": "Course name is required"}), 400
 
-        course = Course(name=data["name"])
-        db.add(course)
-        db.commit()
-        db.refresh(course)
+    if Course.query.filter_by(name=data["name"]).first():
+        return jsonify({"error": "Course already exists"}), 400
 
-        return jsonify({
-            "id": course.id,
-            "name": course.name
-        }), 201
+    course = Course(name=data["name"])
+    db.session.add(course)
+    db.session.commit()
 
-    finally:
-        db.close()
+    return jsonify({
+        "id": course.id,
+        "name": course.name
+    }), 201
 
 # READ ALL
 @bp.route("/", methods=["GET"])
+@cached("courses")
 def get_courses():
-    db = SessionLocal()
-    try:
-        courses = db.query(Course).all()
-        return jsonify([
-            {"id": c.id, "name": c.name} for c in courses
-        ])
-    finally:
-        db.close()
+    courses = Course.query.all()
+    return jsonify([
+        {"id": c.id, "name": c.name} for c in courses
+    ])
 
 # READ ONE
 @bp.route("/<int:id>", methods=["GET"])
 def get_course(id):
-    db = SessionLocal()
-    try:
-        course = db.query(Course).get(id)
-        if not course:
-            return jsonify({"error": "Course not found"}), 404
-        return jsonify({"id": course.id, "name": course.name})
-    finally:
-        db.close()
+    course = Course.query.get(id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+    return jsonify({"id": course.id, "name": course.name})
 
 # UPDATE
 @bp.route("/<int:id>", methods=["PUT"])
 @jwt_required()
 def update_course(id):
-    db = SessionLocal()
-    try:
-        course = db.query(Course).get(id)
-        if not course:
-            return jsonify({"error": "Course not found"}), 404
+    course = Course.query.get(id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
 
-        data = request.get_json()
-        if "name" in data:
-            course.name = data["name"]
+    data = request.get_json()
+    if "name" in data:
+        course.name = data["name"]
 
-        db.commit()
-        return jsonify({"id": course.id, "name": course.name})
-    finally:
-        db.close()
+    db.session.commit()
+    return jsonify({"id": course.id, "name": course.name})
 
 # DELETE
 @bp.route("/<int:id>", methods=["DELETE"])
 @jwt_required()
 def delete_course(id):
-    db = SessionLocal()
+    course = Course.query.get(id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+    if ClassSession.query.filter_by(course_id=id).first():
+        return jsonify({"error": "Course has sessions with attendance history"}), 400
+
+    db.session.execute(db.delete(course_students).where(course_students.c.course_id == id))
+    db.session.delete(course)
+    db.session.commit()
+    return jsonify({"message": "Course deleted"})
+
+
+# -----------------------------
+# Roster
+# -----------------------------
+@bp.route("/<int:id>/students", methods=["GET"])
+@jwt_required()
+@cached("course_students", "students")
+def get_roster(id):
+    if not db.session.get(Course, id):
+        return jsonify({"error": "Course not found"}), 404
+    rows = db.session.execute(
+        db.select(Student.id, Student.first_name, Student.last_name, Student.admission_number)
+        .join(course_students, course_students.c.student_id == Student.id)
+        .where(course_students.c.course_id == id)
+        .order_by(Student.last_name, Student.first_name)
+    ).all()
+    return jsonify([
+        {"id": sid, "name": f"{first} {last}", "admission_number": admission}
+        for sid, first, last, admission in rows
+    ])
+
+
+@bp.route("/<int:id>/students", methods=["POST"])
+@jwt_required()
+def add_to_roster(id):
+    """Adds {"student_ids": [...]} to the roster; students already on it are skipped."""
+    if not db.session.get(Course, id):
+        return jsonify({"error": "Course not found"}), 404
+    data = request.get_json() or {}
+    student_ids = data.get("student_ids")
+    if not isinstance(student_ids, list) or not all(isinstance(s, int) for s in student_ids):
+        return jsonify({"error": "student_ids must be a list of integers"}), 400
+
+    known = set(db.session.execute(
+        db.select(Student.id).where(Student.id.in_(student_ids))
+    ).scalars())
+    unknown = sorted(set(student_ids) - known)
+    if unknown:
+        return jsonify({"error": "Unknown student_ids", "student_ids": unknown}), 400
+
+    on_roster = set(db.session.execute(
+        db.select(course_students.c.student_id)
+        .where(course_students.c.course_id == id, course_students.c.student_id.in_(student_ids))
+    ).scalars())
+    added = sorted(known - on_roster)
+    if added:
+        db.session.execute(db.insert(course_students), [{"course_id": id, "student_id": sid} for sid in added])
+    db.session.commit()
+    return jsonify({"added": len(added)}), 200
+
+
+@bp.route("/<int:id>/students/<int:student_id>", methods=["DELETE"])
+@jwt_required()
+def remove_from_roster(id, student_id):
+    result = db.session.execute(db.delete(course_students).where(
+        course_students.c.course_id == id, course_students.c.student_id == student_id
+    ))
+    if not result.rowcount:
+        return jsonify({"error": "Student is not on this course's roster"}), 404
+    db.session.commit()
+    return jsonify({"message": "Student removed from roster"})
+
+
+# -----------------------------
+# Sessions
+# -----------------------------
+def _session_json(class_session):
+    return {
+        "id": class_session.id,
+        "course_id": class_session.course_id,
+        "gate": class_session.gate,
+        "starts_at": school_time.localize(class_session.starts_at).isoformat(),
+        "ends_at": school_time.localize(class_session.ends_at).isoformat(),
+    }
+
+
+def _parse_time(value):
+    """ISO-8601 time; without an offset it is read on the school's clock."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=school_time.zone()) if school_time.zone() else parsed.astimezone()
+    return parsed.astimezone()  # stored like every other timestamp
+
+
+@bp.route("/<int:id>/sessions", methods=["POST"])
+@jwt_required()
+def create_session(id):
+    """{"gate", "starts_at", "ends_at"}: one class meeting at a gate."""
+    if not db.session.get(Course, id):
+        return jsonify({"error": "Course not found"}), 404
+    data = request.get_json() or {}
+    gate = data.get("gate")
+    if not isinstance(gate, str) or not gate.strip() or len(gate) > 64:
+        return jsonify({"error": "gate must be a string of 1-64 characters"}), 400
     try:
-        course = db.query(Course).get(id)
-        if not course:
-            return jsonify({"error": "Course not found"}), 404
-
-        db.delete(course)
-        db.commit()
-        return jsonify({"message": "Course deleted"})
-    finally:
-        db.close()
+        starts_at, ends_at = _parse_time(data["starts_at"]), _parse_time(data["ends_at"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "ISO-8601 starts_at and ends_at required"}), 400
+    if ends_at <= starts_at:
+        return jsonify({"error": "ends_at must be after starts_at"}), 400
+    if ClassSession.overlapping(gate, starts_at, ends_at).first():
+        return jsonify({"error": "Another session is scheduled at this gate then"}), 409
+
+    class_session = ClassSession(course_id=id, gate=gate, starts_at=starts_at, ends_at=ends_at)
+    db.session.add(class_session)
+    db.session.commit()
+    return jsonify(_session_json(class_session)), 201
+
+
+@bp.route("/<int:id>/sessions", methods=["GET"])
+@jwt_required()
+@cached("class_sessions")
+def get_sessions(id):
+    sessions = ClassSession.query.filter_by(course_id=id).order_by(ClassSession.starts_at.desc()).all()
+    return jsonify([_session_json(s) for s in sessions])
+
+
+@bp.route("/sessions/<int:session_id>/attendance", methods=["GET"])
+@jwt_required()
+@cached("attendances", "class_sessions", "course_students", "students")
+def get_session_attendance(session_id):
+    """The roster of a session, each student Present, Late or Absent."""
+    class_session = db.session.get(ClassSession, session_id)
+    if not class_session:
+        return jsonify({"error": "Session not found"}), 404
+
+    # One indexed (session_id, student_id) range, grouped per student
+    seen = {
+        student_id: (first_seen, on_time)
+        for student_id, first_seen, on_time in db.session.execute(
+            db.select(
+                Attendance.student_id,
+                func.min(Attendance.timestamp),
+                func.sum(case((Attendance.status == "Present", 1), else_=0)),
+            )
+            .where(Attendance.session_id == session_id)
+            .group_by(Attendance.student_id)
+        )
+    }
+    roster = db.session.execute(
+        db.select(Student.id, Student.first_name, Student.last_name, Student.admission_number)
+        .join(course_students, course_students.c.student_id == Student.id)
+        .where(course_students.c.course_id == class_session.course_id)
+        .order_by(Student.last_name, Student.first_name)
+    ).all()
+
+    students, counts = [], {"Present": 0, "Late": 0, "Absent": 0}
+    for sid, first, last, admission in roster:
+        first_seen, on_time = seen.get(sid, (None, 0))
+        status = "Absent" if first_seen is None else ("Present" if on_time else "Late")
+        counts[status] += 1
+        students.append({
+            "id": sid,
+            "name": f"{first} {last}",
+            "admission_number": admission,
+            "status": status,
+            "first_seen": school_time.localize(first_seen).isoformat() if first_seen else None,
+        })
+
+    return jsonify({
+        "session": _session_json(class_session),
+        "roster_size": len(roster),
+        "present": counts["Present"],
+        "late": counts["Late"],
+        "absent": counts["Absent"],
+        "students": students,
+    })
@@ -0,0 +1,106 @@
+import hmac
+from functools import wraps
+
+from flask import Blueprint, request, jsonify, current_app, Response
+
+from app.extensions import db
+from app.models.student import Student
+from app.models.embedding import Embedding
+from app.models.setting import SystemSetting
+from app.services.ingest import ingest_records, IngestError
+from app.services.live import live_feed
+
+bp = Blueprint("devices", __name__)
+
+
+def device_key_valid():
+    """True when the request carries the shared DEVICE_API_KEY header."""
+    expected = current_app.config.get("DEVICE_API_KEY")
+    provided = request.headers.get("X-DEVICE-KEY", "")
+    return bool(expected) and hmac.compare_digest(provided.encode(), expected.encode())
+
+
+def device_key_required(view):
+    """Edge kiosks authenticate with the shared DEVICE_API_KEY header."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_app.config.get("DEVICE_API_KEY"):
+            return jsonify({"error": "Edge devices are not enabled"}), 503
+        if not device_key_valid():
+            return jsonify({"error": "Unauthorized device"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@bp.route("/gallery-snapshot", methods=["GET"])
+@device_key_required
+def gallery_snapshot():
+    """
+    Signed binary snapshot of every student embedding, for offline matching.
+    """
+    from app.services.gallery_snapshot import build_snapshot
+    from app.services.face_engine import encoding_profile
+
+    rows = db.session.execute(
+        db.select(
+            Embedding.id, Student.id, Student.first_name, Student.last_name,
+            Student.admission_number, Embedding.vector,
+        ).join(Student, Embedding.student_id == Student.id)
+        .where(Student.is_active.isnot(False))
+        .order_by(Embedding.id)
+    ).all()
+
+    settings = {
+        "school_start_time": SystemSetting.get_val("school_start_time", "08:00"),
+        "school_timezone": current_app.config.get("SCHOOL_TIMEZONE", ""),
+        "verify_encoding_profile": encoding_profile(),
+        # Kiosks apply the same matching rule as /attendance/verify
+        "match_tolerance": current_app.config["MATCH_TOLERANCE"],
+        "match_margin": current_app.config["MATCH_MARGIN"],
+    }
+    blob = build_snapshot(
+        ((eid, sid, f"{first} {last}", admission, vector)
+         for eid, sid, first, last, admission, vector in rows),
+        current_app.config["GALLERY_SNAPSHOT_KEY"],
+        settings=settings,
+    )
+    current_app.logger.info(f"📦 Gallery snapshot sent to {request.headers.get('X-DEVICE-ID', 'device')} ({len(rows)} embeddings)")
+
+    return Response(blob, mimetype="application/octet-stream", headers={
+        "Content-Disposition": "attachment; filename=gallery.snap",
+        "X-Snapshot-Count": str(len(rows)),
+    })
+
+
+@bp.route("/attendance-sync", methods=["POST"])
+@device_key_required
+def attendance_sync():
+    """
+    Upload of scans recorded offline by a kiosk. Stored like
+    /attendance/ingest, but answers in the original shape deployed kiosks
+    parse: lists of accepted, duplicate and rejected idempotency keys.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        result = ingest_records(data.get("records"), current_app.config["INGEST_MAX_RECORDS"])
+    except IngestError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"❌ Device sync failed: {e}")
+        return jsonify({"error": "Failed to store attendance"}), 500
+
+    if result["accepted"]:
+        live_feed.invalidate()
+    current_app.logger.info(
+        f"📥 Device sync from {request.headers.get('X-DEVICE-ID', 'device')}: "
+        f"{result['accepted']} new, {result['duplicates']} duplicate, {result['rejected']} rejected"
+    )
+
+    keys = {"accepted": [], "duplicate": [], "rejected": []}
+    for record in result["results"]:
+        keys[record["status"]].append(record["idempotency_key"])
+    return jsonify({
+        "accepted": sorted(keys["accepted"]),
+        "duplicates": keys["duplicate"],
+        "rejected": keys["rejected"],
+    }), 200
@@ -1,14 +1,53 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from sqlalchemy import func, or_, literal_column
 
 from app.extensions import db
 from app.models.student import Student
 from app.models.embedding import Embedding
-from app.services.face_engine import get_face_encoding, encoding_to_db
-from app.services.matcher import find_best_match
+from app.services.face_engine import get_face_encoding, encoding_error_response, encoding_to_db
+from app.services.matcher import find_duplicate, find_sharded_match, active_student_embeddings
+from app.services import shards
+from app.services.live import live_feed
+from app.services.response_cache import cached
+from app.services.archive import archive_student, restore_student, purge_in_background
 
 bp = Blueprint("enroll", __name__)
 
+STUDENT_FIELDS = {
+    "id": Student.id,
+    "first_name": Student.first_name,
+    "last_name": Student.last_name,
+    "admission_number": Student.admission_number,
+    "role": Student.role,
+    "is_active": Student.is_active,
+}
+DEFAULT_STUDENT_FIELDS = ("id", "first_name", "last_name", "admission_number", "role")
+MAX_PAGE_SIZE = 500
+
+
+def _like_escape(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def student_search(q, contains=False):
+    """
+    Case-insensitive search on name and admission number. Prefix mode
+    matches the lower() pattern indexes; contains mode is served by the
+    trigram indexes where pg_trgm is installed.
+    """
+    term = _like_escape(q.lower())
+    pattern = f"%{term}%" if contains else f"{term}%"
+    full_name = func.lower(Student.first_name + literal_column("' '") + Student.last_name)
+    clauses = [
+        func.lower(Student.first_name).like(pattern, escape="\\"),
+        func.lower(Student.last_name).like(pattern, escape="\\"),
+        func.lower(Student.admission_number).like(pattern, escape="\\"),
+    ]
+    if contains or " " in term:
+        clauses.append(full_name.like(pattern, escape="\\"))
+    return or_(*clauses)
+
 
 @bp.route("/student", methods=["POST"])
 @jwt_required()
@@ -54,8 +93,10 @@ def enroll_student():
             return jsonify({"error": "No face detected. Use a clear image with one face."}), 400
             
         if isinstance(encoding_result, dict) and "error" in encoding_result:
-            current_app.logger.warning(f"⚠️ Quality check failed: {encoding_result['error']}")
-            return jsonify(encoding_result), 400
+            status, headers = encoding_error_response(encoding_result)
+            if status == 400:
+                current_app.logger.warning(f"⚠️ Quality check failed: {encoding_result['error']}")
+            return jsonify(encoding_result), status, headers
             
         encoding = encoding_result
     except Exception as e:
@@ -64,11 +105,12 @@ def enroll_student():
 
     # 🛑 Check for duplicate face
     try:
-        all_embeddings = Embedding.query.filter(Embedding.student_id.isnot(None)).all()
-        # match = find_best_match(all_embeddings, encoding) # Using default tolerance
-        # Maybe use stricter tolerance for enrollment to prevent false duplicates? 
-        # But we want to prevent enrolling the same person twice.
-        match = find_best_match(all_embeddings, encoding, tolerance=0.5) 
+        tolerance = current_app.config["DUPLICATE_TOLERANCE"]
+        if shards.sharding_enabled():
+            match = find_sharded_match(encoding, tolerance=tolerance, margin=0)
+        else:
+            # Any face this close is the same person; no need to rank them all
+            match = find_duplicate(active_student_embeddings(), encoding, tolerance=tolerance)
 
         if match:
             existing_student = Student.query.get(match.student_id)
@@ -77,6 +119,10 @@ def enroll_student():
                 "error": f"This face is already registered as {existing_student.first_name} {existing_student.last_name} ({existing_student.admission_number})"
             }), 409
             
+    except shards.ShardUnavailable as e:
+        # A face on the missing shard would slip past the check
+        current_app.logger.error(f"❌ Duplicate check incomplete: {e}")
+        return jsonify({"error": "Duplicate check unavailable, a gallery shard is down. Try again later."}), 503
     except Exception as e:
         current_app.logger.warning(f"⚠️ Warning: Face duplicate check failed: {e}")
         # We might choose to proceed or fail. Failing is safer to maintain integrity.
@@ -105,6 +151,14 @@ def enroll_student():
         db.session.commit()
         
         current_app.logger.info(f"✅ Student enrolled: {student.id}")
+        live_feed.invalidate()
+
+        if shards.sharding_enabled():
+            try:
+                shards.upsert_embeddings([embedding])
+            except Exception as e:
+                # DB is the source of truth; `flask shards sync` repairs this
+                current_app.logger.error(f"❌ Shard gallery update failed: {e}")
 
         return jsonify({
             "success": True,
@@ -126,22 +180,55 @@ def enroll_student():
 
 @bp.route("/students", methods=["GET"])
 @jwt_required()
+@cached("students")
 def get_students():
     """
-    Get list of all enrolled students
+    List enrolled students, newest first.
+    Optional: limit + cursor (keyset pages), q (name / admission number
+    prefix, or substring with match=contains), fields (comma separated).
+    Without limit the full list is returned, as before.
     """
     try:
-        students = Student.query.order_by(Student.id.desc()).all()
-        
+        fields = request.args.get("fields")
+        fields = [f for f in fields.split(",") if f in STUDENT_FIELDS] if fields else list(DEFAULT_STUDENT_FIELDS)
+        if not fields:
+            return jsonify({"error": f"fields must be a subset of {', '.join(STUDENT_FIELDS)}"}), 400
+        limit = request.args.get("limit", type=int)
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+        cursor = request.args.get("cursor", type=int)
+        q = (request.args.get("q") or "").strip()
+
+        columns = [STUDENT_FIELDS[f] for f in fields]
+        if "id" not in fields:
+            columns.append(Student.id)  # needed for the cursor
+        query = db.select(*columns).order_by(Student.id.desc())
+        if q:
+            query = query.where(student_search(q, contains=request.args.get("match") == "contains"))
+
+        # Counted on the first page only; later pages reuse the client's total
+        total = None
+        if cursor is None:
+            total = db.session.execute(
+                query.with_only_columns(func.count()).select_from(Student).order_by(None)
+            ).scalar()
+
+        if cursor is not None:
+            query = query.where(Student.id < cursor)
+        if limit is not None:
+            query = query.limit(limit + 1)
+        rows = db.session.execute(query).all()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1].id
+
         return jsonify({
             "success": True,
-            "students": [{
-                "id": s.id,
-                "first_name": s.first_name,
-                "last_name": s.last_name,
-                "admission_number": s.admission_number,
-                "role": s.role
-            } for s in students]
+            "students": [{f: getattr(row, f) for f in fields} for row in rows],
+            "total": total,
+            "next_cursor": next_cursor
         }), 200
         
     except Exception as e:
@@ -153,36 +240,112 @@ def get_students():
 @jwt_required()
 def delete_student(student_id):
     """
-    Delete a student and all associated records (Attendances, Embeddings).
+    Archives the student, like POST /student/<id>/archive.
+    With ?purge=true the student and all associated records (attendance,
+    archive, summaries, embeddings) are permanently deleted instead.
     ADMIN ONLY
     """
     claims = get_jwt()
     if claims.get("role") != "admin":
         return jsonify({"error": "Admin access required"}), 403
 
+    if request.args.get("purge", "").lower() != "true":
+        return _archive(student_id)
+
     try:
         student = Student.query.get(student_id)
         if not student:
             return jsonify({"error": "Student not found"}), 404
 
         # 1. Delete associated attendances (if not cascaded by DB)
-        from app.models.attendance import Attendance
+        from app.models.attendance import Attendance, AttendanceArchive, AttendanceSummary
         Attendance.query.filter_by(student_id=student_id).delete()
+        AttendanceArchive.query.filter_by(student_id=student_id).delete()
+        AttendanceSummary.query.filter_by(student_id=student_id).delete()
+        from app.models.course import course_students
+        db.session.execute(db.delete(course_students).where(course_students.c.student_id == student_id))
 
         # 2. Delete associated embeddings
+        embedding_ids = [e.id for e in Embedding.query.filter_by(student_id=student_id)]
         Embedding.query.filter_by(student_id=student_id).delete()
 
         # 3. Delete student record
         db.session.delete(student)
         db.session.commit()
+        live_feed.invalidate()
 
-        current_app.logger.info(f"🗑️ Student deleted (ID: {student_id}) and all records cleared.")
+        if embedding_ids and shards.sharding_enabled():
+            try:
+                shards.remove_embeddings(embedding_ids)
+            except Exception as e:
+                current_app.logger.error(f"❌ Shard gallery removal failed: {e}")
+
+        current_app.logger.info(f"🗑️ Student purged (ID: {student_id}) and all records cleared.")
         return jsonify({
             "success": True, 
-            "message": f"Student deleted successfully."
+            "message": f"Student permanently deleted."
         }), 200
 
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"❌ Deletion Error: {str(e)}")
         return jsonify({"error": f"Deletion failed: {str(e)}"}), 500
+
+
+@bp.route("/student/<int:student_id>/archive", methods=["POST"])
+@jwt_required()
+def archive_student_route(student_id):
+    """
+    Soft-delete: the student stops matching immediately; their attendance
+    is moved to attendance_archive in the background.
+    ADMIN ONLY
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Admin access required"}), 403
+    return _archive(student_id)
+
+
+def _archive(student_id):
+    student = Student.query.get(student_id)
+    if not student:
+        return jsonify({"error": "Student not found"}), 404
+
+    try:
+        archive_student(student)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"❌ Archive Error: {str(e)}")
+        return jsonify({"error": f"Archive failed: {str(e)}"}), 500
+
+    live_feed.invalidate()
+    purge_in_background(current_app._get_current_object())
+    current_app.logger.info(f"🗄️ Student archived (ID: {student_id})")
+    return jsonify({"success": True, "message": "Student archived."}), 200
+
+
+@bp.route("/student/<int:student_id>/restore", methods=["POST"])
+@jwt_required()
+def restore_student_route(student_id):
+    """
+    Re-activates an archived student. Archived history stays archived.
+    ADMIN ONLY
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Admin access required"}), 403
+
+    student = Student.query.get(student_id)
+    if not student:
+        return jsonify({"error": "Student not found"}), 404
+
+    try:
+        restore_student(student)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"❌ Restore Error: {str(e)}")
+        return jsonify({"error": f"Restore failed: {str(e)}"}), 500
+
+    live_feed.invalidate()
+    current_app.logger.info(f"♻️ Student restored (ID: {student_id})")
+    return jsonify({"success": True, "message": "Student restored."}), 200
@@ -1,10 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 
 from app.extensions import db
 from app.models.student import Student
 from app.models.embedding import Embedding
 from app.services.face_engine import get_face_encoding
+from app.services import shards
 
 bp = Blueprint("faces", __name__)
 
@@ -43,6 +44,13 @@ def register_face():
     db.session.add(embedding)
     db.session.commit()
 
+    if shards.sharding_enabled():
+        try:
+            shards.upsert_embeddings([embedding])
+        except Exception as e:
+            # DB is the source of truth; `flask shards sync` repairs this
+            current_app.logger.error(f"❌ Shard gallery update failed: {e}")
+
     return jsonify({
         "success": True,
         "student": {
@@ -1,7 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.setting import SystemSetting
 from app.extensions import db
+from app.services.face_engine import ENCODING_PROFILES, PROFILE_SETTINGS
 
 bp = Blueprint("settings", __name__)
 
@@ -9,7 +10,10 @@ bp = Blueprint("settings", __name__)
 @jwt_required()
 def get_settings():
     return jsonify({
-        "school_start_time": SystemSetting.get_val("school_start_time", "08:00")
+        "school_start_time": SystemSetting.get_val("school_start_time", "08:00"),
+        "school_timezone": current_app.config.get("SCHOOL_TIMEZONE", ""),
+        **{key: SystemSetting.get_val(key, default) for key, default in PROFILE_SETTINGS.items()},
+        "encoding_profiles": list(ENCODING_PROFILES),
     })
 
 @bp.route("/update", methods=["POST"])
@@ -25,6 +29,10 @@ def update_settings():
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
+    for key in PROFILE_SETTINGS:
+        if key in data and data[key] not in ENCODING_PROFILES:
+            return jsonify({"error": f"{key} must be one of {list(ENCODING_PROFILES)}"}), 400
+
     updated_keys = []
     for key, value in data.items():
         setting = SystemSetting.query.filter_by(key=key).first()
@@ -0,0 +1,236 @@
+"""
+Admission control for the unauthenticated biometric endpoints
+(/attendance/verify, /auth/face-login). Each request costs a dlib pass on
+the biometric service, so two checks run before the upload is read:
+
+- rate_limit: a token bucket per client (device, else IP). Buckets live
+  in process memory, or in a Redis-compatible server at RATE_LIMIT_REDIS_URL
+  so every worker shares them.
+- biometric_admission: sheds load when the biometric service already has
+  BIOMETRIC_MAX_QUEUE_DEPTH encodes in progress (its /load endpoint).
+"""
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from flask import request, jsonify, current_app
+
+from app.services.metrics import ADMISSION_REJECTED
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+# In-memory buckets kept before idle ones are pruned
+MAX_BUCKETS = 10000
+
+# Atomic refill-and-take; returns {allowed, seconds until a token is available}
+_REDIS_BUCKET = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate, capacity = tonumber(ARGV[1]), tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring((1 - tokens) / rate)}
+"""
+
+
+def parse_limit(value):
+    """"30/minute" -> (tokens per second, bucket capacity)."""
+    count, _, period = value.partition("/")
+    count = int(count)
+    if count <= 0 or period not in _PERIODS:
+        raise ValueError(f"Rate limit must look like 30/minute, got {value!r}")
+    return count / _PERIODS[period], count
+
+
+class MemoryBuckets:
+    """Token buckets in this process (each worker keeps its own)."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity):
+        """Takes one token. Returns (allowed, seconds until the next token)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > MAX_BUCKETS:
+                self._prune(now)
+        return allowed, max(0.0, (1 - tokens) / rate)
+
+    def _prune(self, now):
+        # A bucket idle long enough to be full again carries no state
+        idle = [k for k, (_, updated) in self._buckets.items() if now - updated > 3600]
+        for key in idle or list(self._buckets)[:len(self._buckets) // 2]:
+            del self._buckets[key]
+
+
+class RedisBuckets:
+    """Token buckets shared by every worker through a Redis-compatible server."""
+
+    def __init__(self, url):
+        import redis  # optional dependency, only needed with RATE_LIMIT_REDIS_URL
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._script = self._client.register_script(_REDIS_BUCKET)
+
+    def take(self, key, rate, capacity):
+        allowed, wait = self._script(keys=[f"ratelimit:{key}"], args=[rate, capacity])
+        return bool(allowed), max(0.0, float(wait))
+
+
+_buckets = MemoryBuckets()
+
+
+def init_app(app):
+    global _buckets
+    url = app.config.get("RATE_LIMIT_REDIS_URL")
+    if url:
+        try:
+            _buckets = RedisBuckets(url)
+        except ImportError:
+            app.logger.error("❌ RATE_LIMIT_REDIS_URL is set but the redis package is missing; using in-memory buckets")
+
+
+def client_key():
+    """
+    Whose bucket a request draws from: the device for kiosks holding the
+    device key, else the client IP (RATE_LIMIT_TRUSTED_PROXIES hops back
+    in X-Forwarded-For when behind a proxy).
+    """
+    from app.routes.devices import device_key_valid
+
+    if device_key_valid():
+        device = request.headers.get("X-DEVICE-ID") or request.headers.get("X-DEVICE-KEY", "")
+        return "device:" + hashlib.sha256(device.encode()).hexdigest()[:16]
+
+    hops = current_app.config.get("RATE_LIMIT_TRUSTED_PROXIES", 0)
+    forwarded = [ip.strip() for ip in request.headers.get("X-Forwarded-For", "").split(",") if ip.strip()]
+    if hops and forwarded:
+        return "ip:" + forwarded[-min(hops, len(forwarded))]
+    return f"ip:{request.remote_addr}"
+
+
+def rate_limit(setting):
+    """Token-bucket limit per client, from the config value named `setting` (e.g. "30/minute")."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("RATE_LIMIT_ENABLED", True):
+                return view(*args, **kwargs)
+
+            rate, capacity = parse_limit(current_app.config[setting])
+            key = f"{request.endpoint}:{client_key()}"
+            try:
+                allowed, wait = _buckets.take(key, rate, capacity)
+            except Exception as e:
+                # A broken limiter store must not take the gates down
+                current_app.logger.error(f"❌ Rate limiter unavailable: {e}")
+                allowed, wait = True, 0.0
+            if not allowed:
+                ADMISSION_REJECTED.inc(endpoint=request.endpoint, reason="rate_limit")
+                current_app.logger.warning(f"⚠️ Rate limited {key}")
+                return jsonify({"error": "Too many requests, slow down"}), 429, {
+                    "Retry-After": str(max(1, round(wait)))
+                }
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class BiometricLoad:
+    """
+    The biometric service's encodes in progress, polled at most every
+    `interval` seconds. Requests admitted here since the last poll count
+    until they finish, so a burst between polls can't overshoot the limit.
+    """
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self._depth = 0
+        self._polled_at = 0.0
+        self._polling = False
+        self._admitted = 0
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _poll(self):
+        import requests
+        from app.services.face_engine import _service_url
+
+        try:
+            response = requests.get(f"{_service_url()}/load", timeout=0.5)
+            if response.status_code != 200:
+                return 0  # older service without /load
+            return int(response.json().get("in_flight", 0))
+        except (requests.RequestException, ValueError):
+            return 0  # unreachable: let the encode call report it
+
+    def admit(self, max_depth):
+        """
+        The poll epoch to pass to release() when the service has room for
+        one more encode, else None.
+        """
+        with self._lock:
+            # One thread polls; the others use the last reading meanwhile
+            poll = not self._polling and time.monotonic() - self._polled_at > self.interval
+            if poll:
+                self._polling = True
+        if poll:
+            depth = 0
+            try:
+                depth = self._poll()
+            finally:
+                with self._lock:
+                    self._depth, self._admitted = depth, 0
+                    self._epoch += 1
+                    self._polling = False
+                    self._polled_at = time.monotonic()
+
+        with self._lock:
+            if self._depth + self._admitted >= max_depth:
+                return None
+            self._admitted += 1
+            return self._epoch
+
+    def release(self, epoch):
+        """An admitted request finished; after a newer poll it is already off the count."""
+        with self._lock:
+            if epoch == self._epoch:
+                self._admitted -= 1
+
+
+biometric_load = BiometricLoad()
+
+
+def biometric_admission(view):
+    """Rejects with 503 while the biometric service is at BIOMETRIC_MAX_QUEUE_DEPTH."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        max_depth = current_app.config.get("BIOMETRIC_MAX_QUEUE_DEPTH", 0)
+        if not max_depth:
+            return view(*args, **kwargs)
+
+        epoch = biometric_load.admit(max_depth)
+        if epoch is None:
+            ADMISSION_REJECTED.inc(endpoint=request.endpoint, reason="biometric_busy")
+            return jsonify({"error": "Biometric service is busy, please try again"}), 503, {"Retry-After": "1"}
+        try:
+            return view(*args, **kwargs)
+        finally:
+            biometric_load.release(epoch)
+    return wrapper
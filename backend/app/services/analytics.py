@@ -0,0 +1,348 @@
+"""
+Columnar attendance analytics for the report, export and cohort
+analytics endpoints.
+
+Attendance in a date range is pulled once as parallel NumPy arrays (ids,
+student ids, timestamps on the school's clock, status codes); trend, punctuality,
+per-student breakdowns and the exported strings are computed from those
+arrays instead of row by row. Imported by the views that need it, so
+numpy stays out of the API's cold start.
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import String, func, type_coerce
+
+from app.extensions import db
+from app.models.attendance import Attendance
+from app.models.student import Student
+from app.services import school_time
+
+STATUS_CODES = {"Present": 0, "Late": 1}
+STATUS_NAMES = np.array(["Present", "Late"], dtype=object)
+
+
+class AttendanceColumns:
+    """Attendance rows as parallel arrays, newest first."""
+
+    def __init__(self, ids, student_ids, local, status):
+        self.ids = ids                   # int64
+        self.student_ids = student_ids   # int64
+        self.local = local               # datetime64[us], school wall clock
+        self.status = status             # uint8, see STATUS_CODES
+
+    def __len__(self):
+        return len(self.ids)
+
+    def take(self, index):
+        """The rows selected by a slice, mask or index array."""
+        return AttendanceColumns(self.ids[index], self.student_ids[index], self.local[index], self.status[index])
+
+    @property
+    def days(self):
+        return self.local.astype("datetime64[D]")
+
+    @property
+    def time_of_day(self):
+        return self.local - self.days
+
+    @property
+    def late(self):
+        return self.status == STATUS_CODES["Late"]
+
+
+def _timestamp_column():
+    """
+    Attendance.timestamp in a form NumPy converts in bulk, skipping the
+    per-row datetime objects: SQLite's stored text (server local wall
+    clock), or epoch seconds elsewhere.
+    """
+    if db.engine.dialect.name == "sqlite":
+        return type_coerce(Attendance.timestamp, String)
+    return func.extract("epoch", Attendance.timestamp)
+
+
+def _hourly_offsets_us(hours, offset):
+    """offset(datetime) in microseconds for each hour, computed once per distinct hour."""
+    unique, inverse = np.unique(hours, return_inverse=True)
+    offsets = np.array([
+        offset(datetime(1970, 1, 1) + timedelta(hours=int(hour))) // timedelta(microseconds=1)
+        for hour in unique
+    ], dtype=np.int64)
+    return offsets[inverse]
+
+
+def _local_times(values):
+    """
+    School wall clock as datetime64[us], the same days as school_date.
+    Offsets are looked up per hour, so DST changes inside the range are
+    respected.
+    """
+    zone = school_time.zone()
+    if not values or isinstance(values[0], str):
+        wall = np.array(values, dtype="datetime64[us]").astype(np.int64)
+        if zone is None or not len(wall):
+            return wall.astype("datetime64[us]")
+        # Server-local wall clock -> epoch, then on to the school's clock
+        epoch_us = wall - _hourly_offsets_us(wall // 3_600_000_000, lambda naive: naive.astimezone().utcoffset())
+    else:
+        epoch_us = np.round(np.array(values, dtype=np.float64) * 1_000_000).astype(np.int64)
+
+    def school_offset(utc_hour):
+        return utc_hour.replace(tzinfo=timezone.utc).astimezone(zone).utcoffset()
+
+    return (epoch_us + _hourly_offsets_us(epoch_us // 3_600_000_000, school_offset)).astype("datetime64[us]")
+
+
+def load(start_date, end_date, student_id=None):
+    """
+    School-day attendance from start_date through end_date in one query,
+    as columns. Class-session scans are left out: their Late/Present is
+    relative to the class, and sessions have their own report.
+    """
+    query = (
+        db.select(Attendance.id, Attendance.student_id, _timestamp_column(), Attendance.status)
+        .where(Attendance.on_days(start_date, end_date), Attendance.session_id.is_(None))
+        .order_by(Attendance.timestamp.desc())
+    )
+    if student_id is not None:
+        query = query.where(Attendance.student_id == student_id)
+    # Core rows: no ORM identity or type processing per row
+    rows = db.session.connection().execute(query).all()
+
+    if not rows:
+        return AttendanceColumns(
+            np.empty(0, np.int64), np.empty(0, np.int64),
+            np.empty(0, "datetime64[us]"), np.empty(0, np.uint8),
+        )
+    ids, student_ids, timestamps, statuses = zip(*rows)
+    return AttendanceColumns(
+        np.array(ids, dtype=np.int64),
+        np.array(student_ids, dtype=np.int64),
+        _local_times(timestamps),
+        (np.array(statuses, dtype=object) == "Late").astype(np.uint8),
+    )
+
+
+def day_range(first, last):
+    """Every day from first through last as datetime64[D]."""
+    return np.arange(np.datetime64(first, "D"), np.datetime64(last, "D") + 1)
+
+
+def daily_presence(columns, days):
+    """Distinct students seen on each of `days`."""
+    if not len(columns):
+        return np.zeros(len(days), dtype=np.int64)
+    day_index = (columns.days - days[0]).astype(np.int64)
+    keep = (day_index >= 0) & (day_index < len(days))
+    # One entry per (day, student) pair, then count pairs per day
+    pairs = np.unique(day_index[keep] * (columns.student_ids.max() + 1) + columns.student_ids[keep])
+    return np.bincount(pairs // (columns.student_ids.max() + 1), minlength=len(days))
+
+
+def percentages(counts, total):
+    """int(count / total * 100) per element (0 when total is 0)."""
+    if total <= 0:
+        return np.zeros(len(counts), dtype=np.int64)
+    return (counts / total * 100).astype(np.int64)
+
+
+def on_time(columns, cutoff):
+    """Mask of scans at or before the `cutoff` time of day (a datetime.time)."""
+    limit = np.timedelta64(
+        ((cutoff.hour * 60 + cutoff.minute) * 60 + cutoff.second) * 1_000_000 + cutoff.microsecond, "us"
+    )
+    return columns.time_of_day <= limit
+
+
+def student_breakdown(columns, cutoff):
+    """
+    Per-student totals over the loaded range: records, days attended,
+    late and on-time scans and the on-time rate (%), as parallel arrays
+    sorted by student id.
+    """
+    student_ids, inverse = np.unique(columns.student_ids, return_inverse=True)
+    n = len(student_ids)
+    day_pairs = np.unique(inverse * (1 << 32) + columns.days.astype(np.int64))
+    records = np.bincount(inverse, minlength=n)
+    on_time_count = np.bincount(inverse, weights=on_time(columns, cutoff), minlength=n).astype(np.int64)
+    return {
+        "student_id": student_ids,
+        "records": records,
+        "days": np.bincount(day_pairs >> 32, minlength=n),
+        "late": np.bincount(inverse, weights=columns.late, minlength=n).astype(np.int64),
+        "on_time": on_time_count,
+        "on_time_rate": on_time_count * 100 // np.maximum(records, 1),
+    }
+
+
+def students(student_ids):
+    """(names, admission numbers) as object arrays aligned with `student_ids`."""
+    unique = np.unique(student_ids)
+    found = {
+        sid: (f"{first} {last}", admission)
+        for sid, first, last, admission in db.session.execute(
+            db.select(Student.id, Student.first_name, Student.last_name, Student.admission_number)
+            .where(Student.id.in_(unique.tolist()))
+        )
+    }
+    names = np.array([found.get(int(sid), ("", ""))[0] for sid in unique], dtype=object)
+    admissions = np.array([found.get(int(sid), ("", ""))[1] for sid in unique], dtype=object)
+    position = np.searchsorted(unique, student_ids)
+    return names[position], admissions[position]
+
+
+def format_dates(columns):
+    """YYYY-MM-DD strings."""
+    return columns.days.astype(str).astype(object)
+
+
+def format_times(columns):
+    """hh:MM AM/PM strings, as strftime("%I:%M %p")."""
+    if not len(columns):
+        return np.empty(0, dtype=object)
+    minutes = (columns.time_of_day // np.timedelta64(1, "m")).astype(np.int64)
+    hour, minute = np.divmod(minutes, 60)
+    hour12 = np.where(hour % 12 == 0, 12, hour % 12)
+    suffix = np.where(hour < 12, " AM", " PM")
+    hh_mm = np.char.add(np.char.add(np.char.zfill(hour12.astype(str), 2), ":"), np.char.zfill(minute.astype(str), 2))
+    return np.char.add(hh_mm, suffix).astype(object)
+
+
+# -----------------------------
+# Cohort analytics
+# -----------------------------
+COHORT_SORTS = ("absence_rate", "late_rate", "longest_absence_streak", "days_present", "name")
+
+# (date, window days, table generations) -> cohort; only today's are kept
+_cohorts = {}
+_cohorts_lock = threading.Lock()
+# Same keys -> lock held while that cohort is being computed
+_cohort_locks = {}
+
+
+def _longest_runs(mask):
+    """Longest run of True along each row of a 2-D boolean array."""
+    run = np.zeros(mask.shape[0], dtype=np.int64)
+    best = np.zeros(mask.shape[0], dtype=np.int64)
+    for column in mask.T:
+        run = (run + 1) * column
+        np.maximum(best, run, out=best)
+    return best
+
+
+def cohort(start_date, end_date):
+    """
+    Absence and lateness of every active student from start_date through
+    end_date, in one pass over the range. School days are the days on
+    which anyone was scanned, so weekends and holidays never count as
+    absences. As in the attendance summaries, a day is late when every scan
+    that day was marked Late. Arrays are aligned and sorted by student id.
+    """
+    roster = db.session.execute(
+        db.select(Student.id, Student.first_name, Student.last_name, Student.admission_number)
+        .where(Student.is_active.isnot(False))
+        .order_by(Student.id)
+    ).all()
+    student_ids = np.array([r[0] for r in roster], dtype=np.int64)
+    columns = load(start_date, end_date)
+    school_days = np.unique(columns.days)
+
+    # Student x school day grids
+    present = np.zeros((len(student_ids), len(school_days)), dtype=bool)
+    on_time_day = np.zeros_like(present)
+    if len(student_ids) and len(columns):
+        row = np.searchsorted(student_ids, columns.student_ids)
+        known = (row < len(student_ids)) & (student_ids[np.minimum(row, len(student_ids) - 1)] == columns.student_ids)
+        day = np.searchsorted(school_days, columns.days)
+        present[row[known], day[known]] = True
+        punctual = known & ~columns.late
+        on_time_day[row[punctual], day[punctual]] = True
+
+    days_present = present.sum(axis=1)
+    days_late = (present & ~on_time_day).sum(axis=1)
+    days_absent = len(school_days) - days_present
+    return {
+        "start": start_date,
+        "end": end_date,
+        "school_days": len(school_days),
+        "student_id": student_ids,
+        "name": np.array([f"{r[1]} {r[2]}" for r in roster], dtype=object),
+        "admission_number": np.array([r[3] for r in roster], dtype=object),
+        "days_present": days_present,
+        "days_absent": days_absent,
+        "days_late": days_late,
+        "absence_rate": days_absent / len(school_days) if len(school_days) else np.zeros(len(student_ids)),
+        "late_rate": days_late / np.maximum(days_present, 1),
+        "longest_absence_streak": _longest_runs(~present),
+        "computed_at": datetime.now().astimezone().isoformat(),
+    }
+
+
+def cached_cohort(days, generations=()):
+    """
+    cohort() over the `days` complete days ending yesterday, computed at
+    most once per day per window (and per `generations` of the tables it
+    reads), so today's scans don't invalidate it. Concurrent callers for
+    the same key wait for one computation; other keys are not blocked.
+    """
+    today = school_time.today()
+    key = (today, days, tuple(generations))
+    with _cohorts_lock:
+        if key in _cohorts:
+            return _cohorts[key]
+        for stale in [k for k in _cohort_locks if k[0] != today]:
+            del _cohort_locks[stale]
+        compute_lock = _cohort_locks.setdefault(key, threading.Lock())
+
+    with compute_lock:
+        with _cohorts_lock:
+            if key in _cohorts:
+                return _cohorts[key]
+        end = today - timedelta(days=1)
+        data = cohort(end - timedelta(days=days - 1), end)
+        with _cohorts_lock:
+            # Older days, and this window at superseded generations
+            for stale in [k for k in _cohorts if k[0] != today or k[1] == days]:
+                del _cohorts[stale]
+            _cohorts[key] = data
+            _cohort_locks.pop(key, None)
+        return data
+
+
+def cohort_page(data, sort="absence_rate", descending=True, offset=0, limit=50,
+                min_absence_rate=None, min_late_rate=None):
+    """
+    Filters and sorts a cohort, returning (total matching, rows for
+    [offset, offset + limit)). Ties keep student id order.
+    """
+    index = np.arange(len(data["student_id"]))
+    if min_absence_rate is not None:
+        index = index[data["absence_rate"][index] >= min_absence_rate]
+    if min_late_rate is not None:
+        index = index[data["late_rate"][index] >= min_late_rate]
+
+    key = data[sort][index]
+    if sort == "name":
+        order = np.argsort(key, kind="stable")
+        if descending:
+            order = order[::-1]
+    else:
+        order = np.argsort(-key if descending else key, kind="stable")
+    page = index[order][offset:offset + limit]
+
+    return len(index), [
+        {
+            "id": int(data["student_id"][i]),
+            "name": data["name"][i],
+            "admission_number": data["admission_number"][i],
+            "days_present": int(data["days_present"][i]),
+            "days_absent": int(data["days_absent"][i]),
+            "days_late": int(data["days_late"][i]),
+            "absence_rate": round(float(data["absence_rate"][i]), 4),
+            "late_rate": round(float(data["late_rate"][i]), 4),
+            "longest_absence_streak": int(data["longest_absence_streak"][i]),
+        }
+        for i in page
+    ]
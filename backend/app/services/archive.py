@@ -0,0 +1,99 @@
+import threading
+import time
+
+from flask import current_app
+
+from app.extensions import db
+from app.models.attendance import Attendance, AttendanceArchive, AttendanceSummary
+from app.models.student import Student
+from app.models.embedding import Embedding
+from app.services import shards
+
+_purge_lock = threading.Lock()
+
+
+def archive_student(student):
+    """
+    Soft-deletes a student: marks them inactive and drops their embeddings
+    from the shard galleries. History stays until the purge job moves it.
+    """
+    student.is_active = False
+    db.session.commit()
+
+    if shards.sharding_enabled():
+        embedding_ids = [e.id for e in Embedding.query.filter_by(student_id=student.id)]
+        if embedding_ids:
+            try:
+                shards.remove_embeddings(embedding_ids)
+            except Exception as e:
+                # Verify re-checks is_active, so a stale shard entry never matches
+                current_app.logger.error(f"❌ Shard gallery removal failed: {e}")
+
+
+def restore_student(student):
+    student.is_active = True
+    db.session.commit()
+
+    if shards.sharding_enabled():
+        embeddings = Embedding.query.filter_by(student_id=student.id).all()
+        if embeddings:
+            try:
+                shards.upsert_embeddings(embeddings)
+            except Exception as e:
+                current_app.logger.error(f"❌ Shard gallery update failed: {e}")
+
+
+def purge_inactive(batch_size=1000, pause=0.0):
+    """
+    Moves attendance of inactive students into attendance_archive, one
+    committed batch at a time so locks stay short. Returns rows moved.
+    """
+    inactive = db.select(Student.id).where(Student.is_active.is_(False))
+    columns = ("id", "student_id", "timestamp", "status", "idempotency_key", "school_date", "session_id")
+    moved = 0
+    while True:
+        ids = db.session.execute(
+            db.select(Attendance.id)
+            .where(Attendance.student_id.in_(inactive))
+            .order_by(Attendance.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            # Their summaries covered the rows just moved out
+            db.session.execute(db.delete(AttendanceSummary).where(AttendanceSummary.student_id.in_(inactive)))
+            db.session.commit()
+            break
+
+        db.session.execute(
+            db.insert(AttendanceArchive).from_select(
+                columns,
+                db.select(*(getattr(Attendance, c) for c in columns)).where(Attendance.id.in_(ids)),
+            )
+        )
+        db.session.execute(db.delete(Attendance).where(Attendance.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+        if pause:
+            time.sleep(pause)  # leave room for scans between batches
+    return moved
+
+
+def purge_in_background(app):
+    """Runs purge_inactive on a daemon thread, unless one is already running."""
+    def run():
+        if not _purge_lock.acquire(blocking=False):
+            return
+        try:
+            with app.app_context():
+                moved = purge_inactive(
+                    batch_size=app.config.get("ARCHIVE_PURGE_BATCH", 1000),
+                    pause=app.config.get("ARCHIVE_PURGE_PAUSE_MS", 50) / 1000,
+                )
+                if moved:
+                    app.logger.info(f"🗄️ Archived {moved} attendance rows of inactive students")
+        except Exception as e:
+            app.logger.error(f"❌ Attendance purge failed: {e}")
+        finally:
+            _purge_lock.release()
+
+    threading.Thread(target=run, name="attendance-purge", daemon=True).start()
@@ -0,0 +1,256 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.extensions import db
+from app.models.attendance import Attendance
+from app.services import summaries, school_time
+from app.services.metrics import ATTENDANCE_FLUSH_SECONDS, ATTENDANCE_FLUSH_ROWS, ATTENDANCE_QUARANTINED
+
+
+def insert_ignoring_duplicates(rows):
+    """
+    Multi-row INSERT of attendance dicts that skips rows whose idempotency
+    key already exists (with the same timestamp on PostgreSQL, where the
+    partition key has to be part of the unique constraint). Returns the
+    keys inserted.
+    """
+    if not rows:
+        return set()
+
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        conflict = ["idempotency_key", "timestamp"]
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        conflict = ["idempotency_key"]
+    else:
+        raise RuntimeError(f"Unsupported database for bulk attendance insert: {dialect}")
+
+    # Column defaults don't run per row of a multi-VALUES insert
+    rows = [
+        {**row, "school_date": school_time.school_date(row["timestamp"]), "session_id": row.get("session_id")}
+        for row in rows
+    ]
+    stmt = (
+        insert(Attendance)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=conflict)
+        .returning(Attendance.idempotency_key)
+    )
+    return set(db.session.execute(stmt).scalars())
+
+
+class AttendanceWriter:
+    """
+    Write-behind recorder for verified scans. record() appends the row to
+    a local journal and fsyncs before returning; a background thread moves
+    journaled rows into `attendances` with multi-row inserts. Each row has
+    an idempotency key, so replaying a journal after a crash is safe.
+    Rows the database rejects (e.g. a student deleted meanwhile) are moved
+    to quarantine.jsonl in the journal directory instead of blocking the
+    rest of their segment.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._started = False
+        self._file = None
+        self._pid = os.getpid()
+        self._seq = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("ATTENDANCE_WRITE_BEHIND", False)
+        self.journal_dir = app.config.get("ATTENDANCE_JOURNAL_DIR") or os.path.join(
+            app.instance_path, "attendance-journal"
+        )
+        self.interval = app.config.get("ATTENDANCE_FLUSH_INTERVAL_MS", 250) / 1000
+        self.batch_size = app.config.get("ATTENDANCE_FLUSH_BATCH", 500)
+        app.extensions["attendance_writer"] = self
+
+    def start(self):
+        """
+        Replays journals left by dead processes and starts the flush thread.
+        Called by the server at startup and lazily on the first record().
+        """
+        with self._lock:
+            if self._started or not self.enabled:
+                return
+            self._started = True
+            self._pid = os.getpid()
+            os.makedirs(self.journal_dir, exist_ok=True)
+            self._claim_orphans()
+        threading.Thread(target=self._run, name="attendance-writer", daemon=True).start()
+        atexit.register(self.flush)
+
+    # -----------------------------
+    # Enqueue
+    # -----------------------------
+    def record(self, student_id, status, timestamp=None, session_id=None):
+        """Durably enqueues one attendance row and returns it."""
+        self.start()
+        row = {
+            "idempotency_key": uuid.uuid4().hex,
+            "student_id": student_id,
+            "status": status,
+            "timestamp": (timestamp or datetime.now().astimezone()).isoformat(),
+            "session_id": session_id,
+        }
+        line = json.dumps(row) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self._active_path(), "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return row
+
+    # -----------------------------
+    # Flush
+    # -----------------------------
+    def _active_path(self):
+        return os.path.join(self.journal_dir, f"active-{self._pid}.log")
+
+    def _rotate(self):
+        """Seals the active journal so new scans go to a fresh file."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+            self._seq += 1
+            os.replace(
+                self._active_path(),
+                os.path.join(self.journal_dir, f"pending-{self._pid}-{self._seq}.log"),
+            )
+
+    def _claim_orphans(self):
+        """Takes over journals left by processes that are no longer running."""
+        # A restarted container can reuse our pid; never overwrite its segments
+        pattern = os.path.join(self.journal_dir, f"pending-{self._pid}-*.log")
+        self._seq = max([self._seq] + [_segment_seq(p) for p in glob.glob(pattern)])
+
+        for path in glob.glob(os.path.join(self.journal_dir, "*.log")):
+            name = os.path.basename(path)
+            try:
+                owner = int(name.split("-")[1].split(".")[0])
+            except (IndexError, ValueError):
+                continue
+            if owner == self._pid or _pid_alive(owner):
+                continue
+            self._seq += 1
+            os.replace(path, os.path.join(self.journal_dir, f"pending-{self._pid}-{self._seq}.log"))
+
+    def flush(self):
+        """Moves every sealed journal into the database. Returns rows inserted."""
+        if not self.enabled:
+            return 0
+        with self._flush_lock:
+            self._rotate()
+            pattern = os.path.join(self.journal_dir, f"pending-{self._pid}-*.log")
+            inserted = 0
+            with self.app.app_context():
+                for path in sorted(glob.glob(pattern), key=_segment_seq):
+                    inserted += self._flush_segment(path)
+            return inserted
+
+    def _flush_segment(self, path):
+        with open(path, encoding="utf-8") as f:
+            rows = []
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash mid-write
+                row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                rows.append(row)
+
+        started = time.perf_counter()
+        try:
+            try:
+                inserted = self._insert(rows)
+            except (IntegrityError, DataError) as e:
+                # One bad row fails its whole batch; find it row by row
+                db.session.rollback()
+                current_app.logger.warning(f"⚠️ Attendance batch rejected, inserting row by row: {e.orig}")
+                inserted = self._insert_each(rows)
+        except Exception as e:
+            # Anything else (database down, ...) retries the whole segment later
+            db.session.rollback()
+            current_app.logger.error(f"❌ Attendance flush failed, will retry: {e}")
+            return 0
+        finally:
+            db.session.remove()
+
+        os.remove(path)
+        ATTENDANCE_FLUSH_SECONDS.observe(time.perf_counter() - started)
+        ATTENDANCE_FLUSH_ROWS.observe(inserted)
+        return inserted
+
+    def _insert(self, rows):
+        inserted = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            keys = insert_ignoring_duplicates(batch)
+            summaries.record([row for row in batch if row["idempotency_key"] in keys])
+            inserted += len(keys)
+        db.session.commit()
+        return inserted
+
+    def _insert_each(self, rows):
+        """Commits rows one at a time, quarantining the ones the database rejects."""
+        inserted = 0
+        for row in rows:
+            try:
+                inserted += self._insert([row])
+            except (IntegrityError, DataError) as e:
+                db.session.rollback()
+                self._quarantine(row, e)
+        return inserted
+
+    def _quarantine(self, row, error):
+        current_app.logger.error(f"❌ Attendance row {row['idempotency_key']} quarantined: {error.orig}")
+        ATTENDANCE_QUARANTINED.inc(reason=type(error).__name__)
+        entry = {**row, "timestamp": row["timestamp"].isoformat(), "error": str(error.orig)}
+        with self._lock, open(os.path.join(self.journal_dir, "quarantine.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                self.app.logger.error(f"❌ Attendance writer error: {e}")
+
+
+def _segment_seq(path):
+    return int(os.path.basename(path).rsplit("-", 1)[1].split(".")[0])
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+attendance_writer = AttendanceWriter()
@@ -1,23 +1,129 @@
-import requests
 import os
-import numpy as np
+import time
 from flask import current_app
 
-def get_face_encoding(image_file, is_enrollment=False):
-    """
-    Delegates face encoding to the standalone Biometric Service.
-    """
+from app.services.metrics import BIOMETRIC_CALL_SECONDS
+from app.services import tracing
+
+# Encoding profiles offered by the biometric service (see its profiles.py)
+ENCODING_PROFILES = ("fast", "balanced", "enroll")
+# Profiles an (unauthenticated) scan may ask for; "enroll" costs ~100x a verify
+SCAN_PROFILES = ("fast", "balanced")
+# SystemSetting keys holding the deployment's choice, and their defaults
+PROFILE_SETTINGS = {
+    "verify_encoding_profile": "balanced",
+    "enroll_encoding_profile": "enroll",
+}
+
+# A green /ready is trusted this long before asking again
+READY_TTL = 60
+_ready_until = {}
+# Retry-After (seconds) when the service is down or still warming up
+UNAVAILABLE_RETRY_AFTER = 5
+
+
+def _service_url():
     service_url = os.environ.get("BIOMETRIC_SERVICE_URL", "http://127.0.0.1:5000")
     if not service_url.startswith("http"):
         service_url = f"http://{service_url}"
-    
+    return service_url
+
+
+def biometric_ready(service_url=None):
+    """
+    True once the biometric service has finished warming up (/ready is
+    green). Raises requests.RequestException if it cannot be reached.
+    """
+    import requests
+
+    service_url = service_url or _service_url()
+    if _ready_until.get(service_url, 0) > time.monotonic():
+        return True
+    response = requests.get(f"{service_url}/ready", timeout=10)
+    # 404: a service without a warm-up phase is ready once it answers
+    ready = response.status_code in (200, 404)
+    if ready:
+        _ready_until[service_url] = time.monotonic() + READY_TTL
+    return ready
+
+
+def wait_until_ready(timeout=300, interval=5):
+    """Polls /ready (waking a sleeping instance) until it goes green or timeout."""
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if biometric_ready():
+                print("✅ Biometric service is ready")
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(interval)
+    print("⚠️ Biometric service did not report ready")
+    return False
+
+
+def encoding_profile(is_enrollment=False):
+    """The deployment's profile for verify or enrollment scans."""
+    from app.models.setting import SystemSetting
+
+    key = "enroll_encoding_profile" if is_enrollment else "verify_encoding_profile"
+    profile = SystemSetting.get_val(key, PROFILE_SETTINGS[key])
+    return profile if profile in ENCODING_PROFILES else PROFILE_SETTINGS[key]
+
+
+def _unavailable(message, retry_after=None):
+    return {"error": message, "retry_after": retry_after or UNAVAILABLE_RETRY_AFTER}
+
+
+def encoding_error_response(result):
+    """
+    (status, headers) for an error dict from get_face_encoding: 503 with
+    Retry-After when the service could not encode, 400 when the image was
+    rejected.
+    """
+    if "retry_after" in result:
+        return 503, {"Retry-After": str(result["retry_after"])}
+    return 400, {}
+
+
+def get_face_encoding(image_file, is_enrollment=False, profile=None):
+    """
+    Delegates face encoding to the standalone Biometric Service.
+    `profile` overrides the deployment's encoding profile for this scan.
+    Returns the encoding, None when no face was found, or {"error": ...};
+    the error also carries retry_after when the service is unavailable.
+    """
+    # numpy/requests are imported on first use to keep API cold start fast
+    import numpy as np
+    import requests
+
+    service_url = _service_url()
+
     try:
-        # Prepare multipart form data
-        files = {"image": (image_file.filename, image_file.stream, image_file.content_type)}
-        data = {"is_enrollment": str(is_enrollment).lower()}
-        headers = {"X-API-KEY": os.environ.get("BIOMETRIC_API_KEY", "supersecret-key")}
+        if not biometric_ready(service_url):
+            return _unavailable("Biometric service is warming up, please try again shortly")
+
+        # Stream the upload body as-is (no multipart re-encoding)
+        stream = image_file.stream
+        stream.seek(0)
+        params = {
+            "is_enrollment": str(is_enrollment).lower(),
+            "profile": profile or encoding_profile(is_enrollment),
+        }
+        headers = {
+            "X-API-KEY": os.environ.get("BIOMETRIC_API_KEY", "supersecret-key"),
+            "Content-Type": image_file.mimetype or "application/octet-stream",
+            **tracing.outgoing_headers(),
+        }
         
-        response = requests.post(f"{service_url}/encode", files=files, data=data, headers=headers, timeout=30)
+        started = time.perf_counter()
+        response = requests.post(f"{service_url}/encode", data=stream, params=params, headers=headers, timeout=30)
+        BIOMETRIC_CALL_SECONDS.observe(
+            time.perf_counter() - started, endpoint="encode", outcome=response.status_code
+        )
+        tracing.add_remote_spans("bio", response.headers.get("Server-Timing"))
         
         if response.status_code == 200:
             result = response.json()
@@ -25,21 +131,28 @@ def get_face_encoding(image_file, is_enrollment=False):
         else:
             # Propagate error message from service if available
             error_data = response.json()
-            return {"error": error_data.get("error", "Biometric service error")}
+            error = error_data.get("error", "Biometric service error")
+            if response.status_code == 503:
+                _ready_until.pop(service_url, None)  # restarted; check /ready again
+                retry_after = response.headers.get("Retry-After", "")
+                return _unavailable(error, int(retry_after) if retry_after.isdigit() else None)
+            return {"error": error}
             
     except requests.exceptions.RequestException as e:
         current_app.logger.error(f"❌ Biometric Service Connection Error: {e}")
-        return {"error": "Biometric service is currently unavailable"}
+        return _unavailable("Biometric service is currently unavailable")
     except Exception as e:
         current_app.logger.error(f"❌ Face Engine Error: {e}")
         return {"error": f"Failed to process face: {str(e)}"}
 
 def db_to_encoding(binary_data):
     """Converts binary data from DB back to numpy array."""
+    import numpy as np
     return np.frombuffer(binary_data, dtype=np.float64)
 
 def encoding_to_db(encoding_array):
     """Converts numpy array encoding to binary for DB storage."""
+    import numpy as np
     # Ensure it's a numpy array
     if not isinstance(encoding_array, np.ndarray):
         encoding_array = np.array(encoding_array)
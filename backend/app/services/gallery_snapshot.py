@@ -0,0 +1,58 @@
+import hashlib
+import hmac
+import json
+import struct
+import time
+
+import numpy as np
+
+# Layout: MAGIC | u16 version | u32 header length | header JSON |
+#         float32 matrix (count x dim) | HMAC-SHA256 of everything before it
+MAGIC = b"GSNP"
+VERSION = 1
+SIGNATURE_SIZE = 32
+_PREFIX = struct.Struct("<4sHI")
+
+
+class SnapshotError(Exception):
+    """Raised for a corrupt, tampered or unsupported gallery snapshot."""
+
+
+def build_snapshot(rows, key, settings=None):
+    """
+    rows: iterable of (embedding_id, student_id, name, admission_number, vector_bytes)
+    Returns the signed snapshot as bytes.
+    """
+    rows = list(rows)
+    vectors = [np.frombuffer(r[4], dtype=np.float64) for r in rows]
+    matrix = np.array(vectors, dtype=np.float32).reshape(len(rows), -1) if rows else np.empty((0, 128), np.float32)
+
+    header = json.dumps({
+        "created_at": time.time(),
+        "count": len(rows),
+        "dim": int(matrix.shape[1]),
+        "settings": settings or {},
+        "students": [[r[0], r[1], r[2], r[3]] for r in rows],
+    }, separators=(",", ":")).encode()
+
+    body = _PREFIX.pack(MAGIC, VERSION, len(header)) + header + matrix.tobytes()
+    return body + hmac.new(key.encode(), body, hashlib.sha256).digest()
+
+
+def load_snapshot(blob, key):
+    """Verifies and unpacks a snapshot. Returns (header dict, float64 matrix)."""
+    if len(blob) < _PREFIX.size + SIGNATURE_SIZE:
+        raise SnapshotError("Snapshot truncated")
+
+    body, signature = blob[:-SIGNATURE_SIZE], blob[-SIGNATURE_SIZE:]
+    expected = hmac.new(key.encode(), body, hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise SnapshotError("Snapshot signature mismatch")
+
+    magic, version, header_len = _PREFIX.unpack_from(body)
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot format (version {version})")
+
+    header = json.loads(body[_PREFIX.size:_PREFIX.size + header_len])
+    matrix = np.frombuffer(body, dtype=np.float32, offset=_PREFIX.size + header_len)
+    return header, matrix.reshape(header["count"], header["dim"]).astype(np.float64)
@@ -0,0 +1,166 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models.student import Student
+from app.services import summaries, school_time
+from app.services.attendance_writer import insert_ignoring_duplicates
+from app.services.response_cache import bump
+
+VALID_STATUSES = {"Present", "Late"}
+# Rows per multi-row INSERT (keeps us under driver bind-parameter limits)
+INSERT_CHUNK = 1000
+# Above this, PostgreSQL loads through COPY into a temp table instead
+COPY_THRESHOLD = 2000
+# Device clocks drift; anything further ahead than this is rejected
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+# Generation bumped when an ingest adds rows to days before today
+HISTORY_GENERATION = "attendance_history"
+
+
+class IngestError(Exception):
+    """Raised when a whole ingest batch is unacceptable."""
+
+
+def _parse(record, now):
+    """Returns (row, None) or (None, reason)."""
+    if not isinstance(record, dict):
+        return None, "record must be an object"
+    key = record.get("idempotency_key")
+    if not isinstance(key, str) or not key or len(key) > 64:
+        return None, "idempotency_key must be a string of 1-64 characters"
+    try:
+        student_id = int(record["student_id"])
+        timestamp = datetime.fromisoformat(record["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return None, "student_id and ISO-8601 timestamp required"
+    status = record.get("status", "Present")
+    if status not in VALID_STATUSES:
+        return None, f"status must be one of {sorted(VALID_STATUSES)}"
+    timestamp = timestamp.astimezone()  # naive = server local time
+    if timestamp > now + MAX_CLOCK_SKEW:
+        return None, "timestamp is in the future"
+    return {
+        "idempotency_key": key,
+        "student_id": student_id,
+        "status": status,
+        "timestamp": timestamp,
+    }, None
+
+
+def _copy_ignoring_duplicates(rows):
+    """
+    PostgreSQL bulk path: COPY into a temp table, then one
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING. Returns inserted keys.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            row["idempotency_key"], row["student_id"], row["status"], row["timestamp"].isoformat(),
+            school_time.school_date(row["timestamp"]).isoformat(),
+        ])
+    buffer.seek(0)
+
+    raw = db.session.connection().connection.driver_connection
+    with raw.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE attendance_ingest ("
+            " idempotency_key VARCHAR(64), student_id INTEGER,"
+            " status VARCHAR(20), \"timestamp\" TIMESTAMPTZ, school_date DATE) ON COMMIT DROP"
+        )
+        cursor.copy_expert(
+            "COPY attendance_ingest (idempotency_key, student_id, status, \"timestamp\", school_date)"
+            " FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        cursor.execute(
+            "INSERT INTO attendances (idempotency_key, student_id, status, \"timestamp\", school_date)"
+            " SELECT idempotency_key, student_id, status, \"timestamp\", school_date FROM attendance_ingest"
+            " ON CONFLICT (idempotency_key, \"timestamp\") DO NOTHING RETURNING idempotency_key"
+        )
+        return {key for (key,) in cursor.fetchall()}
+
+
+def bulk_insert(rows):
+    """Inserts attendance rows, skipping known idempotency keys. Returns inserted keys."""
+    if len(rows) >= COPY_THRESHOLD and db.engine.dialect.name == "postgresql":
+        return _copy_ignoring_duplicates(rows)
+    inserted = set()
+    for start in range(0, len(rows), INSERT_CHUNK):
+        inserted |= insert_ignoring_duplicates(rows[start:start + INSERT_CHUNK])
+    return inserted
+
+
+def ingest_records(records, max_records):
+    """
+    Validates and stores a batch of client-recorded attendance in one
+    transaction. Returns per-record results in input order, each with
+    status accepted / duplicate / rejected.
+    """
+    if not isinstance(records, list):
+        raise IngestError("records list required")
+    if len(records) > max_records:
+        raise IngestError(f"At most {max_records} records per request")
+
+    now = datetime.now().astimezone()
+    results, rows, seen = [], [], set()
+    for record in records:
+        row, reason = _parse(record, now)
+        if row is None:
+            key = record.get("idempotency_key") if isinstance(record, dict) else None
+            results.append({"idempotency_key": key, "status": "rejected", "error": reason})
+        elif row["idempotency_key"] in seen:
+            results.append({"idempotency_key": row["idempotency_key"], "status": "duplicate"})
+        else:
+            seen.add(row["idempotency_key"])
+            results.append({"idempotency_key": row["idempotency_key"], "status": None})
+            rows.append(row)
+
+    # Unknown students would fail the foreign key for the whole batch;
+    # archived students no longer take attendance
+    student_ids = {row["student_id"] for row in rows}
+    students = dict(db.session.execute(
+        db.select(Student.id, Student.is_active).where(Student.id.in_(student_ids))
+    ).all()) if student_ids else {}
+    known = {student_id for student_id, is_active in students.items() if is_active is not False}
+    unknown_keys = {row["idempotency_key"] for row in rows if row["student_id"] not in students}
+    archived_keys = {row["idempotency_key"] for row in rows if row["student_id"] in students
+                     and row["student_id"] not in known}
+    rows = [row for row in rows if row["student_id"] in known]
+
+    try:
+        inserted = bulk_insert(rows)
+        summaries.record([row for row in rows if row["idempotency_key"] in inserted])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if inserted:
+        bump("attendances")  # the COPY path bypasses the session hooks
+        today = school_time.today()
+        if any(school_time.school_date(row["timestamp"]) < today
+               for row in rows if row["idempotency_key"] in inserted):
+            # Backfilled past days change the cached cohorts
+            bump(HISTORY_GENERATION)
+
+    for result in results:
+        if result["status"] is not None:
+            continue
+        if result["idempotency_key"] in unknown_keys:
+            result.update(status="rejected", error="unknown student_id")
+        elif result["idempotency_key"] in archived_keys:
+            result.update(status="rejected", error="student is archived")
+        else:
+            result["status"] = "accepted" if result["idempotency_key"] in inserted else "duplicate"
+
+    summary = {"accepted": 0, "duplicate": 0, "rejected": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    return {
+        "accepted": summary["accepted"],
+        "duplicates": summary["duplicate"],
+        "rejected": summary["rejected"],
+        "results": results,
+    }
@@ -0,0 +1,244 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from app.extensions import db
+from app.models.attendance import Attendance
+from app.models.student import Student
+from app.services import school_time
+
+
+class FeedFull(Exception):
+    """Raised when the live feed already has its maximum number of subscribers."""
+
+
+def _activity(name, status, when):
+    return {
+        "name": name,
+        "time": school_time.localize(when).strftime("%I:%M %p"),
+        "status": "Check In" if status == "Present" else status,
+        "color": "text-success"
+    }
+
+
+class LiveFeed:
+    """
+    In-process pub/sub behind the dashboard. Today's counters are computed
+    once, then kept current by verify publishing each check-in, so any
+    number of open dashboards share one computation. A periodic resync
+    picks up writes from other workers, ingest and deletions.
+
+    The counters cover school-day scans; class-session scans only show in
+    the recent activity. Rows are identified by idempotency key (or id),
+    so a check-in that a recompute already read from the database is not
+    counted twice, and one still in the write-behind journal is replayed
+    onto the new state.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._compute_lock = threading.Lock()
+        self._subscribers = set()
+        self._state = None
+        self._computed_at = 0.0
+        # Check-ins published here, replayed onto each recompute
+        self._checkins = deque(maxlen=1000)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_subscribers = app.config.get("LIVE_MAX_SUBSCRIBERS", 8)
+        self.resync_seconds = app.config.get("LIVE_RESYNC_SECONDS", 60)
+        self.heartbeat_seconds = app.config.get("LIVE_HEARTBEAT_SECONDS", 15)
+        self.max_stream_seconds = app.config.get("LIVE_MAX_STREAM_SECONDS", 300)
+        app.extensions["live_feed"] = self
+
+    # -----------------------------
+    # Counters
+    # -----------------------------
+    def _compute(self):
+        today = school_time.today()
+        present_ids = set(db.session.execute(
+            db.select(Attendance.student_id).distinct()
+            .where(Attendance.on_days(today), Attendance.session_id.is_(None))
+        ).scalars())
+        late_keys = {
+            _row_key(attendance_id, key) for attendance_id, key in db.session.execute(
+                db.select(Attendance.id, Attendance.idempotency_key)
+                .where(Attendance.on_days(today), Attendance.session_id.is_(None), Attendance.status == "Late")
+            )
+        }
+        recent = db.session.query(Attendance, Student)\
+            .join(Student, Attendance.student_id == Student.id)\
+            .order_by(Attendance.timestamp.desc())\
+            .limit(5).all()
+
+        return {
+            "date": today,
+            "total_students": Student.query.filter(Student.is_active.isnot(False)).count(),
+            "present_ids": present_ids,
+            "late_keys": late_keys,
+            # (timestamp, row key, activity), newest first
+            "recent": [
+                (
+                    att.timestamp.astimezone(),
+                    _row_key(att.id, att.idempotency_key),
+                    _activity(f"{stu.first_name} {stu.last_name}", att.status, att.timestamp),
+                )
+                for att, stu in recent
+            ],
+        }
+
+    @staticmethod
+    def _apply(state, checkin):
+        """Folds one check-in into a state; applying it twice changes nothing."""
+        if checkin["date"] != state["date"]:
+            return
+        if checkin["session_id"] is None:
+            state["present_ids"].add(checkin["student_id"])
+            if checkin["status"] == "Late":
+                state["late_keys"].add(checkin["key"])
+        if all(key != checkin["key"] for _, key, _ in state["recent"]):
+            state["recent"].append((checkin["when"], checkin["key"], checkin["activity"]))
+            state["recent"].sort(key=lambda entry: entry[0], reverse=True)
+            del state["recent"][5:]
+
+    def _stale(self, state):
+        return (
+            state["date"] != school_time.today()
+            or time.monotonic() - self._computed_at > self.resync_seconds
+        )
+
+    def _current(self):
+        """
+        The shared state, recomputed when stale or when the day rolls over.
+        The queries run outside self._lock, by one thread at a time; the
+        others keep using the previous state meanwhile.
+        """
+        with self._lock:
+            state = self._state
+            if state is not None and not self._stale(state):
+                return state, False
+        if not self._compute_lock.acquire(blocking=state is None):
+            return state, False
+        try:
+            with self._lock:
+                if self._state is not None and not self._stale(self._state):
+                    return self._state, False
+            started = time.monotonic()
+            with self.app.app_context():
+                fresh = self._compute()
+            with self._lock:
+                for checkin in self._checkins:
+                    self._apply(fresh, checkin)
+                self._state, self._computed_at = fresh, started
+                return fresh, True
+        finally:
+            self._compute_lock.release()
+
+    @staticmethod
+    def _counters(state):
+        total, present = state["total_students"], len(state["present_ids"])
+        return {
+            "total_students": total,
+            "present_today": present,
+            "late_today": len(state["late_keys"]),
+            "percentage": int((present / total * 100)) if total > 0 else 0,
+        }
+
+    def snapshot(self):
+        """Same shape as GET /attendance/stats."""
+        state, _ = self._current()
+        with self._lock:
+            return {**self._counters(state), "recent_activity": [activity for _, _, activity in state["recent"]]}
+
+    def invalidate(self):
+        """Forces a recompute on next use (bulk writes, deletions)."""
+        with self._lock:
+            self._computed_at = 0.0
+
+    # -----------------------------
+    # Pub/sub
+    # -----------------------------
+    def publish_checkin(self, student, status, timestamp, idempotency_key=None, attendance_id=None,
+                        session_id=None):
+        """
+        Folds a new check-in into the counters and fans it out. The row is
+        identified by its idempotency key, or its id when it has none.
+        """
+        when = datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+        activity = _activity(f"{student.first_name} {student.last_name}", status, when)
+        checkin = {
+            "date": school_time.school_date(when),
+            "student_id": student.id,
+            "status": status,
+            "session_id": session_id,
+            "key": _row_key(attendance_id, idempotency_key),
+            "when": when.astimezone(),
+            "activity": activity,
+        }
+        with self._lock:
+            self._checkins.append(checkin)
+        state, _ = self._current()
+        with self._lock:
+            self._apply(state, checkin)
+            event = {**self._counters(state), "activity": activity}
+        self._broadcast("checkin", event)
+
+    def _broadcast(self, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for mailbox in subscribers:
+            try:
+                mailbox.put_nowait(message)
+            except queue.Full:
+                # A dashboard that stopped reading is dropped, never waited on
+                with self._lock:
+                    self._subscribers.discard(mailbox)
+
+    def subscribe(self):
+        """Registers a subscriber and returns its SSE generator."""
+        first = f"retry: 5000\nevent: stats\ndata: {json.dumps(self.snapshot())}\n\n"
+        mailbox = queue.Queue(maxsize=100)
+        # Checked and registered together so concurrent connects can't pass the cap.
+        # A stream that is never iterated is dropped by _broadcast once its mailbox fills.
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise FeedFull()
+            self._subscribers.add(mailbox)
+        return self._stream(mailbox, first)
+
+    def _stream(self, mailbox, first):
+        deadline = time.monotonic() + self.max_stream_seconds
+        try:
+            yield first
+            # Streams are bounded so each one frees its server thread; the browser reconnects
+            while time.monotonic() < deadline:
+                with self._lock:
+                    if mailbox not in self._subscribers:
+                        return
+                try:
+                    yield mailbox.get(timeout=self.heartbeat_seconds)
+                except queue.Empty:
+                    _, recomputed = self._current()
+                    if recomputed:
+                        self._broadcast("stats", self.snapshot())
+                    yield ": keep-alive\n\n"
+        finally:
+            with self._lock:
+                self._subscribers.discard(mailbox)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+def _row_key(attendance_id, idempotency_key):
+    return idempotency_key or f"id:{attendance_id}"
+
+
+live_feed = LiveFeed()
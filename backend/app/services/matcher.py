@@ -1,42 +1,75 @@
-import requests
 import os
-import numpy as np
+import time
 from flask import current_app
 
-def find_best_match(known_embeddings, unknown_encoding, tolerance=0.45):
+from app.services.metrics import BIOMETRIC_CALL_SECONDS
+from app.services import tracing
+from app.services import shards
+
+def active_student_embeddings(course_id=None):
     """
-    Delegates face comparison to the standalone Biometric Service.
+    Student embeddings that may be matched (archived students excluded),
+    optionally only those of a course's roster.
     """
-    if not known_embeddings:
-        return None
-        
+    from app.models.embedding import Embedding
+    from app.models.student import Student
+    query = Embedding.query.join(Student, Embedding.student_id == Student.id)\
+        .filter(Student.is_active.isnot(False))
+    if course_id is not None:
+        from app.models.course import course_students
+        query = query.join(course_students, course_students.c.student_id == Student.id)\
+            .filter(course_students.c.course_id == course_id)
+    return query.all()
+
+
+def _label(embedding):
+    """Whose face an embedding is, so the runner-up is another person."""
+    if embedding.student_id is not None:
+        return f"student-{embedding.student_id}"
+    return f"user-{embedding.user_id}"
+
+
+def _log_ambiguous(best, second, margin):
+    current_app.logger.warning(
+        f"⚠️ Ambiguous match rejected: best {best:.3f}, runner-up {second:.3f} (margin < {margin})"
+    )
+
+
+def _compare(known_embeddings, unknown_encoding, **options):
+    """POSTs to /compare; returns the JSON result or None on failure."""
+    import numpy as np
+    import requests
+
     service_url = os.environ.get("BIOMETRIC_SERVICE_URL", "http://127.0.0.1:5000")
     if not service_url.startswith("http"):
         service_url = f"http://{service_url}"
-    
+
     try:
         # Prepare known vectors for JSON serialization
         known_vectors = [np.frombuffer(e.vector, dtype=np.float64).tolist() for e in known_embeddings]
-        
+
         # Prepare the request body
         payload = {
             "unknown": unknown_encoding.tolist() if hasattr(unknown_encoding, "tolist") else unknown_encoding,
             "knowns": known_vectors,
-            "tolerance": tolerance
+            **options,
         }
-        
+
         # Prepare the request headers
-        headers = {"X-API-KEY": os.environ.get("BIOMETRIC_API_KEY", "supersecret-key")}
+        headers = {
+            "X-API-KEY": os.environ.get("BIOMETRIC_API_KEY", "supersecret-key"),
+            **tracing.outgoing_headers(),
+        }
         
+        started = time.perf_counter()
         response = requests.post(f"{service_url}/compare", json=payload, headers=headers, timeout=10)
+        BIOMETRIC_CALL_SECONDS.observe(
+            time.perf_counter() - started, endpoint="compare", outcome=response.status_code
+        )
+        tracing.add_remote_spans("bio", response.headers.get("Server-Timing"))
         
         if response.status_code == 200:
-            result = response.json()
-            match_index = result.get("match_index", -1)
-            
-            if match_index != -1:
-                return known_embeddings[match_index]
-            return None
+            return response.json()
         else:
             current_app.logger.error(f"❌ Biometric Service Error: {response.text}")
             return None
@@ -44,3 +77,80 @@ def find_best_match(known_embeddings, unknown_encoding, tolerance=0.45):
     except Exception as e:
         current_app.logger.error(f"❌ Matcher Service Error: {e}")
         return None
+
+
+def find_best_match(known_embeddings, unknown_encoding, tolerance=None, margin=None):
+    """
+    Delegates face comparison to the standalone Biometric Service.
+    A best match closer than `margin` to another person's nearest
+    embedding is ambiguous and rejected.
+    """
+    if not known_embeddings:
+        return None
+    if tolerance is None:
+        tolerance = current_app.config["MATCH_TOLERANCE"]
+    if margin is None:
+        margin = current_app.config["MATCH_MARGIN"]
+
+    result = _compare(
+        known_embeddings, unknown_encoding,
+        tolerance=tolerance, margin=margin, labels=[_label(e) for e in known_embeddings],
+    )
+    if not result:
+        return None
+    if result.get("decision") == "ambiguous":
+        _log_ambiguous(result["best"]["distance"], result["second"]["distance"], margin)
+
+    match_index = result.get("match_index", -1)
+    if match_index != -1:
+        return known_embeddings[match_index]
+    return None
+
+
+def find_duplicate(known_embeddings, unknown_encoding, tolerance=None):
+    """
+    Enrollment duplicate check: the first embedding under `tolerance`,
+    found by an early-exit scan rather than ranking the whole gallery.
+    """
+    if not known_embeddings:
+        return None
+    if tolerance is None:
+        tolerance = current_app.config["DUPLICATE_TOLERANCE"]
+
+    result = _compare(known_embeddings, unknown_encoding, tolerance=tolerance, mode="first")
+    if result and result.get("match_index", -1) != -1:
+        return known_embeddings[result["match_index"]]
+    return None
+
+
+def find_sharded_match(unknown_encoding, tolerance=None, margin=None):
+    """
+    Same contract as find_best_match, but searches the gallery resident on
+    the biometric shards instead of shipping every known vector. Raises
+    shards.ShardUnavailable when any shard could not be searched.
+    """
+    from app.models.embedding import Embedding
+
+    if tolerance is None:
+        tolerance = current_app.config["MATCH_TOLERANCE"]
+    if margin is None:
+        margin = current_app.config["MATCH_MARGIN"]
+
+    # A few neighbours, so the runner-up can be another person
+    matches = shards.search(unknown_encoding, k=3 if margin else 1)
+
+    if not matches or matches[0][1] >= tolerance:
+        return None
+    found = {e.id: e for e in Embedding.query.filter(Embedding.id.in_([m[0] for m in matches]))}
+    best = found.get(matches[0][0])
+    if best is None:
+        return None
+
+    for embedding_id, distance in matches[1:]:
+        other = found.get(embedding_id)
+        if other is not None and _label(other) != _label(best):
+            if distance - matches[0][1] < margin:
+                _log_ambiguous(matches[0][1], distance, margin)
+                return None
+            break
+    return best
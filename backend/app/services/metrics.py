@@ -0,0 +1,207 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds. Covers a fast DB lookup up to a slow dlib pass on weak hardware.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+_lock = threading.Lock()
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{str(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        with _lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with _lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with _lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {
+                    "counts": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key, state):
+        lines = []
+        for bound, count in zip(self.buckets, state["counts"]):
+            labels = _format_labels(self.labelnames, key, ("le", bound))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+        labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+        lines.append(f"{self.name}_bucket{labels} {state['count']}")
+        plain = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{plain} {state['sum']}")
+        lines.append(f"{self.name}_count{plain} {state['count']}")
+        return lines
+
+
+def render():
+    """Prometheus text exposition of every registered metric."""
+    with _lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# Backend metrics
+# -----------------------------
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds", "Request latency by endpoint", ("endpoint", "method", "status")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled")
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per request", ("endpoint",),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+VERIFY_STAGE_SECONDS = Histogram(
+    "verify_stage_seconds", "Time spent in each /attendance/verify stage", ("stage",)
+)
+BIOMETRIC_CALL_SECONDS = Histogram(
+    "biometric_call_seconds", "Round trip to the biometric service", ("endpoint", "outcome")
+)
+ATTENDANCE_FLUSH_SECONDS = Histogram(
+    "attendance_flush_seconds", "Time to move one journal segment into the database"
+)
+ATTENDANCE_FLUSH_ROWS = Histogram(
+    "attendance_flush_rows", "Attendance rows inserted per journal segment",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+ATTENDANCE_QUARANTINED = Counter(
+    "attendance_quarantined_total", "Journaled scans the database rejected, moved to quarantine", ("reason",)
+)
+GALLERY_SIZE = Gauge("gallery_size", "Embeddings loaded for the last match", ("kind",))
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Biometric requests turned away before encoding", ("endpoint", "reason")
+)
+CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Cached endpoint lookups by result", ("endpoint", "result")
+)
+
+
+_sql_hooked = False
+
+
+def init_app(app):
+    """Hooks request timing and per-request SQL statement counting into the app."""
+    global _sql_hooked
+    from flask import g, request, has_request_context
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if not _sql_hooked:
+        @event.listens_for(Engine, "before_cursor_execute")
+        def _count_query(conn, cursor, statement, parameters, context, executemany):
+            if has_request_context():
+                g.db_queries = g.get("db_queries", 0) + 1
+
+        _sql_hooked = True
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+        g.db_queries = 0
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.get("request_started")
+        if started is not None:
+            endpoint = request.endpoint or "unknown"
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                endpoint=endpoint,
+                method=request.method,
+                status=response.status_code,
+            )
+            DB_QUERIES_PER_REQUEST.observe(g.get("db_queries", 0), endpoint=endpoint)
+        return response
+
+    @app.teardown_request
+    def _end_request(exc):
+        if g.pop("request_started", None) is not None:
+            HTTP_IN_FLIGHT.dec()
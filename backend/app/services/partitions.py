@@ -0,0 +1,249 @@
+import re
+import threading
+import time as clock
+from datetime import date, datetime, time
+
+from flask import current_app
+from sqlalchemy import case, cast, func, literal, text
+from sqlalchemy.exc import DBAPIError
+
+from app.extensions import db
+from app.models.attendance import Attendance, AttendanceMonthlyRollup
+from app.services import summaries
+
+# attendances_y2026m03 holds March 2026
+PARTITION_PATTERN = re.compile(r"^attendances_y(\d{4})m(\d{2})$")
+# Catches rows no monthly partition covers (created by the migration)
+DEFAULT_PARTITION = "attendances_default"
+DELETE_BATCH = 5000
+
+_maintenance_started = False
+_maintenance_lock = threading.Lock()
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"attendances_y{month.year:04d}m{month.month:02d}"
+
+
+def _bounds(month):
+    """
+    [start, end) of a month for comparing with attendances.timestamp. On
+    PostgreSQL the dates are cast by the database, in its TimeZone
+    setting, exactly like the partition bounds (here and in the
+    migration). SQLite stores server-local times, so server-local there.
+    """
+    if db.engine.dialect.name == "postgresql":
+        return tuple(
+            cast(literal(day.isoformat()), db.DateTime(timezone=True))
+            for day in (month, add_months(month, 1))
+        )
+    start = datetime.combine(month, time.min).astimezone()
+    end = datetime.combine(add_months(month, 1), time.min).astimezone()
+    return start, end
+
+
+def is_partitioned():
+    """True once the partitioning migration has run (PostgreSQL only)."""
+    if db.engine.dialect.name != "postgresql":
+        return False
+    kind = db.session.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = 'attendances' AND relkind = 'p'")
+    ).scalar()
+    return kind is not None
+
+
+def list_partitions():
+    """Attached monthly partitions as [(month, table_name)], oldest first."""
+    if not is_partitioned():
+        return []
+    names = db.session.execute(text(
+        "SELECT c.relname FROM pg_inherits i"
+        " JOIN pg_class c ON c.oid = i.inhrelid"
+        " JOIN pg_class p ON p.oid = i.inhparent"
+        " WHERE p.relname = 'attendances'"
+    )).scalars()
+    partitions = []
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append((date(int(match.group(1)), int(match.group(2)), 1), name))
+    return sorted(partitions)
+
+
+def _default_months():
+    """Months with rows in the default partition, i.e. written while their partition was missing."""
+    return {
+        month_start(month) for month in db.session.execute(text(
+            f"SELECT DISTINCT date_trunc('month', \"timestamp\")::date FROM {DEFAULT_PARTITION}"
+        )).scalars()
+    }
+
+
+def _create_partition(month):
+    """Creates one month's partition. Returns rows moved into it from the default partition."""
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    in_month = f"\"timestamp\" >= '{start}' AND \"timestamp\" < '{end}'"
+    stranded = db.session.execute(text(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_month} LIMIT 1")).first()
+
+    with db.session.begin_nested():
+        if not stranded:
+            db.session.execute(text(f'CREATE TABLE "{name}" PARTITION OF attendances {bounds}'))
+            return 0
+        # The month's rows in the default partition would block the new
+        # partition; detach it, move them across, then re-attach it
+        columns = ", ".join(f'"{c.name}"' for c in Attendance.__table__.columns)
+        db.session.execute(text(f"ALTER TABLE attendances DETACH PARTITION {DEFAULT_PARTITION}"))
+        db.session.execute(text(f'CREATE TABLE "{name}" PARTITION OF attendances {bounds}'))
+        moved = db.session.execute(text(
+            f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} WHERE {in_month}'
+        )).rowcount
+        db.session.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"))
+        db.session.execute(text(f"ALTER TABLE attendances ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return moved
+
+
+def ensure_partitions(months_ahead=3):
+    """
+    Creates the current and upcoming monthly partitions, and one for every
+    month that has rows stranded in the default partition (moving them in).
+    Returns names created.
+    """
+    if not is_partitioned():
+        return []
+    existing = {month for month, _ in list_partitions()}
+    current = month_start(date.today())
+    wanted = {add_months(current, n) for n in range(months_ahead + 1)} | _default_months()
+    created = []
+    for month in sorted(wanted - existing):
+        name = partition_name(month)
+        try:
+            moved = _create_partition(month)
+        except DBAPIError as e:
+            current_app.logger.error(f"❌ Could not create partition {name}: {e.orig}")
+            continue
+        created.append(name)
+        if moved:
+            current_app.logger.warning(f"⚠️ Moved {moved} rows from {DEFAULT_PARTITION} into {name}")
+    db.session.commit()
+    return created
+
+
+def init_app(app):
+    """
+    Keeps the partitions ahead of the clock for as long as the server runs:
+    ensure_partitions at start-up and then every
+    ATTENDANCE_PARTITION_CHECK_HOURS, in a daemon thread (PostgreSQL only).
+    """
+    global _maintenance_started
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("postgresql"):
+        return
+    with _maintenance_lock:
+        if _maintenance_started:
+            return
+        _maintenance_started = True
+    interval = app.config.get("ATTENDANCE_PARTITION_CHECK_HOURS", 24) * 3600
+
+    def run():
+        while True:
+            with app.app_context():
+                try:
+                    ensure_partitions()
+                except Exception as e:
+                    app.logger.error(f"❌ Partition maintenance failed: {e}")
+                finally:
+                    db.session.remove()
+            clock.sleep(interval)
+
+    threading.Thread(target=run, name="attendance-partitions", daemon=True).start()
+
+
+def rollup_month(month):
+    """(Re)writes attendance_monthly_rollup for one month from the hot table."""
+    start, end = _bounds(month)
+    rows = db.session.execute(
+        db.select(
+            Attendance.student_id,
+            func.sum(case((Attendance.status == "Present", 1), else_=0)),
+            func.sum(case((Attendance.status == "Late", 1), else_=0)),
+            func.count(func.distinct(Attendance.school_date)),
+        )
+        .where(Attendance.timestamp >= start, Attendance.timestamp < end, Attendance.session_id.is_(None))
+        .group_by(Attendance.student_id)
+    ).all()
+
+    db.session.execute(db.delete(AttendanceMonthlyRollup).where(AttendanceMonthlyRollup.month == month))
+    if rows:
+        db.session.execute(db.insert(AttendanceMonthlyRollup), [
+            {
+                "student_id": student_id,
+                "month": month,
+                "present_count": present or 0,
+                "late_count": late or 0,
+                "days_attended": days,
+            }
+            for student_id, present, late, days in rows
+        ])
+    return len(rows)
+
+
+def _oldest_month():
+    oldest = db.session.execute(db.select(func.min(Attendance.timestamp))).scalar()
+    return month_start(oldest) if oldest else None
+
+
+def apply_retention(keep_months, drop=False):
+    """
+    Summarises every month older than the newest `keep_months` into
+    attendance_monthly_rollup, then takes it out of `attendances`:
+    detached (or dropped) as a partition on PostgreSQL, deleted in
+    batches elsewhere, and recounts the attendance summaries.
+    Returns [(month, students_rolled_up)].
+    """
+    cutoff = add_months(month_start(date.today()), -keep_months)
+    done = []
+
+    if is_partitioned():
+        # Rows stranded in the default partition get their month's partition first
+        ensure_partitions()
+        for month, name in list_partitions():
+            if month >= cutoff:
+                break
+            done.append((month, rollup_month(month)))
+            db.session.commit()
+            db.session.execute(text(f'ALTER TABLE attendances DETACH PARTITION "{name}"'))
+            if drop:
+                db.session.execute(text(f'DROP TABLE "{name}"'))
+            db.session.commit()
+    else:
+        month = _oldest_month()
+        while month and month < cutoff:
+            done.append((month, rollup_month(month)))
+            db.session.commit()
+            start, end = _bounds(month)
+            while True:
+                ids = db.session.execute(
+                    db.select(Attendance.id)
+                    .where(Attendance.timestamp >= start, Attendance.timestamp < end)
+                    .limit(DELETE_BATCH)
+                ).scalars().all()
+                if not ids:
+                    break
+                db.session.execute(db.delete(Attendance).where(Attendance.id.in_(ids)))
+                db.session.commit()
+            month = add_months(month, 1)
+
+    if done:
+        # Summaries count what is left in the hot table
+        summaries.rebuild()
+    return done
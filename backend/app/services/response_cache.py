@@ -0,0 +1,168 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, current_app, Response
+from flask_jwt_extended import get_jwt
+
+from app.services import school_time
+from app.services.metrics import CACHE_REQUESTS
+
+# table name -> generation; bumped whenever a commit touches the table
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+def generation(table):
+    return _generations.get(table, 0)
+
+
+def bump(*tables):
+    """Invalidates every cached response built from these tables."""
+    with _generations_lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+
+
+class ResponseCache:
+    """Size-bounded LRU of rendered responses with a TTL per entry."""
+
+    def __init__(self, max_entries=256, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires"] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, body, status, mimetype):
+        entry = {
+            "etag": hashlib.sha256(body).hexdigest()[:32],
+            "body": body,
+            "status": status,
+            "mimetype": mimetype,
+            "expires": time.monotonic() + self.ttl,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def _role():
+    try:
+        return get_jwt().get("role")
+    except RuntimeError:
+        return None  # endpoint without JWT
+
+
+def _respond(entry):
+    if request.if_none_match.contains(entry["etag"]):
+        response = Response(status=304)
+    else:
+        response = Response(entry["body"], status=entry["status"], mimetype=entry["mimetype"])
+    response.set_etag(entry["etag"])
+    # Clients may keep the body but must revalidate it every time
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def cached(*tables):
+    """
+    Caches a GET view's 200 responses. The key is the endpoint, its
+    arguments, the caller's role, today's school date and the generation
+    of each table the view reads, so any commit to those tables invalidates it.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("RESPONSE_CACHE_ENABLED", True):
+                return view(*args, **kwargs)
+
+            key = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                _role(),
+                school_time.today(),
+                tuple(generation(t) for t in tables),
+            )
+            entry = response_cache.get(key)
+            if entry is not None:
+                not_modified = request.if_none_match.contains(entry["etag"])
+                CACHE_REQUESTS.inc(endpoint=request.endpoint, result="not_modified" if not_modified else "hit")
+                return _respond(entry)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            CACHE_REQUESTS.inc(endpoint=request.endpoint, result="miss")
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            entry = response_cache.put(key, response.get_data(), response.status_code, response.mimetype)
+            return _respond(entry)
+        return wrapper
+    return decorator
+
+
+_session_hooked = False
+
+
+def init_app(app):
+    """Bumps table generations from ORM commits and bulk statements."""
+    global _session_hooked
+    response_cache.max_entries = app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 256)
+    response_cache.ttl = app.config.get("RESPONSE_CACHE_TTL", 30)
+
+    if _session_hooked:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    def _touched(session):
+        return session.info.setdefault("cache_tables", set())
+
+    @event.listens_for(Session, "after_flush")
+    def _collect_flushed(session, flush_context):
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            table = getattr(obj, "__tablename__", None)
+            if table:
+                _touched(session).add(table)
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _collect_bulk(state):
+        # Query.delete(), insert(Model) ... executed through the session
+        if state.is_insert or state.is_update or state.is_delete:
+            table = getattr(state.statement, "table", None)
+            if table is not None:
+                _touched(state.session).add(table.name)
+
+    @event.listens_for(Session, "after_commit")
+    def _bump_committed(session):
+        tables = session.info.pop("cache_tables", None)
+        if tables:
+            bump(*tables)
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard_rolled_back(session):
+        session.info.pop("cache_tables", None)
+
+    _session_hooked = True
@@ -0,0 +1,73 @@
+"""
+The school's wall clock. Late decisions, report days and each
+attendance row's school_date follow SCHOOL_TIMEZONE (an IANA name such
+as "Africa/Nairobi"), not the timezone of the server or the database.
+Unset, the server's local timezone is used, as before.
+"""
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+_zone = None
+
+
+def init_app(app):
+    global _zone
+    _zone = zone_from_name(app.config.get("SCHOOL_TIMEZONE"))
+
+
+def zone_from_name(name):
+    """ZoneInfo for a name, or None (server local) when blank. Raises on unknown names."""
+    return ZoneInfo(name) if name else None
+
+
+def zone():
+    return _zone
+
+
+def localize(timestamp):
+    """A timestamp on the school's clock; naive ones are taken as server local time."""
+    return timestamp.astimezone(_zone)
+
+
+def now():
+    return datetime.now(_zone) if _zone else datetime.now().astimezone()
+
+
+def today():
+    return now().date()
+
+
+def school_date(timestamp=None):
+    """The school day a timestamp (default: now) falls on."""
+    return localize(timestamp).date() if timestamp is not None else today()
+
+
+def restamp(check=False, batch=5000):
+    """
+    Recomputes attendances.school_date from the timestamps, e.g. after
+    SCHOOL_TIMEZONE changes. Returns how many rows disagreed; with
+    check=True they are only counted.
+    """
+    from app.extensions import db
+    from app.models.attendance import Attendance
+
+    changed, last_id = 0, 0
+    while True:
+        rows = db.session.execute(
+            db.select(Attendance.id, Attendance.timestamp, Attendance.school_date)
+            .where(Attendance.id > last_id)
+            .order_by(Attendance.id)
+            .limit(batch)
+        ).all()
+        if not rows:
+            return changed
+        last_id = rows[-1][0]
+        fixes = [
+            {"id": attendance_id, "school_date": school_date(timestamp)}
+            for attendance_id, timestamp, stored in rows
+            if school_date(timestamp) != stored
+        ]
+        changed += len(fixes)
+        if fixes and not check:
+            db.session.execute(db.update(Attendance), fixes)
+            db.session.commit()
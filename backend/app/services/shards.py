@@ -0,0 +1,204 @@
+import bisect
+import hashlib
+import heapq
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.services.metrics import BIOMETRIC_CALL_SECONDS
+from app.services import tracing
+
+# Points per shard on the hash ring. More points = smoother split.
+RING_REPLICAS = 100
+SETTING_KEY = "biometric_shards"
+# The shard list is re-read from the settings table this often
+SHARDS_TTL = 30
+_shards_cache = {}
+
+_pool = ThreadPoolExecutor(max_workers=int(os.environ.get("SHARD_FANOUT_WORKERS", 8)))
+
+
+class ShardUnavailable(Exception):
+    """Raised when a shard could not be searched, so the gathered result is incomplete."""
+
+
+def _hash(value):
+    return int(hashlib.md5(str(value).encode()).hexdigest()[:16], 16)
+
+
+class HashRing:
+    """Consistent hash ring: adding or removing a shard only moves ~1/N keys."""
+
+    def __init__(self, nodes, replicas=RING_REPLICAS):
+        self.nodes = list(nodes)
+        self._points = sorted(
+            (_hash(f"{node}#{n}"), node) for node in self.nodes for n in range(replicas)
+        )
+        self._keys = [point for point, _ in self._points]
+
+    def node_for(self, key):
+        if not self._points:
+            return None
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._points)
+        return self._points[index][1]
+
+
+def _headers():
+    return {
+        "X-API-KEY": os.environ.get("BIOMETRIC_API_KEY", "supersecret-key"),
+        **tracing.outgoing_headers(),
+    }
+
+
+def get_shards():
+    """
+    Shard URLs from the `biometric_shards` setting, else BIOMETRIC_SHARDS.
+    Cached for SHARDS_TTL seconds, since verify asks on every scan.
+    """
+    from app.models.setting import SystemSetting
+
+    if _shards_cache.get("expires", 0) > time.monotonic():
+        return _shards_cache["urls"]
+    raw = SystemSetting.get_val(SETTING_KEY) or os.environ.get("BIOMETRIC_SHARDS", "")
+    urls = [url.strip().rstrip("/") for url in raw.split(",") if url.strip()]
+    _shards_cache.update(urls=urls, expires=time.monotonic() + SHARDS_TTL)
+    return urls
+
+
+def set_shards(urls):
+    from app.extensions import db
+    from app.models.setting import SystemSetting
+    setting = SystemSetting.query.filter_by(key=SETTING_KEY).first()
+    value = ",".join(urls)
+    if setting:
+        setting.value = value
+    else:
+        db.session.add(SystemSetting(key=SETTING_KEY, value=value))
+    db.session.commit()
+    _shards_cache.clear()
+
+
+def sharding_enabled():
+    return bool(get_shards())
+
+
+def _vector_items(embeddings):
+    import numpy as np
+    return [
+        {"id": e.id, "vector": np.frombuffer(e.vector, dtype=np.float64).tolist()}
+        for e in embeddings
+    ]
+
+
+def _put(shard, embeddings, headers):
+    import requests
+    response = requests.put(
+        f"{shard}/gallery", json={"items": _vector_items(embeddings)}, headers=headers, timeout=30
+    )
+    response.raise_for_status()
+
+
+def _delete(shard, ids, headers):
+    import requests
+    response = requests.delete(
+        f"{shard}/gallery", json={"ids": [str(i) for i in ids]}, headers=headers, timeout=30
+    )
+    response.raise_for_status()
+
+
+def _group(ring, embeddings):
+    groups = {}
+    for embedding in embeddings:
+        groups.setdefault(ring.node_for(embedding.id), []).append(embedding)
+    return groups
+
+
+def upsert_embeddings(embeddings, shards=None):
+    """Pushes embeddings to the shard that owns each id."""
+    ring = HashRing(shards or get_shards())
+    headers = _headers()
+    for shard, group in _group(ring, embeddings).items():
+        _put(shard, group, headers)
+
+
+def remove_embeddings(ids, shards=None):
+    ring = HashRing(shards or get_shards())
+    headers = _headers()
+    groups = {}
+    for embedding_id in ids:
+        groups.setdefault(ring.node_for(embedding_id), []).append(embedding_id)
+    for shard, group in groups.items():
+        _delete(shard, group, headers)
+
+
+def search(unknown, k=3):
+    """
+    Scatter-gather: sends the probe to every shard in parallel and merges
+    the per-shard top-k into a global top-k of (embedding_id, distance).
+    Raises ShardUnavailable if any shard fails: without its part of the
+    gallery, "no match" would be a guess.
+    """
+    import requests
+
+    shards = get_shards()
+    payload = {
+        "unknown": unknown.tolist() if hasattr(unknown, "tolist") else unknown,
+        "k": k,
+    }
+    headers = _headers()
+
+    def query(shard):
+        started = time.perf_counter()
+        response = requests.post(f"{shard}/gallery/search", json=payload, headers=headers, timeout=10)
+        BIOMETRIC_CALL_SECONDS.observe(
+            time.perf_counter() - started, endpoint="gallery_search", outcome=response.status_code
+        )
+        response.raise_for_status()
+        return response
+
+    futures = {shard: _pool.submit(query, shard) for shard in shards}
+    candidates, failed = [], []
+    for shard, future in futures.items():
+        try:
+            response = future.result()
+        except Exception as e:
+            current_app.logger.error(f"❌ Shard {shard} search failed: {e}")
+            failed.append(shard)
+            continue
+        tracing.add_remote_spans("shard", response.headers.get("Server-Timing"))
+        candidates.extend(
+            (m["distance"], int(m["id"])) for m in response.json().get("matches", [])
+        )
+
+    if failed:
+        raise ShardUnavailable(f"{len(failed)} of {len(shards)} shards unavailable: {', '.join(failed)}")
+    return [(embedding_id, d) for d, embedding_id in heapq.nsmallest(k, candidates)]
+
+
+def rebalance(old_shards, new_shards, embeddings):
+    """
+    Moves every embedding whose owner differs between the two shard lists:
+    copy to the new owner first, then delete from the old one (if it is
+    still reachable). Returns the number of embeddings moved.
+    """
+    import requests
+
+    old_ring, new_ring = HashRing(old_shards), HashRing(new_shards)
+    headers = _headers()
+    moves = {}
+    for embedding in embeddings:
+        old, new = old_ring.node_for(embedding.id), new_ring.node_for(embedding.id)
+        if old != new:
+            moves.setdefault((old, new), []).append(embedding)
+
+    for (old, new), group in moves.items():
+        _put(new, group, headers)
+        if old:
+            try:
+                _delete(old, [e.id for e in group], headers)
+            except requests.RequestException as e:
+                current_app.logger.warning(f"⚠️ Could not clear {len(group)} entries from {old}: {e}")
+
+    return sum(len(group) for group in moves.values())
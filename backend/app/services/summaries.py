@@ -0,0 +1,214 @@
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+
+from app.extensions import db
+from app.models.attendance import Attendance, AttendanceSummary
+from app.services import school_time
+
+# Compared by rebuild(check=True); updated_at is bookkeeping only
+FIELDS = (
+    "days_attended", "days_present", "days_late", "current_streak",
+    "longest_streak", "last_day", "last_day_late", "last_seen",
+)
+# Students per multi-row INSERT of blank summaries (bind-parameter limits)
+ENSURE_CHUNK = 1000
+
+
+def _missed_school_day(previous, day):
+    """True if a weekday lies strictly between two attended days."""
+    between = (day - previous).days - 1
+    if between >= 3:
+        return True  # at most two weekend days in a row
+    return any((previous + timedelta(days=i)).weekday() < 5 for i in range(1, between + 1))
+
+
+def _blank(student_id):
+    summary = AttendanceSummary(student_id=student_id)
+    _reset(summary)
+    return summary
+
+
+def _reset(summary):
+    summary.days_attended = summary.days_present = summary.days_late = 0
+    summary.current_streak = summary.longest_streak = 0
+    summary.last_day = summary.last_seen = None
+    summary.last_day_late = False
+
+
+def _add(summary, timestamp, status):
+    """
+    Folds one attendance row into a summary. Returns False for a row older
+    than the summary's last day, which needs a recount instead.
+    """
+    day = school_time.school_date(timestamp)
+    late = status == "Late"
+
+    if summary.last_day is None or day > summary.last_day:
+        summary.days_attended += 1
+        if late:
+            summary.days_late += 1
+        else:
+            summary.days_present += 1
+        if summary.last_day is not None and not _missed_school_day(summary.last_day, day):
+            summary.current_streak += 1
+        else:
+            summary.current_streak = 1
+        summary.longest_streak = max(summary.longest_streak, summary.current_streak)
+        summary.last_day, summary.last_day_late = day, late
+    elif day == summary.last_day:
+        if summary.last_day_late and not late:
+            # An on-time scan turns the day from Late into Present
+            summary.days_late -= 1
+            summary.days_present += 1
+            summary.last_day_late = False
+    else:
+        return False
+
+    if summary.last_seen is None or timestamp.astimezone() > summary.last_seen.astimezone():
+        summary.last_seen = timestamp
+    return True
+
+
+def _rows(student_ids=None):
+    """School-day (student_id, timestamp, status) in (student_id, timestamp) order."""
+    query = (
+        db.select(Attendance.student_id, Attendance.timestamp, Attendance.status)
+        .where(Attendance.session_id.is_(None))
+    )
+    if student_ids is not None:
+        query = query.where(Attendance.student_id.in_(student_ids))
+    query = query.order_by(Attendance.student_id, Attendance.timestamp)
+    return db.session.execute(query.execution_options(yield_per=5000))
+
+
+def _recount(summary):
+    """Refolds a summary from all of the student's rows."""
+    _reset(summary)
+    for _, timestamp, status in _rows([summary.student_id]).all():
+        _add(summary, timestamp, status)
+
+
+def _ensure(student_ids):
+    """
+    Creates empty summary rows for students that have none, ignoring
+    existing ones. Returns the ids created.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Unsupported database for attendance summaries: {dialect}")
+
+    columns = ("student_id",) + FIELDS
+    created = set()
+    for start in range(0, len(student_ids), ENSURE_CHUNK):
+        blank = [{c: getattr(_blank(sid), c) for c in columns} for sid in student_ids[start:start + ENSURE_CHUNK]]
+        created.update(db.session.execute(
+            insert(AttendanceSummary).values(blank)
+            .on_conflict_do_nothing(index_elements=["student_id"])
+            .returning(AttendanceSummary.student_id)
+        ).scalars())
+    return created
+
+
+def record(rows):
+    """
+    Folds newly inserted attendance rows (dicts with student_id, status,
+    timestamp and optionally session_id) into the students' summaries.
+    Class-session scans are skipped; summaries count school days. Call it
+    in the inserting transaction so the summaries commit, or roll back,
+    with the rows.
+    """
+    by_student = defaultdict(list)
+    for row in rows:
+        if row.get("session_id") is None:
+            by_student[row["student_id"]].append(row)
+    if not by_student:
+        return
+
+    student_ids = sorted(by_student)
+    created = _ensure(student_ids)
+    # Locked in id order so concurrent writers can't deadlock
+    summaries = db.session.execute(
+        db.select(AttendanceSummary)
+        .where(AttendanceSummary.student_id.in_(student_ids))
+        .order_by(AttendanceSummary.student_id)
+        .with_for_update()
+    ).scalars().all()
+
+    for summary in summaries:
+        if summary.student_id in created:
+            # No summary yet, but maybe history from before summaries existed
+            _recount(summary)
+            continue
+        student_rows = sorted(by_student[summary.student_id], key=lambda r: r["timestamp"].astimezone())
+        if not all(_add(summary, row["timestamp"], row["status"]) for row in student_rows):
+            # A late-synced row from an earlier day: recount this student
+            _recount(summary)
+
+
+def _same(a, b):
+    if a is None or b is None:
+        return False
+    for field in FIELDS:
+        x, y = getattr(a, field), getattr(b, field)
+        if field == "last_seen" and x is not None and y is not None:
+            x, y = x.astimezone(), y.astimezone()
+        if x != y:
+            return False
+    return True
+
+
+def rebuild(check=False):
+    """
+    Recounts every summary from `attendances`. Returns (students counted,
+    ids whose stored summary was wrong or missing); with check=True those
+    are only reported, otherwise they are rewritten.
+    """
+    computed = {}
+    for student_id, rows in groupby(_rows(), key=lambda r: r[0]):
+        summary = computed[student_id] = _blank(student_id)
+        for _, timestamp, status in rows:
+            _add(summary, timestamp, status)
+
+    stored = {s.student_id: s for s in db.session.execute(db.select(AttendanceSummary)).scalars()}
+    mismatched = sorted(
+        sid for sid in computed.keys() | stored.keys() if not _same(computed.get(sid), stored.get(sid))
+    )
+
+    if mismatched and not check:
+        db.session.execute(db.delete(AttendanceSummary).where(AttendanceSummary.student_id.in_(mismatched)))
+        for sid in mismatched:
+            if sid in stored:
+                db.session.expunge(stored[sid])
+        db.session.add_all(computed[sid] for sid in mismatched if sid in computed)
+        db.session.commit()
+    return len(computed), mismatched
+
+
+def for_student(student_id, today=None):
+    """
+    The student's summary for API responses (one primary-key lookup).
+    A student without a summary row yet is counted from their attendance.
+    """
+    summary = db.session.get(AttendanceSummary, student_id)
+    if summary is None:
+        summary = _blank(student_id)
+        _recount(summary)
+    today = today or school_time.today()
+
+    current_streak = summary.current_streak
+    if summary.last_day is None or (summary.last_day < today and _missed_school_day(summary.last_day, today)):
+        current_streak = 0  # a school day went by without a scan
+
+    return {
+        "days_attended": summary.days_attended,
+        "days_present": summary.days_present,
+        "days_late": summary.days_late,
+        "current_streak": current_streak,
+        "longest_streak": summary.longest_streak,
+        "last_seen": summary.last_seen.isoformat() if summary.last_seen else None,
+    }
@@ -0,0 +1,113 @@
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+from flask import g, request, has_request_context
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+logger = logging.getLogger("app.trace")
+
+_traces = deque(maxlen=200)
+_traces_lock = threading.Lock()
+
+
+def init_app(app):
+    """Assigns a request id to every request and emits its span breakdown."""
+    global _traces
+    _traces = deque(maxlen=app.config.get("TRACE_BUFFER_SIZE", 200))
+    sample_rate = app.config.get("TRACE_SAMPLE_RATE", 0.1)
+    log_json = app.config.get("TRACE_LOG_JSON", False)
+
+    @app.before_request
+    def _start_trace():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        g.trace_started = time.perf_counter()
+        g.spans = []
+
+    @app.after_request
+    def _finish_trace(response):
+        started = g.get("trace_started")
+        if started is None:
+            return response
+
+        total_ms = (time.perf_counter() - started) * 1000
+        spans = g.get("spans", [])
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        if spans:
+            timing = [f"{s['name']};dur={s['duration_ms']}" for s in spans]
+            timing.append(f"total;dur={round(total_ms, 2)}")
+            response.headers["Server-Timing"] = ", ".join(timing)
+
+            trace = {
+                "request_id": g.request_id,
+                "endpoint": request.endpoint,
+                "method": request.method,
+                "status": response.status_code,
+                "started_at": time.time() - total_ms / 1000,
+                "total_ms": round(total_ms, 2),
+                "spans": spans,
+            }
+            if log_json:
+                logger.info(json.dumps(trace))
+            if random.random() < sample_rate:
+                with _traces_lock:
+                    _traces.append(trace)
+        return response
+
+
+@contextmanager
+def span(name):
+    """Times a block of the current request as a named span."""
+    if not has_request_context() or "spans" not in g:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.spans.append({
+            "name": name,
+            "offset_ms": round((start - g.trace_started) * 1000, 2),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        })
+
+
+def add_remote_spans(prefix, server_timing):
+    """Folds a downstream Server-Timing header into the current trace."""
+    if not server_timing or not has_request_context() or "spans" not in g:
+        return
+    for entry in server_timing.split(","):
+        parts = [p.strip() for p in entry.split(";")]
+        duration = next((p[4:] for p in parts[1:] if p.startswith("dur=")), None)
+        if not parts[0] or duration is None:
+            continue
+        try:
+            g.spans.append({
+                "name": f"{prefix}.{parts[0]}",
+                "offset_ms": None,
+                "duration_ms": float(duration),
+            })
+        except ValueError:
+            continue
+
+
+def outgoing_headers():
+    """Headers that propagate the current request id downstream."""
+    if has_request_context() and "request_id" in g:
+        return {REQUEST_ID_HEADER: g.request_id}
+    return {}
+
+
+def recent_traces(limit=50, request_id=None):
+    with _traces_lock:
+        traces = list(_traces)
+    if request_id:
+        traces = [t for t in traces if t["request_id"] == request_id]
+    return list(reversed(traces))[:limit]
@@ -0,0 +1,15 @@
+"""
+Benchmarks and load tests for the attendance pipeline.
+
+Run from the backend directory:
+
+    python -m benchmarks micro              # compare / report / export timings
+    python -m benchmarks seed --gallery 1000
+    python -m benchmarks stub --port 5001 --gallery 1000
+    python -m benchmarks load --url http://127.0.0.1:8000 --requests 500
+    python -m benchmarks startup            # import profile + cold start
+    python -m benchmarks analytics          # columnar vs row-by-row reports, a year of data
+
+Everything is generated at the embedding level from a fixed seed, so no
+camera, no images and no dlib are needed.
+"""
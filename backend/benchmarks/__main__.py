@@ -0,0 +1,87 @@
+import argparse
+
+from benchmarks.results import save
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    micro = sub.add_parser("micro", help="compare, report and export microbenchmarks")
+    micro.add_argument("--sizes", default="100,1000,5000", help="gallery sizes for compare")
+    micro.add_argument("--students", type=int, default=500)
+    micro.add_argument("--days", type=int, default=90)
+    micro.add_argument("--repeat", type=int, default=20)
+
+    seed = sub.add_parser("seed", help="enroll the synthetic gallery into DATABASE_URL")
+    seed.add_argument("--gallery", type=int, default=1000)
+
+    stub = sub.add_parser("stub", help="run the stub biometric service")
+    stub.add_argument("--port", type=int, default=5001)
+    stub.add_argument("--gallery", type=int, default=1000)
+    stub.add_argument("--noise", type=float, default=0.02)
+    stub.add_argument("--impostor-rate", type=float, default=0.1)
+    stub.add_argument("--encode-ms", type=float, default=0.0)
+
+    load = sub.add_parser("load", help="concurrent /attendance/verify load")
+    load.add_argument("--url", default="http://127.0.0.1:8000")
+    load.add_argument("--requests", type=int, default=500)
+    load.add_argument("--concurrency", type=int, default=8)
+
+    startup = sub.add_parser("startup", help="import profile and time to first response")
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.add_argument("--path", default="/")
+
+    analytics = sub.add_parser("analytics", help="columnar vs row-by-row report and export")
+    analytics.add_argument("--students", type=int, default=500)
+    analytics.add_argument("--days", type=int, default=365)
+    analytics.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.command == "micro":
+        from benchmarks.micro import bench_compare, bench_reports
+        sizes = tuple(int(s) for s in args.sizes.split(","))
+        results = {
+            "compare": bench_compare(sizes, repeat=args.repeat),
+            "reports": bench_reports(args.students, args.days, repeat=args.repeat),
+        }
+        save("micro", results, vars(args))
+
+    elif args.command == "seed":
+        from dotenv import load_dotenv
+        load_dotenv()
+        from app import create_app
+        from benchmarks.stub_service import seed_database
+        added = seed_database(create_app(), args.gallery)
+        print(f"✅ Seeded {added} synthetic students")
+
+    elif args.command == "stub":
+        from waitress import serve
+        from benchmarks.stub_service import create_stub_app
+        app = create_stub_app(args.gallery, args.noise, args.impostor_rate, args.encode_ms)
+        print(f"🧪 Stub biometric service on port {args.port} ({args.gallery} identities)")
+        serve(app, host="127.0.0.1", port=args.port, threads=8)
+
+    elif args.command == "load":
+        from benchmarks.load import run_load
+        results = run_load(args.url, args.requests, args.concurrency)
+        print(results)
+        save("load", results, vars(args))
+
+    elif args.command == "analytics":
+        from benchmarks.analytics import bench_analytics
+        results = bench_analytics(args.students, args.days, repeat=args.repeat)
+        save("analytics", results, vars(args))
+
+    elif args.command == "startup":
+        from dotenv import load_dotenv
+        load_dotenv()
+        from benchmarks.startup import bench_startup
+        results = bench_startup(args.repeat, args.path)
+        print(results)
+        save("startup", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Report and export over a year of attendance: the columnar NumPy path
+(services/analytics.py) against the previous row-by-row implementation,
+kept here as a baseline on a benchmark-only blueprint.
+"""
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from benchmarks.micro import _seed_attendance, _time
+
+
+def _legacy_blueprint():
+    """/legacy/report and /legacy/export: ORM tuples, strftime per row, per-day COUNTs."""
+    from flask import Blueprint, jsonify, request
+    from sqlalchemy import cast, Time
+
+    from app.extensions import db
+    from app.models.attendance import Attendance
+    from app.models.setting import SystemSetting
+    from app.models.student import Student
+
+    bp = Blueprint("legacy", __name__)
+
+    @bp.route("/legacy/report")
+    def report():
+        days_to_check = {"7d": 7, "30d": 30, "90d": 90}.get(request.args.get("range", "7d"), 7)
+        today = datetime.now().date()
+        trend_data, total, days_with_data = [], 0, 0
+        for i in range(days_to_check - 1, -1, -1):
+            date_check = today - timedelta(days=i)
+            label = date_check.strftime("%a") if days_to_check <= 7 else date_check.strftime("%m/%d")
+            present = db.session.query(Attendance.student_id).filter(Attendance.on_days(date_check)).distinct().count()
+            students = Student.query.filter(Student.is_active.isnot(False)).count()
+            percentage = int(present / students * 100) if students > 0 else 0
+            trend_data.append({"day": label, "attendance": percentage})
+            if percentage > 0:
+                total += percentage
+                days_with_data += 1
+
+        period = db.session.query(Attendance).filter(Attendance.on_days(today - timedelta(days=days_to_check), today))
+        total_present = period.count()
+        cutoff = datetime.strptime(SystemSetting.get_val("school_start_time", "08:00"), "%H:%M").time()
+        on_time = period.filter(cast(Attendance.timestamp, Time) <= cutoff).count()
+
+        recent = db.session.query(Attendance, Student).join(Student, Attendance.student_id == Student.id)\
+            .filter(Attendance.on_days(today - timedelta(days=days_to_check), today))\
+            .order_by(Attendance.timestamp.desc()).limit(50).all()
+        return jsonify({
+            "weekly_trend": trend_data,
+            "avg_attendance": round(total / days_with_data, 1) if days_with_data else 0,
+            "total_present": total_present,
+            "punctuality": int(on_time / total_present * 100) if total_present else 100,
+            "recent_logs": [{
+                "id": att.id, "name": f"{stu.first_name} {stu.last_name}",
+                "admission_number": stu.admission_number, "date": att.timestamp.strftime("%Y-%m-%d"),
+                "time": att.timestamp.strftime("%I:%M %p"), "status": att.status,
+            } for att, stu in recent],
+        })
+
+    @bp.route("/legacy/export")
+    def export():
+        days_to_check = {"7d": 7, "30d": 30, "90d": 90, "all": 3650}.get(request.args.get("range", "30d"), 30)
+        today = datetime.now().date()
+        records = db.session.query(Attendance, Student).join(Student, Attendance.student_id == Student.id)\
+            .filter(Attendance.on_days(today - timedelta(days=days_to_check), today))\
+            .order_by(Attendance.timestamp.desc()).all()
+        if request.args.get("format") == "csv":
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(["ID", "Student Name", "Admission Number", "Date", "Time", "Status"])
+            for att, stu in records:
+                writer.writerow([
+                    att.id, f"{stu.first_name} {stu.last_name}", stu.admission_number,
+                    att.timestamp.strftime("%Y-%m-%d"), att.timestamp.strftime("%I:%M %p"), att.status,
+                ])
+            return output.getvalue(), 200, {"Content-type": "text/csv"}
+        return jsonify([{
+            "Date": att.timestamp.strftime("%Y-%m-%d"), "Time": att.timestamp.strftime("%I:%M %p"),
+            "Student Name": f"{stu.first_name} {stu.last_name}", "Admission No": stu.admission_number,
+            "Status": att.status,
+        } for att, stu in records])
+
+    return bp
+
+
+def _body(response):
+    if not response.is_json:
+        return response.data
+    body = response.get_json()
+    if isinstance(body, dict):
+        # SQLite gives CAST(timestamp AS TIME) numeric affinity, so the old
+        # on-time count matched every row there; only compare the rest
+        body.pop("punctuality", None)
+    return body
+
+
+def bench_analytics(students=500, days=365, repeat=5):
+    """
+    Seeds `days` of attendance into a fresh SQLite DB, checks both paths
+    return the same body, then times each. Response caching is off so
+    every request recomputes.
+    """
+    workdir = tempfile.mkdtemp(prefix="attendance-analytics-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["RESPONSE_CACHE_ENABLED"] = "False"
+
+    from app import create_app
+    app = create_app()
+    app.register_blueprint(_legacy_blueprint())
+    rows = _seed_attendance(app, students, days)
+    client = app.test_client()
+
+    cases = {
+        "report_7d": "report?range=7d",
+        "report_90d": "report?range=90d",
+        "export_json_90d": "export?range=90d",
+        "export_csv_year": "export?range=all&format=csv",
+    }
+    results = {"rows": rows}
+    for name, path in cases.items():
+        legacy = client.get(f"/legacy/{path}")
+        current = client.get(f"/attendance/{path}")
+        assert legacy.status_code == current.status_code == 200
+        same = _body(legacy) == _body(current)
+
+        before = _time(lambda: client.get(f"/legacy/{path}"), repeat)
+        after = _time(lambda: client.get(f"/attendance/{path}"), repeat)
+        results[name] = {
+            "row_by_row": before,
+            "columnar": after,
+            "speedup_p50": round(before["p50_ms"] / after["p50_ms"], 2),
+            "identical_output": same,
+        }
+        print(f"⏱️ {name}: {before['p50_ms']} ms -> {after['p50_ms']} ms ({results[name]['speedup_p50']}x)")
+    return results
@@ -0,0 +1,40 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.results import percentiles
+from benchmarks.synthetic import probe_payload
+
+
+def run_load(url, total=500, concurrency=8, timeout=30):
+    """
+    Fires `total` scans at <url>/attendance/verify from `concurrency`
+    threads. The backend must be pointed at the stub service
+    (BIOMETRIC_SERVICE_URL) and seeded with the same gallery.
+    """
+    endpoint = f"{url.rstrip('/')}/attendance/verify"
+    session = requests.Session()
+
+    def scan(index):
+        files = {"image": ("scan.jpg", probe_payload(index), "image/jpeg")}
+        start = time.perf_counter()
+        try:
+            status = session.post(endpoint, files=files, timeout=timeout).status_code
+        except requests.RequestException:
+            status = "error"
+        return status, (time.perf_counter() - start) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(scan, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [ms for _, ms in outcomes]
+    statuses = Counter(str(status) for status, _ in outcomes)
+    return {
+        "latency": percentiles(latencies),
+        "throughput_rps": round(total / elapsed, 2),
+        "statuses": dict(sorted(statuses.items())),
+    }
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks.results import percentiles
+from benchmarks.synthetic import make_gallery, make_probes
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
+
+
+def bench_compare(sizes=(100, 1000, 5000), repeat=50):
+    """
+    Distance + argmin over the gallery, and the full matcher round trip
+    cost (DB bytes -> JSON -> numpy) that find_best_match pays per scan.
+    """
+    results = {}
+    for size in sizes:
+        gallery = make_gallery(size)
+        probes, _ = make_probes(gallery, repeat)
+        blobs = [row.tobytes() for row in gallery]
+        probe_iter = iter(probes)
+
+        def distance_only():
+            distances = np.linalg.norm(gallery - next(probe_iter), axis=1)
+            return int(np.argmin(distances))
+
+        def matcher_path():
+            knowns = [np.frombuffer(b, dtype=np.float64).tolist() for b in blobs]
+            body = json.dumps({"unknown": probes[0].tolist(), "knowns": knowns, "tolerance": 0.45})
+            data = json.loads(body)
+            knowns = np.array(data["knowns"])
+            return int(np.argmin(np.linalg.norm(knowns - np.array(data["unknown"]), axis=1)))
+
+        results[f"gallery_{size}"] = {
+            "distance": _time(distance_only, repeat),
+            "matcher_path": _time(matcher_path, max(5, repeat // 5)),
+        }
+    return results
+
+
+def _seed_attendance(app, students, days, seed=3):
+    from app.extensions import db
+    from app.models.attendance import Attendance
+    from app.models.student import Student
+
+    rng = np.random.default_rng(seed)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Student), [
+            {"first_name": "Bench", "last_name": f"Student{i}", "admission_number": f"BENCH-{i}",
+             "role": "STUDENT", "is_active": True}
+            for i in range(students)
+        ])
+        today = datetime.now().replace(hour=7, minute=0, second=0, microsecond=0)
+        rows = []
+        for day in range(days):
+            date = today - timedelta(days=day)
+            present = np.nonzero(rng.random(students) < 0.9)[0]
+            minutes = rng.normal(55, 10, len(present))
+            for student_index, minute in zip(present, minutes):
+                rows.append({
+                    "student_id": int(student_index) + 1,
+                    "timestamp": date + timedelta(minutes=float(minute)),
+                    "status": "Present" if minute <= 60 else "Late",
+                })
+        db.session.execute(db.insert(Attendance), rows)
+        db.session.commit()
+    return len(rows)
+
+
+def bench_reports(students=500, days=90, repeat=10):
+    """Times /attendance/report and /attendance/export against a seeded SQLite DB."""
+    workdir = tempfile.mkdtemp(prefix="attendance-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from app import create_app
+    app = create_app()
+    rows = _seed_attendance(app, students, days)
+    client = app.test_client()
+
+    def get(url):
+        def run():
+            response = client.get(url)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        return run
+
+    return {
+        "rows": rows,
+        "report_7d": _time(get("/attendance/report?range=7d"), repeat),
+        "report_30d": _time(get("/attendance/report?range=30d"), repeat),
+        "report_student_30d": _time(get("/attendance/report?range=30d&student_id=1"), repeat),
+        "export_json_30d": _time(get("/attendance/export?range=30d"), repeat),
+        "export_csv_90d": _time(get("/attendance/export?range=90d&format=csv"), repeat),
+    }
@@ -0,0 +1,87 @@
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def percentiles(samples_ms):
+    if not samples_ms:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None}
+    arr = np.asarray(samples_ms)
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "mean_ms": round(float(arr.mean()), 3),
+    }
+
+
+def _flatten(data, prefix=""):
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def diff(previous, current):
+    """Lines describing how every numeric result moved since `previous`."""
+    before = _flatten(previous.get("results", {}))
+    after = _flatten(current.get("results", {}))
+    lines = []
+    for key in sorted(after):
+        new = after[key]
+        old = before.get(key)
+        if old is None:
+            lines.append(f"  {key}: {new} (new)")
+        elif old == new:
+            continue
+        else:
+            change = f" ({(new - old) / old * 100:+.1f}%)" if old else ""
+            lines.append(f"  {key}: {old} -> {new}{change}")
+    return lines
+
+
+def save(suite, results, params):
+    """
+    Writes results/<suite>.json (stable key order, so it diffs cleanly in
+    git) and prints the change against the previous run of the suite.
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{suite}.json")
+    document = {
+        "suite": suite,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "params": params,
+        "results": results,
+    }
+
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)
+        changes = diff(previous, document)
+        print(f"📊 Changes since {previous.get('recorded_at')}:")
+        print("\n".join(changes) if changes else "  (no change)")
+
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"💾 Results saved to {path}")
+    return path
@@ -0,0 +1,100 @@
+"""
+API cold start: what create_app() imports, and how long a fresh process
+takes to answer its first request (what a user hits after a sleep).
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+from benchmarks.results import percentiles
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Should only be loaded by the requests that need them
+HEAVY_MODULES = ("numpy", "requests", "alembic")
+
+_PROFILE = (
+    "import sys\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+)
+
+_SERVE = (
+    "import sys\n"
+    "from waitress import serve\n"
+    "from app import create_app\n"
+    "serve(create_app(), host='127.0.0.1', port=int(sys.argv[1]), threads=4)\n"
+)
+
+
+def _env():
+    env = dict(os.environ)
+    env.pop("FLASK_RUN_FROM_CLI", None)  # would load the migration tooling
+    return env
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def import_profile(top=10):
+    """
+    Runs create_app() under `python -X importtime`. Returns the total import
+    time, the slowest modules (cumulative) and which heavy modules loaded.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROFILE],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):  # top level of the import tree
+            modules.append((name.strip(), int(cumulative) / 1000))
+    modules.sort(key=lambda m: m[1], reverse=True)
+    loaded = proc.stdout.strip()
+    return {
+        "import_ms": round(sum(ms for _, ms in modules), 1),
+        "slowest_ms": {name: round(ms, 1) for name, ms in modules[:top]},
+        "heavy_loaded": loaded.split(",") if loaded else [],
+    }
+
+
+def first_response(repeat=5, path="/", timeout=30):
+    """Spawns a fresh server `repeat` times; milliseconds until `path` answers."""
+    samples = []
+    for _ in range(repeat):
+        port = _free_port()
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-c", _SERVE, str(port)],
+            cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while time.perf_counter() - started < timeout:
+                try:
+                    requests.get(f"http://127.0.0.1:{port}{path}", timeout=1)
+                    samples.append((time.perf_counter() - started) * 1000)
+                    break
+                except requests.ConnectionError:
+                    time.sleep(0.005)
+        finally:
+            server.terminate()
+            server.wait()
+    return percentiles(samples)
+
+
+def bench_startup(repeat=5, path="/"):
+    return {
+        "imports": import_profile(),
+        "first_response": first_response(repeat, path),
+    }
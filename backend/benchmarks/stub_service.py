@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+from flask import Flask, request, jsonify
+
+from benchmarks.synthetic import make_gallery, make_probe, parse_probe_payload
+
+
+def create_stub_app(gallery_size=1000, noise=0.02, impostor_rate=0.1, encode_ms=0.0, seed=42):
+    """
+    Stands in for biometric-service: /encode maps a `probe:<n>` body to a
+    synthetic encoding, /compare is the same argmin-under-tolerance as the
+    real service. encode_ms adds a fixed delay to mimic dlib.
+    """
+    app = Flask("biometric-stub")
+    gallery = make_gallery(gallery_size, seed=seed)
+
+    @app.route("/health", methods=["GET"])
+    def health():
+        return jsonify({"status": "healthy", "stub": True}), 200
+
+    @app.route("/encode", methods=["POST"])
+    def encode():
+        upload = request.files.get("image")
+        body = upload.read() if upload else request.get_data()
+        index = parse_probe_payload(body)
+        if index is None:
+            return jsonify({"error": "No face detected"}), 400
+
+        if encode_ms:
+            time.sleep(encode_ms / 1000)
+        probe, _ = make_probe(gallery, index, noise=noise, impostor_rate=impostor_rate)
+        return jsonify({"encoding": probe.tolist()}), 200
+
+    @app.route("/compare", methods=["POST"])
+    def compare():
+        data = request.get_json()
+        unknown = np.asarray(data["unknown"])
+        knowns = np.asarray(data["knowns"])
+        if not len(knowns):
+            return jsonify({"match_index": -1}), 200
+
+        distances = np.linalg.norm(knowns - unknown, axis=1)
+        best = int(np.argmin(distances))
+        if distances[best] < float(data.get("tolerance", 0.45)):
+            return jsonify({"match_index": best, "distance": float(distances[best])}), 200
+        return jsonify({"match_index": -1}), 200
+
+    return app
+
+
+def seed_database(app, gallery_size=1000, seed=42):
+    """Enrolls one student + embedding per synthetic identity (admission BENCH-<n>)."""
+    from app.extensions import db
+    from app.models.student import Student
+    from app.models.embedding import Embedding
+
+    gallery = make_gallery(gallery_size, seed=seed)
+    with app.app_context():
+        existing = Student.query.filter(Student.admission_number.like("BENCH-%")).count()
+        for i in range(existing, gallery_size):
+            student = Student(
+                first_name="Bench",
+                last_name=f"Student{i}",
+                admission_number=f"BENCH-{i}",
+                is_active=True,
+            )
+            db.session.add(student)
+            db.session.flush()
+            db.session.add(Embedding(student_id=student.id, vector=gallery[i].tobytes()))
+        db.session.commit()
+    return gallery_size - existing
@@ -0,0 +1,46 @@
+import numpy as np
+
+DIM = 128
+# Per-component spread of identity centres. Two random identities end up
+# ~0.96 apart, close to what face_recognition reports for strangers.
+IDENTITY_SCALE = 0.06
+
+
+def make_gallery(size, seed=42):
+    """One 128-d float64 encoding per synthetic identity, shape (size, 128)."""
+    rng = np.random.default_rng(seed)
+    return rng.normal(0.0, IDENTITY_SCALE, (size, DIM))
+
+
+def make_probe(gallery, index, noise=0.02, impostor_rate=0.1, seed=7):
+    """
+    Noisy re-capture number `index`, deterministic for a given seed.
+    Returns (probe, expected) where expected is the gallery row or -1 for
+    an impostor. A noise of 0.02 puts genuine probes ~0.23 from their identity.
+    """
+    rng = np.random.default_rng((seed, index))
+    if rng.random() < impostor_rate:
+        return rng.normal(0.0, IDENTITY_SCALE, DIM), -1
+    expected = int(rng.integers(0, len(gallery)))
+    return gallery[expected] + rng.normal(0.0, noise, DIM), expected
+
+
+def make_probes(gallery, count, **kwargs):
+    """Stacks `count` probes from make_probe; returns (probes, expected)."""
+    pairs = [make_probe(gallery, i, **kwargs) for i in range(count)]
+    return np.array([p for p, _ in pairs]), np.array([e for _, e in pairs])
+
+
+def probe_payload(index):
+    """Request body the stub service maps back to probe `index`."""
+    return f"probe:{index}".encode()
+
+
+def parse_probe_payload(body):
+    try:
+        prefix, index = body.decode().split(":", 1)
+        if prefix == "probe":
+            return int(index)
+    except (UnicodeDecodeError, ValueError):
+        pass
+    return None
@@ -0,0 +1,15 @@
+"""
+Offline-first kiosk for a single gate.
+
+The kiosk keeps a signed snapshot of the student gallery, matches scans
+against it through a local biometric service, journals attendance to
+SQLite and uploads it to the backend whenever the network allows.
+
+Run from the backend directory:
+
+    python -m edge pull     # download and verify a fresh gallery snapshot
+    python -m edge serve    # kiosk API on EDGE_PORT (verify + health)
+    python -m edge sync     # push queued scans once and exit
+
+Configuration comes from the environment (see .env.example, "Edge kiosks").
+"""
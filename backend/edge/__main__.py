@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+
+from app.services.gallery_snapshot import SnapshotError
+from edge.kiosk import Kiosk, GalleryModeRequired, create_kiosk_app
+
+
+def _float_env(name):
+    """Set on the kiosk overrides the backend's value from the snapshot."""
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def build_kiosk():
+    return Kiosk(
+        backend_url=os.environ.get("EDGE_BACKEND_URL", "http://127.0.0.1:8000"),
+        device_key=os.environ.get("DEVICE_API_KEY", ""),
+        snapshot_key=os.environ.get("GALLERY_SNAPSHOT_KEY") or os.environ.get("SECRET_KEY", "dev_secret_key"),
+        snapshot_path=os.environ.get("EDGE_SNAPSHOT_PATH", "gallery.snap"),
+        journal_path=os.environ.get("EDGE_JOURNAL_PATH", "edge-journal.db"),
+        biometric_url=os.environ.get("BIOMETRIC_SERVICE_URL", "http://127.0.0.1:5000"),
+        biometric_key=os.environ.get("BIOMETRIC_API_KEY", "supersecret-key"),
+        device_id=os.environ.get("EDGE_DEVICE_ID", "kiosk"),
+        tolerance=_float_env("MATCH_TOLERANCE"),
+        margin=_float_env("MATCH_MARGIN"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m edge")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("pull", help="download and verify a gallery snapshot")
+    serve = sub.add_parser("serve", help="run the kiosk API")
+    serve.add_argument("--port", type=int, default=int(os.environ.get("EDGE_PORT", 8100)))
+    serve.add_argument("--sync-interval", type=float, default=float(os.environ.get("EDGE_SYNC_INTERVAL", 30)))
+    sub.add_parser("sync", help="upload queued scans once")
+
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    kiosk = build_kiosk()
+
+    if args.command == "pull":
+        print(f"✅ Snapshot saved ({kiosk.pull_snapshot()} embeddings)")
+
+    elif args.command == "serve":
+        import requests
+        from waitress import serve as waitress_serve
+        try:
+            kiosk.pull_snapshot()
+        except (requests.RequestException, SnapshotError) as e:
+            print(f"📴 Could not refresh snapshot, using the copy on disk: {e}")
+        try:
+            print(f"📦 Loaded {kiosk.load()} embeddings into the local gallery")
+        except GalleryModeRequired as e:
+            sys.exit(f"❌ {e}")
+        kiosk.run_sync_loop(args.sync_interval)
+        print(f"🚀 Edge kiosk on port {args.port}")
+        waitress_serve(create_kiosk_app(kiosk), host="0.0.0.0", port=args.port)
+
+    elif args.command == "sync":
+        print(f"✅ Synced {kiosk.sync()} scans ({kiosk.journal.backlog()} still queued)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+
+class Journal:
+    """
+    Local SQLite log of scans taken by the kiosk. Every row carries an
+    idempotency key, so a sync that dies half-way can simply be retried.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scans ("
+            " idempotency_key TEXT PRIMARY KEY,"
+            " student_id INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " timestamp TEXT NOT NULL,"
+            " synced INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_scans_synced ON scans (synced)")
+        self._conn.commit()
+
+    def record(self, student_id, status, timestamp=None):
+        row = {
+            "idempotency_key": uuid.uuid4().hex,
+            "student_id": student_id,
+            "status": status,
+            "timestamp": (timestamp or datetime.now().astimezone()).isoformat(),
+        }
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO scans (idempotency_key, student_id, status, timestamp)"
+                " VALUES (:idempotency_key, :student_id, :status, :timestamp)",
+                row,
+            )
+            self._conn.commit()
+        return row
+
+    def pending(self, limit=500):
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT idempotency_key, student_id, status, timestamp FROM scans"
+                " WHERE synced = 0 ORDER BY timestamp LIMIT ?",
+                (limit,),
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, values)) for values in cursor.fetchall()]
+
+    def mark_synced(self, keys):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE scans SET synced = 1 WHERE idempotency_key = ?", [(k,) for k in keys]
+            )
+            self._conn.commit()
+
+    def backlog(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scans WHERE synced = 0").fetchone()[0]
@@ -0,0 +1,251 @@
+import os
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import requests
+from flask import Flask, request, jsonify
+
+from app.services.gallery_snapshot import load_snapshot
+from edge.journal import Journal
+
+SYNC_BATCH = 500
+# Retry-After (seconds) when the local service fails without giving one
+UNAVAILABLE_RETRY_AFTER = 5
+
+
+class GalleryModeRequired(Exception):
+    """Raised when the local biometric service does not serve /gallery."""
+
+
+class Kiosk:
+    """
+    Offline verifier for one gate. Matches against a signed gallery snapshot
+    held in the local biometric service, journals scans to SQLite and pushes
+    them to the backend whenever it is reachable.
+    """
+
+    def __init__(self, backend_url, device_key, snapshot_key, snapshot_path, journal_path,
+                 biometric_url, biometric_key, device_id="kiosk", tolerance=None, margin=None):
+        self.backend_url = backend_url.rstrip("/")
+        self.device_key = device_key
+        self.snapshot_key = snapshot_key
+        self.snapshot_path = snapshot_path
+        self.biometric_url = biometric_url.rstrip("/")
+        self.biometric_key = biometric_key
+        self.device_id = device_id
+        # None: use the backend's values carried in the snapshot
+        self.tolerance = tolerance
+        self.margin = margin
+        self.journal = Journal(journal_path)
+        self.students = {}
+        self.settings = {}
+        self.snapshot_created_at = None
+        self.last_sync = None
+
+    def _device_headers(self):
+        return {"X-DEVICE-KEY": self.device_key, "X-DEVICE-ID": self.device_id}
+
+    def _bio_headers(self):
+        return {"X-API-KEY": self.biometric_key}
+
+    # -----------------------------
+    # Snapshot
+    # -----------------------------
+    def pull_snapshot(self):
+        """Downloads a fresh snapshot; the old file is kept unless the new one verifies."""
+        response = requests.get(
+            f"{self.backend_url}/devices/gallery-snapshot", headers=self._device_headers(), timeout=60
+        )
+        response.raise_for_status()
+        header, _ = load_snapshot(response.content, self.snapshot_key)
+
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(response.content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        return header["count"]
+
+    def load(self):
+        """Verifies the snapshot on disk and makes it the local service's gallery."""
+        with open(self.snapshot_path, "rb") as f:
+            header, matrix = load_snapshot(f.read(), self.snapshot_key)
+
+        base = self.biometric_url
+        current = requests.get(f"{base}/gallery", headers=self._bio_headers(), timeout=10)
+        if current.status_code == 409:
+            raise GalleryModeRequired(
+                f"The biometric service at {base} does not hold a gallery; start it with GALLERY_MODE=true"
+            )
+        current.raise_for_status()
+        stale = set(current.json()["ids"]) - {str(s[0]) for s in header["students"]}
+        if stale:
+            requests.delete(
+                f"{base}/gallery", json={"ids": sorted(stale)}, headers=self._bio_headers(), timeout=30
+            ).raise_for_status()
+
+        for start in range(0, len(matrix), SYNC_BATCH):
+            items = [
+                {"id": entry[0], "vector": vector.tolist()}
+                for entry, vector in zip(header["students"][start:start + SYNC_BATCH],
+                                         matrix[start:start + SYNC_BATCH])
+            ]
+            requests.put(
+                f"{base}/gallery", json={"items": items}, headers=self._bio_headers(), timeout=30
+            ).raise_for_status()
+
+        self.students = {str(eid): (sid, name, admission) for eid, sid, name, admission in header["students"]}
+        self.settings = header.get("settings", {})
+        self.snapshot_created_at = header["created_at"]
+        return len(self.students)
+
+    # -----------------------------
+    # Verify
+    # -----------------------------
+    def _encode_error(self, response):
+        """(body, status) for a failed /encode: the image's fault, or retry later."""
+        try:
+            error = response.json().get("error", "Biometric service error")
+        except ValueError:
+            error = "Biometric service error"
+        if response.status_code < 500 and response.status_code != 429:
+            return {"error": error}, response.status_code
+        retry_after = response.headers.get("Retry-After", "")
+        retry_after = int(retry_after) if retry_after.isdigit() else UNAVAILABLE_RETRY_AFTER
+        status = response.status_code if response.status_code in (429, 503) else 503
+        return {"error": error, "retry_after": retry_after}, status
+
+    def verify(self, image_file):
+        """
+        Returns (body, status) with the same contract as /attendance/verify;
+        bodies of 429/503 answers carry retry_after.
+        """
+        tolerance = self.tolerance if self.tolerance is not None else self.settings.get("match_tolerance", 0.45)
+        margin = self.margin if self.margin is not None else self.settings.get("match_margin", 0.05)
+        response = requests.post(
+            f"{self.biometric_url}/encode",
+            data=image_file.stream,
+            params={
+                "is_enrollment": "false",
+                "profile": self.settings.get("verify_encoding_profile", "balanced"),
+            },
+            headers={**self._bio_headers(), "Content-Type": image_file.mimetype or "application/octet-stream"},
+            timeout=30,
+        )
+        if response.status_code != 200:
+            return self._encode_error(response)
+
+        # A few neighbours, so the runner-up can be another person
+        search = requests.post(
+            f"{self.biometric_url}/gallery/search",
+            json={"unknown": response.json()["encoding"], "k": 3 if margin else 1},
+            headers=self._bio_headers(),
+            timeout=10,
+        )
+        search.raise_for_status()
+        matches = search.json()["matches"]
+        if not matches or matches[0]["distance"] >= tolerance:
+            return {"error": "Student not recognized"}, 401
+
+        student = self.students.get(str(matches[0]["id"]))
+        if not student:
+            return {"error": "Invalid student record"}, 500
+        # Same rule as the backend: another student almost as close is ambiguous
+        for other in matches[1:]:
+            other_student = self.students.get(str(other["id"]))
+            if other_student and other_student[0] != student[0]:
+                if other["distance"] - matches[0]["distance"] < margin:
+                    print(f"⚠️ Ambiguous match rejected: best {matches[0]['distance']:.3f}, "
+                          f"runner-up {other['distance']:.3f} (margin < {margin})")
+                    return {"error": "Student not recognized"}, 401
+                break
+        student_id, name, admission = student
+
+        cutoff = datetime.strptime(self.settings.get("school_start_time", "08:00"), "%H:%M").time()
+        # The school's clock, which need not be this device's
+        zone = self.settings.get("school_timezone")
+        now = datetime.now(ZoneInfo(zone)) if zone else datetime.now()
+        status = "Present" if now.time() <= cutoff else "Late"
+        row = self.journal.record(student_id, status)
+
+        return {
+            "success": True,
+            "offline": True,
+            "student": {"id": student_id, "name": name, "admission_number": admission},
+            "attendance": {"id": None, "status": status, "timestamp": row["timestamp"]},
+        }, 200
+
+    # -----------------------------
+    # Sync
+    # -----------------------------
+    def sync(self):
+        """Uploads every unsynced scan. Returns the number the backend stored."""
+        stored = 0
+        while True:
+            batch = self.journal.pending(SYNC_BATCH)
+            if not batch:
+                break
+            response = requests.post(
+                f"{self.backend_url}/attendance/ingest",
+                json={"records": batch},
+                headers=self._device_headers(),
+                timeout=60,
+            )
+            response.raise_for_status()
+            result = response.json()
+            if result["rejected"]:
+                rejected = [r for r in result["results"] if r["status"] == "rejected"]
+                print(f"⚠️ Backend rejected {len(rejected)} scans: {rejected}")
+            # Rejected rows would be rejected again, so they are settled too
+            self.journal.mark_synced([r["idempotency_key"] for r in batch])
+            stored += result["accepted"]
+        self.last_sync = time.time()
+        return stored
+
+    def run_sync_loop(self, interval):
+        def loop():
+            while True:
+                try:
+                    stored = self.sync()
+                    if stored:
+                        print(f"🔄 Synced {stored} scans to the backend")
+                except requests.RequestException as e:
+                    print(f"📴 Backend unreachable, {self.journal.backlog()} scans queued: {e}")
+                time.sleep(interval)
+
+        threading.Thread(target=loop, name="edge-sync", daemon=True).start()
+
+
+def create_kiosk_app(kiosk):
+    app = Flask(__name__)
+
+    @app.route("/attendance/verify", methods=["POST"])
+    def verify_attendance():
+        image = request.files.get("image")
+        if not image:
+            return jsonify({"error": "Image required"}), 400
+        try:
+            body, status = kiosk.verify(image)
+        except requests.RequestException as e:
+            print(f"❌ Local biometric service error: {e}")
+            return jsonify({"error": "Biometric service is currently unavailable"}), 503, {
+                "Retry-After": str(UNAVAILABLE_RETRY_AFTER)
+            }
+        headers = {"Retry-After": str(body["retry_after"])} if "retry_after" in body else {}
+        return jsonify(body), status, headers
+
+    @app.route("/health", methods=["GET"])
+    def health():
+        return jsonify({
+            "status": "healthy",
+            "gallery_size": len(kiosk.students),
+            "snapshot_created_at": kiosk.snapshot_created_at,
+            "pending_sync": kiosk.journal.backlog(),
+            "last_sync": kiosk.last_sync,
+        }), 200
+
+    return app
+
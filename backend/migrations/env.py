@@ -96,6 +96,15 @@ def run_migrations_online():
 
     connectable = get_engine()
 
+    # constraints declared with .ddl_if(dialect=...) only exist on that
+    # dialect, so autogenerate must not compare them elsewhere
+    def include_object(object, name, type_, reflected, compare_to):
+        ddl_if = getattr(object, "_ddl_if", None)
+        return not (ddl_if and ddl_if.dialect and ddl_if.dialect != connectable.dialect.name)
+
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
+
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
@@ -0,0 +1,36 @@
+"""sqlite: idempotency key unique on its own again
+
+Revision ID: 2cd847e792f0
+Revises: 5517ef102583
+Create Date: 2026-10-19 19:40:02.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2cd847e792f0'
+down_revision = '5517ef102583'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only partitioned PostgreSQL needs the timestamp in the unique key;
+    # earlier SQLite upgrades widened it to (idempotency_key, timestamp)
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    constraints = sa.inspect(bind).get_unique_constraints('attendances')
+    widened = [c for c in constraints if c['name'] == 'uq_attendances_idempotency_key' and len(c['column_names']) > 1]
+    if not widened:
+        return
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_attendances_idempotency_key', type_='unique')
+        batch_op.create_unique_constraint('uq_attendances_idempotency_key', ['idempotency_key'])
+
+
+def downgrade():
+    # The single-column key is what this schema has on SQLite at every revision
+    pass
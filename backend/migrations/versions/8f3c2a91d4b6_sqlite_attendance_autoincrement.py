@@ -0,0 +1,42 @@
+"""sqlite: never reuse attendance ids
+
+Revision ID: 8f3c2a91d4b6
+Revises: 2cd847e792f0
+Create Date: 2026-10-19 21:05:41.530217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3c2a91d4b6'
+down_revision = '2cd847e792f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Archived attendance keeps its id; without AUTOINCREMENT SQLite reuses
+    # the ids of rows the purge job moved out and re-archiving collides
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    with op.batch_alter_table('attendances', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'attendances'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'attendances', MAX("
+        "COALESCE((SELECT MAX(id) FROM attendances), 0), "
+        "COALESCE((SELECT MAX(id) FROM attendance_archive), 0))"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    with op.batch_alter_table('attendances', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
@@ -0,0 +1,139 @@
+"""partition attendances by month
+
+Revision ID: d75af4d9343e
+Revises: c677b724f0e2
+Create Date: 2026-10-19 18:33:17.489733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd75af4d9343e'
+down_revision = 'c677b724f0e2'
+branch_labels = None
+depends_on = None
+
+
+MONTHS_AHEAD = 3
+
+
+def _create_partitioned_table(name):
+    # Unique keys on a partitioned table must include the partition key
+    op.execute(f"""
+        CREATE TABLE {name} (
+            id INTEGER NOT NULL DEFAULT nextval('attendances_id_seq'),
+            student_id INTEGER NOT NULL REFERENCES students (id),
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            status VARCHAR(20) NOT NULL,
+            idempotency_key VARCHAR(64),
+            CONSTRAINT {name}_pkey PRIMARY KEY (id, "timestamp"),
+            CONSTRAINT uq_{name}_idempotency_key UNIQUE (idempotency_key, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.execute(f"CREATE INDEX ix_{name}_id ON {name} (id)")
+    op.execute(f'CREATE INDEX ix_{name}_student_id_timestamp ON {name} (student_id, "timestamp")')
+
+
+def _upgrade_postgresql():
+    op.execute("ALTER TABLE attendances RENAME TO attendances_unpartitioned")
+    op.execute("ALTER TABLE attendances_unpartitioned RENAME CONSTRAINT attendances_pkey TO attendances_unpartitioned_pkey")
+    op.execute("ALTER TABLE attendances_unpartitioned RENAME CONSTRAINT uq_attendances_idempotency_key TO uq_attendances_unpartitioned_idempotency_key")
+    op.execute("ALTER INDEX IF EXISTS ix_attendances_id RENAME TO ix_attendances_unpartitioned_id")
+
+    _create_partitioned_table("attendances")
+    op.execute("ALTER SEQUENCE attendances_id_seq OWNED BY attendances.id")
+    op.execute("CREATE TABLE attendances_default PARTITION OF attendances DEFAULT")
+
+    # One partition per month from the oldest row to a few months ahead
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', coalesce(
+                (SELECT min("timestamp") FROM attendances_unpartitioned), now()))::date;
+            last_month date := (date_trunc('month', now()) + interval '{MONTHS_AHEAD} months')::date;
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF attendances FOR VALUES FROM (%L) TO (%L)',
+                    'attendances_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    month::timestamptz,
+                    (month + interval '1 month')::timestamptz
+                );
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+
+    op.execute("""
+        INSERT INTO attendances (id, student_id, "timestamp", status, idempotency_key)
+        SELECT id, student_id, coalesce("timestamp", now()), status, idempotency_key
+        FROM attendances_unpartitioned
+    """)
+    op.execute("DROP TABLE attendances_unpartitioned")
+
+
+def _downgrade_postgresql():
+    op.execute("ALTER TABLE attendances RENAME TO attendances_partitioned")
+    op.execute("ALTER INDEX ix_attendances_id RENAME TO ix_attendances_partitioned_id")
+    op.execute("ALTER TABLE attendances_partitioned RENAME CONSTRAINT uq_attendances_idempotency_key TO uq_attendances_partitioned_idempotency_key")
+    op.execute("""
+        CREATE TABLE attendances (
+            id INTEGER NOT NULL DEFAULT nextval('attendances_id_seq'),
+            student_id INTEGER NOT NULL REFERENCES students (id),
+            "timestamp" TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            status VARCHAR(20) NOT NULL,
+            idempotency_key VARCHAR(64),
+            CONSTRAINT attendances_pkey PRIMARY KEY (id),
+            CONSTRAINT uq_attendances_idempotency_key UNIQUE (idempotency_key)
+        )
+    """)
+    op.execute("CREATE INDEX ix_attendances_id ON attendances (id)")
+    # Keys that only differed by timestamp collapse to their first row
+    op.execute("""
+        INSERT INTO attendances (id, student_id, "timestamp", status, idempotency_key)
+        SELECT DISTINCT ON (coalesce(idempotency_key, id::text))
+            id, student_id, "timestamp", status, idempotency_key
+        FROM attendances_partitioned
+        ORDER BY coalesce(idempotency_key, id::text), "timestamp"
+    """)
+    op.execute("ALTER SEQUENCE attendances_id_seq OWNED BY attendances.id")
+    op.execute("DROP TABLE attendances_partitioned CASCADE")
+
+
+def upgrade():
+    op.create_table('attendance_monthly_rollup',
+    sa.Column('student_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('present_count', sa.Integer(), nullable=False),
+    sa.Column('late_count', sa.Integer(), nullable=False),
+    sa.Column('days_attended', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('student_id', 'month')
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        _upgrade_postgresql()
+        return
+
+    op.execute("UPDATE attendances SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL")
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.alter_column('timestamp',
+               existing_type=sa.DateTime(timezone=True),
+               nullable=False,
+               existing_server_default=sa.func.now())
+        batch_op.create_index('ix_attendances_student_id_timestamp', ['student_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        _downgrade_postgresql()
+    else:
+        with op.batch_alter_table('attendances', schema=None) as batch_op:
+            batch_op.drop_index('ix_attendances_student_id_timestamp')
+            batch_op.alter_column('timestamp',
+                   existing_type=sa.DateTime(timezone=True),
+                   nullable=True,
+                   existing_server_default=sa.func.now())
+
+    op.drop_table('attendance_monthly_rollup')
@@ -0,0 +1,132 @@
+"""baseline schema
+
+Revision ID: f540b7abf055
+Revises: 
+Create Date: 2026-10-19 18:18:58.191581
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f540b7abf055'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _create_indexes(table, indexes, existing):
+    """Creates the (name, columns, unique) indexes `table` does not have yet."""
+    present = {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table)} if table in existing else set()
+    with op.batch_alter_table(table, schema=None) as batch_op:
+        for name, columns, unique in indexes:
+            if name not in present:
+                batch_op.create_index(name, columns, unique=unique)
+
+
+def upgrade():
+    # Installs from before migrations existed got these tables from
+    # db.create_all(); leave what is there and only add what is missing
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'courses' not in existing:
+        op.create_table('courses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _create_indexes('courses', [('ix_courses_name', ['name'], True)], existing)
+
+    if 'students' not in existing:
+        op.create_table('students',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=False),
+        sa.Column('last_name', sa.String(length=100), nullable=False),
+        sa.Column('admission_number', sa.String(length=50), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _create_indexes('students', [
+        ('ix_students_admission_number', ['admission_number'], True),
+        ('ix_students_first_name', ['first_name'], False),
+        ('ix_students_id', ['id'], False),
+        ('ix_students_last_name', ['last_name'], False),
+    ], existing)
+
+    if 'system_settings' not in existing:
+        op.create_table('system_settings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+        )
+    if 'users' not in existing:
+        op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _create_indexes('users', [('ix_users_username', ['username'], True)], existing)
+
+    if 'attendances' not in existing:
+        op.create_table('attendances',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _create_indexes('attendances', [('ix_attendances_id', ['id'], False)], existing)
+
+    if 'embeddings' not in existing:
+        op.create_table('embeddings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('vector', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _create_indexes('embeddings', [
+        ('ix_embeddings_id', ['id'], False),
+        ('ix_embeddings_student_id', ['student_id'], False),
+        ('ix_embeddings_user_id', ['user_id'], False),
+    ], existing)
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('embeddings', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_embeddings_user_id'))
+        batch_op.drop_index(batch_op.f('ix_embeddings_student_id'))
+        batch_op.drop_index(batch_op.f('ix_embeddings_id'))
+
+    op.drop_table('embeddings')
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_attendances_id'))
+
+    op.drop_table('attendances')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+
+    op.drop_table('users')
+    op.drop_table('system_settings')
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_students_last_name'))
+        batch_op.drop_index(batch_op.f('ix_students_id'))
+        batch_op.drop_index(batch_op.f('ix_students_first_name'))
+        batch_op.drop_index(batch_op.f('ix_students_admission_number'))
+
+    op.drop_table('students')
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_courses_name'))
+
+    op.drop_table('courses')
+    # ### end Alembic commands ###
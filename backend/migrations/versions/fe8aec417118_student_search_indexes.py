@@ -0,0 +1,67 @@
+"""student search indexes
+
+Revision ID: fe8aec417118
+Revises: be29a52eadbd
+Create Date: 2026-10-19 18:29:38.025748
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fe8aec417118'
+down_revision = 'be29a52eadbd'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_COLUMNS = ("first_name", "last_name", "admission_number")
+
+
+def _trigram_available(bind):
+    """pg_trgm is optional: use it if installed or installable by this role."""
+    if bind.execute(sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar():
+        return True
+    if not bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar():
+        return False
+    try:
+        with bind.begin_nested():
+            bind.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        return True
+    except sa.exc.DBAPIError:
+        return False
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return  # SQLite: the plain column indexes are enough
+
+    # Prefix search: lower(col) LIKE 'abc%' needs pattern ops under non-C collations
+    for column in SEARCH_COLUMNS:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_students_{column}_lower_pattern "
+            f"ON students (lower({column}) text_pattern_ops)"
+        )
+
+    # Substring search (match=contains)
+    if _trigram_available(bind):
+        for column in SEARCH_COLUMNS:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_students_{column}_trgm "
+                f"ON students USING gin (lower({column}) gin_trgm_ops)"
+            )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_students_full_name_trgm "
+            "ON students USING gin (lower((first_name || ' ') || last_name) gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_students_full_name_trgm")
+    for column in SEARCH_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_students_{column}_trgm")
+        op.execute(f"DROP INDEX IF EXISTS ix_students_{column}_lower_pattern")
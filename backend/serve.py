@@ -16,4 +16,15 @@ if __name__ == "__main__":
     with app.app_context():
         create_default_admin()
 
-    serve(app, host="0.0.0.0", port=port)
+    # Wake the biometric service so its warm-up overlaps ours
+    import threading
+    from app.services.face_engine import wait_until_ready
+    threading.Thread(target=wait_until_ready, name="biometric-wake", daemon=True).start()
+
+    # Replay any attendance journal left by a crashed process
+    from app.services.attendance_writer import attendance_writer
+    attendance_writer.start()
+
+    # Live dashboard streams each hold a thread; keep headroom for scans
+    threads = int(os.environ.get("WAITRESS_THREADS", 16))
+    serve(app, host="0.0.0.0", port=port, threads=threads)
@@ -1,9 +1,26 @@
-from flask import Flask, request, jsonify
-import face_recognition
+from flask import Flask, request, jsonify, Response, g
+from contextlib import contextmanager
+import atexit
+import multiprocessing
+import threading
+import time
 import numpy as np
 
+import metrics
+from gallery import Gallery
+from intake import open_upload, decode_image, IntakeError
+from warmup import Warmup
+import profiles
+import matching
+
 app = Flask(__name__)
 
+# Resident gallery (one shard of it when the backend runs in sharded mode).
+# It lives in process memory, so /gallery* is only served in GALLERY_MODE,
+# where serve.py runs a single worker; forked workers would each hold a
+# different gallery.
+GALLERY = Gallery()
+
 # -----------------------------
 # Simple security for ngrok use
 # -----------------------------
@@ -14,44 +31,216 @@ def authorize(req):
     return req.headers.get("X-API-KEY") == API_KEY
 
 
+# -----------------------------
+# Request size limits
+# -----------------------------
+# Gallery pushes and /compare carry the known vectors as JSON; images are small
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_JSON_MB", 64)) * 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", 10)) * 1024 * 1024
+
+
+@app.errorhandler(413)
+def too_large(e):
+    return jsonify({"error": "Request body too large"}), 413
+
+
+# -----------------------------
+# Warm-up: models, first inference, gallery snapshot
+# -----------------------------
+GALLERY_MODE = os.environ.get("GALLERY_MODE", "false").lower() == "true"
+GALLERY_SNAPSHOT_PATH = os.environ.get("GALLERY_SNAPSHOT_PATH")
+WARMUP = Warmup()
+metrics.READY.set(0)
+# serve.py sets "preload" and warms up in the master before forking workers
+if os.environ.get("BIOMETRIC_WARMUP", "background") == "background":
+    WARMUP.start(GALLERY, GALLERY_SNAPSHOT_PATH)
+
+
+def warming_up():
+    return jsonify({"error": "Biometric service is warming up"}), 503, {"Retry-After": "5"}
+
+
+def gallery_mode_required():
+    return jsonify({"error": "Gallery endpoints need GALLERY_MODE=true on this node"}), 409
+
+
+# Gallery pushes arrive in bursts; the snapshot is rewritten once a burst
+# has settled for this long, on a background thread
+GALLERY_SAVE_DELAY = float(os.environ.get("GALLERY_SAVE_DELAY_SECONDS", 2))
+_gallery_dirty = threading.Event()
+_gallery_flusher = None
+_gallery_flusher_lock = threading.Lock()
+
+
+def _write_gallery():
+    _gallery_dirty.clear()
+    try:
+        GALLERY.save(GALLERY_SNAPSHOT_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not save gallery snapshot: {e}")
+
+
+def _flush_gallery():
+    while True:
+        _gallery_dirty.wait()
+        # Wait out the burst: every push in it lands in one write
+        while _gallery_dirty.is_set():
+            _gallery_dirty.clear()
+            time.sleep(GALLERY_SAVE_DELAY)
+        _write_gallery()
+
+
+def _flush_gallery_at_exit():
+    if _gallery_dirty.is_set():
+        _write_gallery()
+
+
+def save_gallery():
+    """Schedules a snapshot write; the thread starts in the worker that serves pushes."""
+    global _gallery_flusher
+    if not GALLERY_SNAPSHOT_PATH:
+        return
+    with _gallery_flusher_lock:
+        if _gallery_flusher is None:
+            _gallery_flusher = threading.Thread(target=_flush_gallery, name="gallery-flush", daemon=True)
+            _gallery_flusher.start()
+            atexit.register(_flush_gallery_at_exit)
+    _gallery_dirty.set()
+
+
+# /encode requests in progress on this node. Created at import, before
+# serve.py forks, so every worker shares the one counter.
+ENCODES_IN_FLIGHT = multiprocessing.Value("i", 0)
+
+
+def _count_encode(delta):
+    with ENCODES_IN_FLIGHT.get_lock():
+        ENCODES_IN_FLIGHT.value += delta
+
+
+@contextmanager
+def stage(name):
+    """Times an /encode stage into metrics and the Server-Timing header."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.ENCODE_STAGE_SECONDS.observe(elapsed, stage=name)
+        g.timings.append(f"{name};dur={round(elapsed * 1000, 2)}")
+
+
+@app.before_request
+def _start_timer():
+    g.started = time.perf_counter()
+    g.request_id = request.headers.get("X-Request-ID", "-")
+    g.timings = []
+    metrics.IN_FLIGHT.inc()
+    if request.endpoint == "encode_face":
+        g.encoding = True
+        _count_encode(1)
+
+
+@app.after_request
+def _record_request(response):
+    started = g.get("started")
+    if started is not None:
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.endpoint or "unknown",
+            status=response.status_code,
+        )
+    if g.get("timings"):
+        response.headers["Server-Timing"] = ", ".join(g.timings)
+    if g.get("request_id", "-") != "-":
+        response.headers["X-Request-ID"] = g.request_id
+    return response
+
+
+@app.teardown_request
+def _end_request(exc):
+    if g.pop("started", None) is not None:
+        metrics.IN_FLIGHT.dec()
+    if g.pop("encoding", False):
+        _count_encode(-1)
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """This worker's metrics only; with several workers each scrape lands on one of them."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/health", methods=["GET"])
 def health():
     return jsonify({"status": "healthy"}), 200
 
 
+@app.route("/ready", methods=["GET"])
+def ready():
+    """Green only once warm-up has finished; /health just means the process is up."""
+    body = WARMUP.status()
+    body["gallery_size"] = len(GALLERY)
+    return jsonify(body), 200 if WARMUP.ready else 503
+
+
+@app.route("/load", methods=["GET"])
+def load():
+    """Encodes in progress across every worker; the backend sheds scans above its limit."""
+    return jsonify({"in_flight": ENCODES_IN_FLIGHT.value}), 200
+
+
 @app.route("/encode", methods=["POST"])
 def encode_face():
     """
     Detects a face and returns its 128-d encoding.
-    Supports is_enrollment=true for jittered augmentation.
+    `profile` picks an encoding profile (fast / balanced / enroll);
+    is_enrollment=true without a profile means `enroll`.
     """
     if not authorize(request):
         return jsonify({"error": "Unauthorized"}), 401
+    if not WARMUP.ready:
+        return warming_up()
+    face_recognition = WARMUP.models
+    request.max_content_length = MAX_UPLOAD_BYTES
 
-    image_file = request.files.get("image")
-    is_enrollment = request.form.get("is_enrollment", "false").lower() == "true"
+    image_fp = open_upload(request)
+    is_enrollment = (
+        request.form.get("is_enrollment") or request.args.get("is_enrollment", "false")
+    ).lower() == "true"
+    try:
+        profile_name, profile = profiles.resolve(
+            request.form.get("profile") or request.args.get("profile"), is_enrollment
+        )
+    except KeyError as e:
+        return jsonify({"error": f"Unknown profile {e}; use one of {sorted(profiles.PROFILES)}"}), 400
 
-    if not image_file:
+    if image_fp is None:
         return jsonify({"error": "No image provided"}), 400
 
     try:
-        # Load image
-        image = face_recognition.load_image_file(image_file)
+        # Decode (reduced-scale for large JPEGs, resolution checked on header)
+        try:
+            with stage("decode"):
+                image, intake_stats = decode_image(image_fp)
+        except IntakeError as e:
+            print(f"❌ [{g.request_id}] Rejected: {e}")
+            return jsonify({"error": str(e)}), 400
+        metrics.DECODED_BYTES.observe(intake_stats["decoded_bytes"])
 
-        # Quality Validation: resolution
         height, width = image.shape[:2]
-        if height < 200 or width < 200:
-            print(f"❌ Rejected: Low resolution ({width}x{height})")
-            return jsonify({
-                "error": "Image resolution too low. Minimum 200x200 required."
-            }), 400
+        print(
+            f"📥 [{g.request_id}] Decoded {intake_stats['decoded_bytes']} bytes "
+            f"({width}x{height}) in {intake_stats['decode_ms']}ms"
+        )
 
         # Face detection
-        face_locations = face_recognition.face_locations(
-            image,
-            number_of_times_to_upsample=2,
-            model="hog"
-        )
+        with stage("detect"):
+            face_locations = face_recognition.face_locations(
+                image,
+                number_of_times_to_upsample=profile["upsample"],
+                model="hog"
+            )
 
         if not face_locations:
             print("❌ Rejected: No face detected")
@@ -68,20 +257,21 @@ def encode_face():
                 "error": "Face too small or too far away. Please move closer."
             }), 400
 
-        # Jittering for enrollment
-        jitters = 100 if is_enrollment else 1
-        encodings = face_recognition.face_encodings(
-            image,
-            known_face_locations=face_locations,
-            num_jitters=jitters,
-            model="large"
-        )
+        with stage("encode"):
+            encodings = face_recognition.face_encodings(
+                image,
+                known_face_locations=face_locations,
+                num_jitters=profile["jitters"],
+                model=profile["landmarks"]
+            )
 
         if not encodings:
             return jsonify({"error": "Failed to extract encoding"}), 400
 
         return jsonify({
-            "encoding": encodings[0].tolist()
+            "encoding": encodings[0].tolist(),
+            "profile": profile_name,
+            "intake": intake_stats
         }), 200
 
     except Exception as e:
@@ -92,6 +282,11 @@ def encode_face():
 def compare_faces():
     """
     Compares an unknown encoding against a list of known encodings.
+
+    mode=best (default): best and second-best distances and a decision
+    (match / ambiguous / no_match) using `tolerance` and `margin`. With
+    `labels` (one per known) the runner-up is the nearest other person.
+    mode=first: early-exit scan returning the first known under tolerance.
     """
     if not authorize(request):
         return jsonify({"error": "Unauthorized"}), 401
@@ -102,30 +297,128 @@ def compare_faces():
 
     try:
         unknown = np.array(data["unknown"])
-        knowns = [np.array(k) for k in data["knowns"]]
+        knowns = data["knowns"]
         tolerance = float(data.get("tolerance", 0.45))
+        margin = float(data.get("margin", 0.0))
+        labels = data.get("labels")
+        mode = data.get("mode", "best")
 
+        if labels is not None and len(labels) != len(knowns):
+            return jsonify({"error": "labels must match knowns"}), 400
         if not knowns:
-            return jsonify({"match_index": -1}), 200
+            return jsonify({"match_index": -1, "decision": "no_match"}), 200
 
-        distances = face_recognition.face_distance(knowns, unknown)
-        best_match_index = int(np.argmin(distances))
+        metrics.COMPARE_GALLERY_SIZE.observe(len(knowns))
+        started = time.perf_counter()
+        if mode == "first":
+            index, distance, scanned = matching.first_under(knowns, unknown, tolerance)
+            result = {"match_index": index, "scanned": scanned}
+            if index != -1:
+                result["distance"] = distance
+        else:
+            if len(knowns) >= matching.COARSE_MIN_ROWS:
+                # float32 copy for the coarse pass; exact rows come from the lists
+                coarse, matrix = np.asarray(knowns, dtype=np.float32), knowns
+            else:
+                coarse, matrix = None, np.asarray(knowns, dtype=np.float64)
+            result = matching.decide(
+                matrix, unknown, tolerance, margin,
+                labels=[str(label) for label in labels] if labels is not None else None,
+                coarse=coarse,
+            )
+        elapsed = time.perf_counter() - started
+        metrics.COMPARE_SECONDS.observe(elapsed)
+        g.timings.append(f"distance;dur={round(elapsed * 1000, 2)}")
 
-        if distances[best_match_index] < tolerance:
-            return jsonify({
-                "match_index": best_match_index,
-                "distance": float(distances[best_match_index])
-            }), 200
-
-        return jsonify({"match_index": -1}), 200
+        return jsonify(result), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/gallery", methods=["GET"])
+def gallery_ids():
+    if not authorize(request):
+        return jsonify({"error": "Unauthorized"}), 401
+    if not GALLERY_MODE:
+        return gallery_mode_required()
+    return jsonify({"size": len(GALLERY), "ids": GALLERY.ids()}), 200
+
+
+@app.route("/gallery", methods=["PUT"])
+def gallery_upsert():
+    """
+    Adds or replaces gallery entries: {"items": [{"id": ..., "vector": [...]}]}
+    """
+    if not authorize(request):
+        return jsonify({"error": "Unauthorized"}), 401
+    if not GALLERY_MODE:
+        return gallery_mode_required()
+
+    data = request.get_json()
+    if not data or "items" not in data:
+        return jsonify({"error": "Missing data"}), 400
+
+    try:
+        count = GALLERY.upsert((item["id"], item["vector"]) for item in data["items"])
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid gallery item: {e}"}), 400
+
+    metrics.GALLERY_SIZE.set(len(GALLERY))
+    save_gallery()
+    return jsonify({"upserted": count, "size": len(GALLERY)}), 200
+
+
+@app.route("/gallery", methods=["DELETE"])
+def gallery_remove():
+    if not authorize(request):
+        return jsonify({"error": "Unauthorized"}), 401
+    if not GALLERY_MODE:
+        return gallery_mode_required()
+
+    data = request.get_json()
+    if not data or "ids" not in data:
+        return jsonify({"error": "Missing data"}), 400
+
+    removed = GALLERY.remove(data["ids"])
+    metrics.GALLERY_SIZE.set(len(GALLERY))
+    save_gallery()
+    return jsonify({"removed": removed, "size": len(GALLERY)}), 200
+
+
+@app.route("/gallery/search", methods=["POST"])
+def gallery_search():
+    """
+    Nearest gallery entries to an unknown encoding: {"unknown": [...], "k": 3}
+    """
+    if not authorize(request):
+        return jsonify({"error": "Unauthorized"}), 401
+    if not GALLERY_MODE:
+        return gallery_mode_required()
+    if not WARMUP.ready:
+        return warming_up()
+
+    data = request.get_json()
+    if not data or "unknown" not in data:
+        return jsonify({"error": "Missing data"}), 400
+
+    started = time.perf_counter()
+    matches = GALLERY.search(data["unknown"], k=int(data.get("k", 3)))
+    elapsed = time.perf_counter() - started
+    metrics.COMPARE_SECONDS.observe(elapsed)
+    g.timings.append(f"search;dur={round(elapsed * 1000, 2)}")
+
+    return jsonify({
+        "matches": [{"id": gid, "distance": d} for gid, d in matches],
+        "size": len(GALLERY)
+    }), 200
+
+
 # -----------------------------
-# Run locally (FREE + ngrok)
+# Run locally (FREE + ngrok); production uses serve.py
 # -----------------------------
 if __name__ == "__main__":
-    print("🚀 Biometric Service running on port 5000")
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    port = int(os.environ.get("PORT", 5000))
+    debug_mode = os.getenv("FLASK_DEBUG", "False").lower() == "true"
+    print(f"🚀 Biometric Service running on port {port}")
+    app.run(host="0.0.0.0", port=port, debug=debug_mode)
@@ -0,0 +1,162 @@
+"""
+Latency and match-distance drift of each encoding profile on a fixed
+image set:
+
+    python benchmark_profiles.py path/to/images --repeat 3 --out profiles.json
+
+The image set is one folder per person (images/<person>/*.jpg), so the
+same files give comparable numbers run after run. The `enroll` profile is
+the reference: it is what galleries are enrolled with.
+
+Per profile it reports:
+- latency: detect + encode per image (p50 / p95 / mean ms), decode excluded
+- no_face: images where the profile's detector found nothing
+- drift: distance between the profile's encoding and the reference
+  encoding of the same image
+- genuine / impostor: distance to the nearest reference encoding of the
+  same person (other images) and of anyone else
+- accuracy: share of scans whose nearest reference is the right person
+  within --tolerance
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from intake import decode_image
+from profiles import PROFILES
+
+REFERENCE = "enroll"
+EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def load_images(root):
+    images = []
+    for person in sorted(os.listdir(root)):
+        folder = os.path.join(root, person)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(EXTENSIONS):
+                with open(os.path.join(folder, name), "rb") as f:
+                    image, _ = decode_image(f)
+                images.append((person, name, image))
+    return images
+
+
+def encode(face_recognition, image, profile):
+    locations = face_recognition.face_locations(
+        image, number_of_times_to_upsample=profile["upsample"], model="hog"
+    )
+    if not locations:
+        return None
+    return face_recognition.face_encodings(
+        image, known_face_locations=locations[:1],
+        num_jitters=profile["jitters"], model=profile["landmarks"],
+    )[0]
+
+
+def summary(values):
+    if not values:
+        return None
+    arr = np.asarray(values)
+    return {
+        "p50": round(float(np.percentile(arr, 50)), 4),
+        "p95": round(float(np.percentile(arr, 95)), 4),
+        "mean": round(float(arr.mean()), 4),
+        "max": round(float(arr.max()), 4),
+    }
+
+
+def run_profile(face_recognition, images, profile, repeat):
+    encodings, latencies = [], []
+    for _, _, image in images:
+        encoding = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            encoding = encode(face_recognition, image, profile)
+            latencies.append((time.perf_counter() - started) * 1000)
+        encodings.append(encoding)
+    return encodings, latencies
+
+
+def match_stats(images, encodings, reference, tolerance):
+    drift, genuine, impostor, correct, scored = [], [], [], 0, 0
+    for i, (person, _, _) in enumerate(images):
+        probe = encodings[i]
+        if probe is None:
+            continue
+        if reference[i] is not None:
+            drift.append(float(np.linalg.norm(probe - reference[i])))
+
+        same, other = [], []
+        for j, (other_person, _, _) in enumerate(images):
+            if j == i or reference[j] is None:
+                continue
+            distance = float(np.linalg.norm(probe - reference[j]))
+            (same if other_person == person else other).append(distance)
+        if not same:
+            continue  # only one usable image of this person
+        scored += 1
+        genuine.append(min(same))
+        if other:
+            impostor.append(min(other))
+        if min(same) < tolerance and (not other or min(same) < min(other)):
+            correct += 1
+
+    return {
+        "drift": summary(drift),
+        "genuine": summary(genuine),
+        "impostor": summary(impostor),
+        "accuracy": round(correct / scored, 4) if scored else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", help="folder with one sub-folder of images per person")
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.45)
+    parser.add_argument("--out", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    import face_recognition
+
+    images = load_images(args.images)
+    print(f"🖼️ {len(images)} images of {len({p for p, _, _ in images})} people")
+
+    names = [n for n in args.profiles.split(",") if n]
+    # The reference always runs (once) so every profile can be compared to it
+    reference, _ = run_profile(face_recognition, images, PROFILES[REFERENCE], 1)
+
+    results = {}
+    for name in names:
+        encodings, latencies = run_profile(face_recognition, images, PROFILES[name], args.repeat)
+        results[name] = {
+            "settings": PROFILES[name],
+            "latency_ms": summary(latencies),
+            "no_face": sum(e is None for e in encodings),
+            **match_stats(images, encodings, reference, args.tolerance),
+        }
+        print(f"⏱️ {name}: {results[name]['latency_ms']} drift {results[name]['drift']}")
+
+    document = {
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "images": len(images),
+        "repeat": args.repeat,
+        "tolerance": args.tolerance,
+        "reference": REFERENCE,
+        "profiles": results,
+    }
+    print(json.dumps(document, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
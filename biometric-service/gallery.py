@@ -0,0 +1,95 @@
+import os
+import threading
+
+import numpy as np
+
+from matching import nearest
+
+DIM = 128
+
+
+class Gallery:
+    """
+    Resident set of (id, encoding) pairs held as one contiguous matrix so a
+    search is a single vectorised distance pass. Writers rebuild the matrix;
+    readers take a consistent (ids, matrix) snapshot without blocking.
+    A float32 copy of the matrix backs the coarse stage of search.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # (ids, matrix, coarse) swapped as one object so readers never see a torn pair
+        self._set([], np.empty((0, DIM)))
+
+    def _set(self, ids, matrix):
+        self._state = (ids, matrix, matrix.astype(np.float32))
+
+    def __len__(self):
+        return len(self._state[0])
+
+    def ids(self):
+        return list(self._state[0])
+
+    def upsert(self, items):
+        """items: iterable of (id, vector). Replaces vectors for known ids."""
+        items = [(str(i), np.asarray(v, dtype=np.float64)) for i, v in items]
+        with self._lock:
+            current_ids, current_matrix, _ = self._state
+            positions = {gid: n for n, gid in enumerate(current_ids)}
+            ids = list(current_ids)
+            matrix = current_matrix.copy()
+            appended = []
+            for gid, vector in items:
+                if gid in positions:
+                    matrix[positions[gid]] = vector
+                else:
+                    positions[gid] = len(ids)
+                    ids.append(gid)
+                    appended.append(vector)
+            if appended:
+                matrix = np.vstack([matrix, np.array(appended)])
+            self._set(ids, matrix)
+        return len(items)
+
+    def remove(self, ids):
+        drop = {str(i) for i in ids}
+        with self._lock:
+            current_ids, matrix, _ = self._state
+            keep = [n for n, gid in enumerate(current_ids) if gid not in drop]
+            self._set([current_ids[n] for n in keep], matrix[keep])
+        return len(current_ids) - len(keep)
+
+    def save(self, path):
+        """Writes the current gallery to `path` (.npz), replacing it atomically."""
+        with self._save_lock:
+            ids, matrix, _ = self._state
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, ids=np.array(ids, dtype=str), matrix=matrix)
+            os.replace(tmp, path)
+
+    def load(self, path):
+        """
+        Adds the entries saved at `path`. Ids already resident (pushed while
+        the service was starting) keep their current vector.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            saved_ids, saved_matrix = data["ids"].tolist(), data["matrix"]
+        with self._lock:
+            current_ids, current_matrix, _ = self._state
+            known = set(current_ids)
+            keep = [n for n, gid in enumerate(saved_ids) if gid not in known]
+            self._set(
+                list(current_ids) + [saved_ids[n] for n in keep],
+                np.vstack([current_matrix, saved_matrix[keep].reshape(-1, DIM)]),
+            )
+        return len(keep)
+
+    def search(self, probe, k=3):
+        """The k nearest ids as [(id, distance)], closest first."""
+        ids, matrix, coarse = self._state
+        if not ids:
+            return []
+        indices, distances = nearest(matrix, probe, k, coarse)
+        return [(ids[n], float(d)) for n, d in zip(indices, distances)]
@@ -0,0 +1,130 @@
+"""
+Nearest-neighbour search shared by /compare and the resident gallery.
+
+Large galleries use a two-stage search: cheap float32 distances over every
+row pick a handful of candidates, then exact float64 distances rank them.
+Rows whose float32 distance is within rounding of the exact result are
+re-checked, so the answer is the same as a full float64 pass.
+"""
+import numpy as np
+
+# Below this a single exact pass is cheaper than two stages
+COARSE_MIN_ROWS = 2048
+COARSE_CANDIDATES = 32
+# float32 rounding on a 128-d distance is ~1e-7; stay well clear of it
+COARSE_SLACK = 1e-4
+EARLY_EXIT_CHUNK = 1024
+
+
+def _rows(matrix, indices):
+    """Rows as float64; `matrix` may be an array or the raw list of vectors."""
+    if isinstance(matrix, np.ndarray):
+        return matrix[indices]
+    return np.array([matrix[i] for i in indices], dtype=np.float64).reshape(len(indices), -1)
+
+
+def _top(indices, distances, k):
+    k = min(k, len(indices))
+    if k == 0:
+        return indices[:0], distances[:0]
+    order = np.argpartition(distances, k - 1)[:k]
+    order = order[np.argsort(distances[order])]
+    order = order[np.isfinite(distances[order])]
+    return indices[order], distances[order]
+
+
+def nearest(matrix, probe, k=1, coarse=None, exclude=None):
+    """
+    (indices, distances) of the k nearest rows, closest first. `coarse` is a
+    float32 copy of `matrix` enabling the two-stage search; `exclude` is a
+    boolean mask of rows to leave out.
+    """
+    probe = np.asarray(probe, dtype=np.float64)
+    n = len(matrix)
+
+    if coarse is None or n < COARSE_MIN_ROWS:
+        distances = np.linalg.norm(_rows(matrix, np.arange(n)) - probe, axis=1)
+        if exclude is not None:
+            distances[exclude] = np.inf
+        return _top(np.arange(n), distances, k)
+
+    rough = np.linalg.norm(coarse - probe.astype(np.float32), axis=1)
+    if exclude is not None:
+        rough[exclude] = np.inf
+    m = min(n, max(k, COARSE_CANDIDATES))
+    candidates = np.argpartition(rough, m - 1)[:m]
+    candidates = candidates[np.isfinite(rough[candidates])]
+    fine = np.linalg.norm(_rows(matrix, candidates) - probe, axis=1)
+    indices, distances = _top(candidates, fine, k)
+    if not len(indices):
+        return indices, distances
+
+    # Anything the coarse pass ranked out but that could still tie the kth result
+    bound = distances[-1] + COARSE_SLACK
+    recheck = np.setdiff1d(np.flatnonzero(rough <= bound), candidates, assume_unique=True)
+    if len(recheck):
+        extra = np.linalg.norm(_rows(matrix, recheck) - probe, axis=1)
+        indices, distances = _top(
+            np.concatenate([indices, recheck]), np.concatenate([distances, extra]), k
+        )
+    return indices, distances
+
+
+def decide(matrix, probe, tolerance, margin=0.0, labels=None, coarse=None):
+    """
+    Best and second-best distances and a margin-based decision:
+    - match:     best < tolerance and it beats the runner-up by >= margin
+    - ambiguous: best < tolerance but the runner-up is too close
+    - no_match:  best >= tolerance
+    The runner-up is the nearest row with a different label (another
+    person), or simply the second row when no labels are given.
+    """
+    indices, distances = nearest(matrix, probe, 1, coarse)
+    if not len(indices):
+        return {"decision": "no_match", "match_index": -1, "best": None, "second": None, "margin": None}
+    best_index, best = int(indices[0]), float(distances[0])
+
+    if labels is not None:
+        exclude = np.asarray(labels) == labels[best_index]
+    else:
+        exclude = np.zeros(len(matrix), dtype=bool)
+        exclude[best_index] = True
+    second_indices, second_distances = nearest(matrix, probe, 1, coarse, exclude)
+    second = None
+    if len(second_indices):
+        second = {"index": int(second_indices[0]), "distance": float(second_distances[0])}
+    gap = second["distance"] - best if second else None
+
+    if best >= tolerance:
+        decision = "no_match"
+    elif gap is not None and gap < margin:
+        decision = "ambiguous"
+    else:
+        decision = "match"
+
+    result = {
+        "decision": decision,
+        "match_index": best_index if decision == "match" else -1,
+        "best": {"index": best_index, "distance": best},
+        "second": second,
+        "margin": gap,
+    }
+    if decision == "match":
+        result["distance"] = best
+    return result
+
+
+def first_under(knowns, probe, tolerance, chunk=EARLY_EXIT_CHUNK):
+    """
+    Early-exit scan for duplicate checks: (index, distance, rows_scanned)
+    of the first row under `tolerance`, converting and measuring one chunk
+    at a time. Index is -1 when nothing is close enough.
+    """
+    probe = np.asarray(probe, dtype=np.float64)
+    for start in range(0, len(knowns), chunk):
+        block = np.asarray(knowns[start:start + chunk], dtype=np.float64)
+        distances = np.linalg.norm(block - probe, axis=1)
+        hits = np.flatnonzero(distances < tolerance)
+        if len(hits):
+            return start + int(hits[0]), float(distances[hits[0]]), start + len(block)
+    return -1, None, len(knowns)
@@ -0,0 +1,30 @@
+"""
+Named encoding profiles for /encode. Each trades latency for fidelity:
+
+- fast:      1x upsample, 5-point landmarks, no jitter (verify on weak hardware)
+- balanced:  2x upsample, 68-point landmarks, no jitter (the original verify path)
+- enroll:    2x upsample, 68-point landmarks, 100 jitters (the original enrollment path)
+
+All profiles produce encodings in the same 128-d space, so a scan encoded
+with `fast` is still matched against galleries enrolled with `enroll`.
+"""
+import os
+
+PROFILES = {
+    "fast": {"upsample": 1, "landmarks": "small", "jitters": 1},
+    "balanced": {"upsample": 2, "landmarks": "large", "jitters": 1},
+    "enroll": {"upsample": 2, "landmarks": "large", "jitters": 100},
+}
+
+DEFAULT_PROFILE = os.environ.get("ENCODE_PROFILE", "balanced")
+if DEFAULT_PROFILE not in PROFILES:
+    raise ValueError(f"ENCODE_PROFILE must be one of {sorted(PROFILES)}")
+
+
+def resolve(name=None, is_enrollment=False):
+    """Profile name for a request; raises KeyError for an unknown name."""
+    if not name:
+        name = "enroll" if is_enrollment else DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise KeyError(name)
+    return name, PROFILES[name]
@@ -0,0 +1,49 @@
+"""
+Starts N local biometric-service shards on consecutive ports for trying
+out the backend's sharded gallery mode:
+
+    python run_shards.py 3 --base-port 5101
+
+then set BIOMETRIC_SHARDS to the printed value (or `flask shards add ...`)
+and run `flask shards sync` in the backend to load the gallery.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("count", type=int, nargs="?", default=3)
+    parser.add_argument("--base-port", type=int, default=5101)
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    ports = [args.base_port + n for n in range(args.count)]
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "serve.py"],
+            cwd=here,
+            env={**os.environ, "PORT": str(port), "GALLERY_MODE": "true"},
+        )
+        for port in ports
+    ]
+
+    urls = ",".join(f"http://127.0.0.1:{port}" for port in ports)
+    print(f"🧩 {args.count} shards running")
+    print(f"   BIOMETRIC_SHARDS={urls}")
+
+    try:
+        for proc in procs:
+            proc.wait()
+    except KeyboardInterrupt:
+        for proc in procs:
+            proc.send_signal(signal.SIGINT)
+        for proc in procs:
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
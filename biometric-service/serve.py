@@ -0,0 +1,97 @@
+"""
+Production entry point for the biometric service.
+
+dlib work is CPU-bound and holds the GIL, so throughput comes from worker
+processes (gunicorn, one per core by default) rather than threads. The
+models are loaded and warmed up once in the master and shared
+copy-on-write with the forked workers.
+
+In gallery mode (GALLERY_MODE=true, i.e. this node is a backend shard)
+the resident gallery lives in process memory, so exactly one worker runs.
+Without it the /gallery endpoints answer 409.
+
+Metrics live in each worker's memory, so with several workers a /metrics
+scrape shows only the worker that served it. /load is node-wide.
+
+Falls back to waitress (single process) where gunicorn is unavailable,
+e.g. on Windows.
+"""
+import gc
+import os
+import sys
+
+GALLERY_MODE = os.environ.get("GALLERY_MODE", "false").lower() == "true"
+CPUS = os.cpu_count() or 1
+
+WORKERS = 1 if GALLERY_MODE else int(os.environ.get("BIO_WORKERS", CPUS))
+THREADS = int(os.environ.get("BIO_THREADS", CPUS * 2 if GALLERY_MODE else 2))
+
+# One BLAS thread per worker, otherwise N workers oversubscribe the cores.
+# Must be set before numpy is imported.
+if WORKERS > 1:
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, "1")
+
+os.environ["BIOMETRIC_WARMUP"] = "preload"
+import app as service  # noqa: E402
+
+
+def options(port):
+    return {
+        "bind": f"0.0.0.0:{port}",
+        "workers": WORKERS,
+        "threads": THREADS,
+        "worker_class": "gthread",
+        "preload_app": True,
+        # Enrollment encodes with 100 jitters; give it room before a worker is killed
+        "timeout": int(os.environ.get("BIO_TIMEOUT", 120)),
+        "graceful_timeout": int(os.environ.get("BIO_GRACEFUL_TIMEOUT", 30)),
+        "keepalive": 5,
+        # Recycling a worker would drop a shard's gallery, so off in gallery mode
+        "max_requests": 0 if GALLERY_MODE else int(os.environ.get("BIO_MAX_REQUESTS", 0)),
+        "max_requests_jitter": int(os.environ.get("BIO_MAX_REQUESTS_JITTER", 50)),
+        "limit_request_line": 8190,
+        "limit_request_fields": 100,
+        "accesslog": "-",
+    }
+
+
+def serve_gunicorn(port):
+    from gunicorn.app.base import BaseApplication
+
+    class BiometricServer(BaseApplication):
+        def load_config(self):
+            for key, value in options(port).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return service.app
+
+    BiometricServer().run()
+
+
+def serve_waitress(port):
+    from waitress import serve
+    serve(service.app, host="0.0.0.0", port=port, threads=THREADS)
+
+
+if __name__ == "__main__":
+    port = int(os.environ.get("PORT", 5000))
+
+    # Warm up before binding, so every worker is forked ready
+    attempts = int(os.environ.get("WARMUP_ATTEMPTS", 3))
+    if not service.WARMUP.run_with_retry(service.GALLERY, service.GALLERY_SNAPSHOT_PATH, attempts=attempts):
+        sys.exit(1)
+    # Move the loaded objects out of the collector's reach so GC passes in
+    # the workers don't touch (and un-share) their pages
+    gc.freeze()
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print(f"🚀 Biometric Service on port {port} (waitress, {THREADS} threads)")
+        serve_waitress(port)
+    else:
+        mode = "gallery mode, " if GALLERY_MODE else ""
+        print(f"🚀 Biometric Service on port {port} ({mode}{WORKERS} workers x {THREADS} threads)")
+        serve_gunicorn(port)
@@ -0,0 +1,107 @@
+"""
+Startup phase: loads the dlib models, runs one synthetic inference so
+first-call initialisation is paid here instead of inside a user's scan,
+and restores the gallery snapshot. /ready goes green when it finishes.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+import metrics
+from profiles import PROFILES
+
+# Synthetic probe: mid-grey noise with a fixed "face" box for the encoder
+_IMAGE_SHAPE = (240, 320, 3)
+_FACE_BOX = (40, 240, 200, 80)  # top, right, bottom, left
+# Backoff between failed warm-ups (seconds, doubling up to the cap)
+RETRY_SECONDS = float(os.environ.get("WARMUP_RETRY_SECONDS", 5))
+RETRY_MAX_SECONDS = float(os.environ.get("WARMUP_RETRY_MAX_SECONDS", 300))
+
+
+class Warmup:
+    def __init__(self):
+        self.state = "starting"
+        self.error = None
+        self.stages_ms = {}
+        self.models = None  # the face_recognition module once loaded
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def _timed(self, name, fn):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        self.stages_ms[name] = round(elapsed * 1000, 1)
+        metrics.WARMUP_SECONDS.set(elapsed, stage=name)
+        return result
+
+    def run(self, gallery, snapshot_path=None):
+        self.state = "warming"
+        self.error = None
+        started = time.perf_counter()
+        try:
+            if snapshot_path and os.path.exists(snapshot_path):
+                loaded = self._timed("gallery", lambda: gallery.load(snapshot_path))
+                metrics.GALLERY_SIZE.set(len(gallery))
+                print(f"🗂️ Restored {loaded} gallery entries from {snapshot_path}")
+
+            # face_recognition builds the detector, the 68-point shape
+            # predictor and the ResNet encoder when it is imported
+            models = self._timed("load_models", _load_models)
+
+            rng = np.random.default_rng(0)
+            image = rng.integers(96, 160, size=_IMAGE_SHAPE, dtype=np.uint8)
+            upsample = max(p["upsample"] for p in PROFILES.values())
+            self._timed("detect", lambda: models.face_locations(
+                image, number_of_times_to_upsample=upsample, model="hog"
+            ))
+            for landmarks in sorted({p["landmarks"] for p in PROFILES.values()}):
+                self._timed(f"encode_{landmarks}", lambda: models.face_encodings(
+                    image, known_face_locations=[_FACE_BOX], num_jitters=1, model=landmarks
+                ))
+
+            self.models = models
+            self.state = "ready"
+            metrics.READY.set(1)
+            print(f"✅ Warm-up finished in {time.perf_counter() - started:.1f}s {self.stages_ms}")
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            print(f"❌ Warm-up failed: {e}")
+
+    def run_with_retry(self, gallery, snapshot_path=None, attempts=None):
+        """
+        run() until it succeeds, backing off between failures; at most
+        `attempts` tries when given. /ready reports the last failure
+        while waiting.
+        """
+        delay = RETRY_SECONDS
+        attempt = 1
+        while True:
+            self.run(gallery, snapshot_path)
+            if self.ready or (attempts is not None and attempt >= attempts):
+                return self.ready
+            print(f"🔁 Retrying warm-up in {delay:g}s")
+            time.sleep(delay)
+            delay = min(delay * 2, RETRY_MAX_SECONDS)
+            attempt += 1
+
+    def start(self, gallery, snapshot_path=None):
+        threading.Thread(
+            target=self.run_with_retry, args=(gallery, snapshot_path), name="warmup", daemon=True
+        ).start()
+
+    def status(self):
+        body = {"status": self.state, "stages_ms": dict(self.stages_ms)}
+        if self.error:
+            body["error"] = self.error
+        return body
+
+
+def _load_models():
+    import face_recognition
+    return face_recognition
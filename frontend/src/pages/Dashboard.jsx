@@ -74,6 +74,9 @@ const Dashboard = () => {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
+    let interval = null;
+    let source = null;
+
     const fetchStats = async () => {
       try {
         const response = await fetch(`${config.API_BASE_URL}/attendance/stats`);
@@ -88,10 +91,45 @@ const Dashboard = () => {
       }
     };
 
-    fetchStats();
-    // Poll every 30 seconds for live updates
-    const interval = setInterval(fetchStats, 30000);
-    return () => clearInterval(interval);
+    // Fall back to polling every 30 seconds when streaming is unavailable
+    const startPolling = () => {
+      if (interval) return;
+      fetchStats();
+      interval = setInterval(fetchStats, 30000);
+    };
+
+    if (typeof EventSource === "undefined") {
+      startPolling();
+    } else {
+      // Live push: full counters on connect, then one event per check-in
+      source = new EventSource(`${config.API_BASE_URL}/attendance/live`);
+
+      source.addEventListener("stats", (event) => {
+        setStats(JSON.parse(event.data));
+        setLoading(false);
+      });
+
+      source.addEventListener("checkin", (event) => {
+        const { activity, ...counters } = JSON.parse(event.data);
+        setStats((prev) => ({
+          ...prev,
+          ...counters,
+          recent_activity: [activity, ...prev.recent_activity].slice(0, 5)
+        }));
+      });
+
+      source.onerror = () => {
+        // The browser reconnects on its own unless the server refused us
+        if (source.readyState === EventSource.CLOSED) {
+          startPolling();
+        }
+      };
+    }
+
+    return () => {
+      if (source) source.close();
+      if (interval) clearInterval(interval);
+    };
   }, []);
 
   return (
@@ -44,15 +44,35 @@ const Reports = () => {
   const [searchQuery, setSearchQuery] = useState("");
   const [isSearching, setIsSearching] = useState(false);
 
-  // Fetch Students for Search
+  // Search Students (server-side prefix search, first 5 matches)
   useEffect(() => {
-    fetch(`${config.API_BASE_URL}/enroll/students`)
-      .then(res => res.json())
-      .then(data => {
-        if (data.success) setStudents(data.students);
+    const query = searchQuery.trim();
+    if (!query) {
+      setStudents([]);
+      return;
+    }
+
+    const timer = setTimeout(() => {
+      const token = localStorage.getItem("token");
+      const params = new URLSearchParams({
+        q: query,
+        limit: "5",
+        fields: "id,first_name,last_name,admission_number"
+      });
+      fetch(`${config.API_BASE_URL}/enroll/students?${params}`, {
+        headers: {
+          Authorization: `Bearer ${token}`
+        }
       })
-      .catch(err => console.error("Failed to load students", err));
-  }, []);
+        .then(res => res.json())
+        .then(data => {
+          if (data.success) setStudents(data.students);
+        })
+        .catch(err => console.error("Failed to search students", err));
+    }, 250);
+
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
 
   // Fetch Report Data
   useEffect(() => {
@@ -131,10 +151,7 @@ const Reports = () => {
     }
   };
 
-  const filteredStudents = students.filter(s =>
-    `${s.first_name} ${s.last_name}`.toLowerCase().includes(searchQuery.toLowerCase()) ||
-    s.admission_number.includes(searchQuery)
-  ).slice(0, 5); // Limit suggestions
+  const filteredStudents = students; // Already filtered and limited by the server
 
   return (
     <div className="p-6 pt-8 pb-20 relative min-h-screen">
@@ -313,6 +330,31 @@ const Reports = () => {
         </Card>
       </div>
 
+      {/* Per-student running totals */}
+      {selectedStudent && reportData.summary && !loading && (
+        <div className="grid grid-cols-2 gap-4 mt-4">
+          <Card className="p-4">
+            <p className="text-[10px] text-gray-400 font-bold uppercase mb-2">
+              Days Attended
+            </p>
+            <h3 className="text-2xl font-bold text-white">{reportData.summary.days_attended}</h3>
+            <p className="text-gray-500 text-[10px] mt-1 font-medium">
+              {reportData.summary.days_present} on time · {reportData.summary.days_late} late
+            </p>
+          </Card>
+
+          <Card className="p-4">
+            <p className="text-[10px] text-gray-400 font-bold uppercase mb-2">
+              Current Streak
+            </p>
+            <h3 className="text-2xl font-bold text-white">{reportData.summary.current_streak} days</h3>
+            <p className="text-gray-500 text-[10px] mt-1 font-medium">
+              Best {reportData.summary.longest_streak} days
+            </p>
+          </Card>
+        </div>
+      )}
+
       {/* Recent Activity Table */}
       <div className="mt-6">
         <div className="flex items-center justify-between mb-4">
@@ -83,7 +83,8 @@ const Scanner = () => {
 
             setRecentScans((prev) => [
                 {
-                    id: result.attendance.id,
+                    // id is null while the backend still has the row queued
+                    id: result.attendance.id ?? result.attendance.idempotency_key,
                     name: result.student.name,
                     time: new Date(result.attendance.timestamp)
                         .toLocaleTimeString([], { hour: "2-digit", minute: "2-digit" }),
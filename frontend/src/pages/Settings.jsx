@@ -14,14 +14,17 @@ const Settings = () => {
     const [showCamera, setShowCamera] = useState(false);
     const [status, setStatus] = useState(null);
     const [loading, setLoading] = useState(false);
-    const [sysSettings, setSysSettings] = useState({ school_start_time: '08:00' });
+    const [sysSettings, setSysSettings] = useState({ school_start_time: '08:00', verify_encoding_profile: 'balanced' });
+    const [profiles, setProfiles] = useState(['fast', 'balanced', 'enroll']);
     const [saving, setSaving] = useState(false);
 
     const fetchSettings = useCallback(async () => {
         try {
             const response = await api.get("/settings/");
             if (response.data) {
-                setSysSettings(response.data);
+                const { encoding_profiles, ...values } = response.data;
+                setSysSettings(values);
+                if (encoding_profiles) setProfiles(encoding_profiles);
             }
         } catch (err) {
             console.error("Failed to fetch settings:", err);
@@ -181,6 +184,22 @@ const Settings = () => {
                                 {saving ? "Saving..." : "Save"}
                             </Button>
                         </div>
+
+                        <div className="mt-6">
+                            <h3 className="font-bold text-white">Scan Profile</h3>
+                            <p className="text-gray-400 text-sm mt-1 mb-3">
+                                "fast" suits slow gate hardware; "balanced" is more accurate. Enrollment always uses the high-fidelity profile.
+                            </p>
+                            <select
+                                value={sysSettings.verify_encoding_profile || 'balanced'}
+                                onChange={(e) => setSysSettings({ ...sysSettings, verify_encoding_profile: e.target.value })}
+                                className="w-full bg-black/20 border border-white/10 rounded-xl p-3 text-white focus:outline-none focus:border-primary/50"
+                            >
+                                {profiles.filter((p) => p !== 'enroll').map((p) => (
+                                    <option key={p} value={p}>{p}</option>
+                                ))}
+                            </select>
+                        </div>
                     </Card>
                 </section>
 
@@ -8,7 +8,7 @@ import {
   ShieldAlert,
   Award,
   Download,
-  Trash2,
+  Archive,
 } from "lucide-react";
 
 import { Card } from "../components/ui/Card";
@@ -31,7 +31,7 @@ const Users = () => {
     const fetchData = async () => {
       try {
         const [studentsRes, usersRes] = await Promise.all([
-          api.get("/enroll/students"),
+          api.get("/enroll/students?fields=id,first_name,last_name,admission_number,role,is_active"),
           api.get("/auth/users")
         ]);
 
@@ -43,7 +43,7 @@ const Users = () => {
         if (studentsData.students) {
           allUsers = [
             ...allUsers,
-            ...studentsData.students.map(s => ({
+            ...studentsData.students.filter(s => s.is_active !== false).map(s => ({
               id: `student-${s.id}`,
               realId: s.id,
               name: `${s.first_name} ${s.last_name}`,
@@ -115,23 +115,23 @@ const Users = () => {
     return 0;
   });
 
-  const handleDelete = async (user) => {
+  const handleArchive = async (user) => {
     const isStudent = user.id.startsWith("student-");
     if (!isStudent) {
-      toast.error("Only student records can be deleted from here.");
+      toast.error("Only student records can be archived from here.");
       return;
     }
 
-    if (!window.confirm(`Are you sure you want to delete ${user.name}? This will remove all their biometric data and attendance records.`)) {
+    if (!window.confirm(`Archive ${user.name}? They will no longer be recognised at scanners. Their attendance history is kept and they can be restored later.`)) {
       return;
     }
 
     try {
-      await api.delete(`/enroll/student/${user.realId}`);
-      toast.success("Student deleted successfully");
+      await api.post(`/enroll/student/${user.realId}/archive`);
+      toast.success("Student archived");
       setUsers(users.filter(u => u.id !== user.id));
     } catch (err) {
-      toast.error(err.response?.data?.error || "Failed to delete student");
+      toast.error(err.response?.data?.error || "Failed to archive student");
     }
   };
 
@@ -322,11 +322,11 @@ const Users = () => {
                       <Download size={16} />
                     </button>
                     <button
-                      onClick={(e) => { e.stopPropagation(); handleDelete(user); }}
+                      onClick={(e) => { e.stopPropagation(); handleArchive(user); }}
                       className="p-2 text-gray-500 hover:text-red-500 transition-colors"
-                      title="Delete Student"
+                      title="Archive Student"
                     >
-                      <Trash2 size={16} />
+                      <Archive size={16} />
                     </button>
                   </>
                 )}